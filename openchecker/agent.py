@@ -13,47 +13,37 @@ Author: OpenChecker Team
 # Standard library imports
 import json
 import os
-import re
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
 
 # Local imports
-from checkers.bestpractices_checker import bestpractices_checker
-from checkers.binary_checker import binary_checker
-from checkers.changed_files_checker import changed_files_detector
-from checkers.dangerous_workflow_checker import dangerous_workflow_checker
-from checkers.document_checker import (
-    api_doc_checker,
-    build_doc_checker,
-    readme_opensource_checker
-)
-from checkers.fuzzing_checker import fuzzing_checker
-from checkers.dependency_update_tool_checker import dependency_update_tool_checker
-from checkers.packaging_checker import packaging_checker
-from checkers.pinned_dependencies_checker import pinned_dependencies_checker
-from checkers.release_checker import release_checker
-from checkers.sast_checker import sast_checker
-from checkers.security_policy_checker import security_policy_checker
-from checkers.sonar_checker import sonar_checker
-from checkers.standard_command_checker import (
-    code_count_checker,
-    criticality_score_checker,
-    ohpm_info_checker,
-    package_info_checker,
-    scorecard_score_checker,
-    repo_country_organizations_checker,
-    eol_checker
-)
-from checkers.token_permissions_checker import token_permissions_checker
-from checkers.url_checker import url_checker
-from checkers.webhooks_checker import webhooks_checker
-from common import shell_exec
+from callback_outbox import CallbackOutbox, DeliveryWorker
+from checker_registry import get_checker
+from checkpoint import CheckpointStore, TaskCheckpoints, failed_results
+from common import relativize_paths, shell_exec
 from constans import shell_script_handlers
+from deadline import SKIPPED_DEADLINE, RuntimeEstimates, TaskDeadline, parse_deadline
 from exponential_backoff import post_with_backoff
+from incremental import Baseline, IncrementalScan
+from janitor import WorkspaceJanitor
 from helper import read_config
 from logger import get_logger, log_performance, setup_logging
-from message_queue import consumer
-from platform_adapter import platform_manager
+from message_queue import consumer, publish_retry, retry_delays
+from preparation import PreparationPlan, download_script, partial_clone, plan_preparation
+from process_pool import RecyclingProcessPool
+from repository_mirrors import RepositoryMirrors
+from resources import PressureMonitor, ResourceBudget, budget_from_environment, step_weight
+from result_cache import ResultCache, TaskResults, repository_name, resolve_revision
+from result_spool import ResultSpool, StreamingBody
+from scan_coalescer import ScanCoalescer
+from scheduler import DEADLINE_EXCEEDED, Step, run_steps
+from source_archives import download_archive
+from workspace import TaskWorkspace
 
 # Setup logging
 setup_logging(
@@ -93,106 +83,232 @@ def env_set():
 
 env_set()
 
-def get_licenses_name(data: Dict[str, Any]) -> str:
+# Budget shared by all tasks of this process, created on first use
+_resource_budget = None
+_resource_budget_lock = threading.Lock()
+
+
+def get_resource_budget() -> Optional[ResourceBudget]:
     """
-    Extract license name from license data.
-    
-    Args:
-        data: License data dictionary
-        
+    Return the resource budget checkers of this process are admitted against.
+
+    The budget is derived from the container's cgroup limits; in process
+    execution mode every child process gets an equal share of them. A pressure
+    monitor adapts it at runtime.
+
     Returns:
-        License name or None if not found
+        Optional[ResourceBudget]: None if OpenCheck.resource_admission is disabled
     """
-    return next(
-        (license['meta']['title'] 
-         for license in data.get('licenses', []) 
-         if license.get('meta', {}).get('title')), 
-        None
-    )
+    global _resource_budget
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("resource_admission", "true").lower() != "true":
+        return None
 
+    with _resource_budget_lock:
+        if _resource_budget is None:
+            share = 1.0
+            if opencheck_config.get("execution_mode", "thread") == "process":
+                share = 1.0 / max(1, int(opencheck_config.get("task_slots", 1)))
+            repos_dir = opencheck_config.get("repos_dir", "/tmp/repos")
+            _resource_budget = budget_from_environment(
+                share, repos_dir, float(opencheck_config.get("resource_max_wait_s", 30))
+            )
+            PressureMonitor(
+                _resource_budget,
+                interval=float(opencheck_config.get("pressure_check_interval_s", 10)),
+                pressure_high=float(opencheck_config.get("pressure_high", 10)),
+                disk_path=repos_dir if os.path.isdir(repos_dir) else None,
+                disk_share=share
+            ).start()
+        return _resource_budget
 
-def ruby_licenses(data: Dict[str, Any]) -> Dict[str, Any]:
+
+# Outbox of this process, created on first use
+_callback_outbox = None
+_callback_outbox_lock = threading.Lock()
+
+
+def get_callback_outbox() -> Optional[CallbackOutbox]:
     """
-    Process Ruby licenses by detecting missing licenses from GitHub repositories.
-    
-    Args:
-        data: Dependency checker output data
-        
+    Return the outbox results are queued in for delivery.
+
     Returns:
-        Updated data with detected licenses
+        Optional[CallbackOutbox]: None if OpenCheck.callback_outbox is disabled,
+        results are then sent from the task itself
     """
-    github_url_pattern = "https://github.com/"
-    
-    for item in data["analyzer"]["result"]["packages"]:
-        declared_licenses = item["declared_licenses"]
-        homepage_url = item.get('homepage_url', '')
-        vcs_url = item.get('vcs_processed', {}).get('url', '').replace('.git', '')
-
-        # Check if declared_licenses is empty
-        if not declared_licenses or len(declared_licenses) == 0:
-            # Prioritize checking if vcs_url is a GitHub address
-            if vcs_url.startswith(github_url_pattern):
-                project_url = vcs_url
-            elif homepage_url.startswith(github_url_pattern):
-                project_url = homepage_url
-            else:
-                project_url = None
-                
-            # If a valid GitHub address is found, clone the repository and call licensee
-            if project_url:
-                shell_script = shell_script_handlers["license-detector"].format(project_url=project_url)
-                result, error = shell_exec(shell_script)
-                
-                if error is None:
-                    try:
-                        license_info = json.loads(result)
-                        licenses_name = get_licenses_name(license_info)
-                        item['declared_licenses'].append(licenses_name)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse JSON from {project_url}: {e}")
-                else:
-                    logger.error(f"ruby_licenses job failed: {project_url}, error: {error}")
-    
-    return data
+    global _callback_outbox
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("callback_outbox", "false").lower() != "true":
+        return None
 
+    with _callback_outbox_lock:
+        if _callback_outbox is None:
+            directory = opencheck_config.get("callback_outbox_dir") or os.path.join(project_root, "config", "outbox")
+            _callback_outbox = CallbackOutbox(directory)
+        return _callback_outbox
 
-def dependency_checker_output_process(output: bytes) -> Dict[str, Any]:
+
+def start_callback_delivery() -> Optional[DeliveryWorker]:
     """
-    Process dependency checker output and categorize packages by license status.
-    
-    Args:
-        output: Raw output from dependency checker
-        
+    Start the background worker delivering queued results.
+
     Returns:
-        Processed result with categorized packages
+        Optional[DeliveryWorker]: None if the outbox is disabled
     """
-    if not bool(output):
-        return {}
+    outbox = get_callback_outbox()
+    if outbox is None:
+        return None
+    opencheck_config = config.get("OpenCheck", {})
+    worker = DeliveryWorker(
+        outbox,
+        max_deliveries=int(opencheck_config.get("callback_delivery_workers", 8)),
+        max_per_host=int(opencheck_config.get("callback_max_per_host", 4)),
+        max_attempts=int(opencheck_config.get("callback_max_attempts", 10))
+    ).start()
+    logger.info(f"Delivering results from outbox {outbox.directory}, {len(outbox)} pending")
+    return worker
 
-    result = json.loads(output.decode('utf-8'))
-    result = ruby_licenses(result)
-    
-    try:
-        packages = result["analyzer"]["result"]["packages"]
-        result = {
-            "packages_all": [],
-            "packages_with_license_detect": [],
-            "packages_without_license_detect": []
-        }
 
-        for package in packages:
-            result["packages_all"].append(package["purl"])
-            license = package["declared_licenses"]
-            if license is not None and len(license) > 0:
-                result["packages_with_license_detect"].append(package["purl"])
-            else:
-                result["packages_without_license_detect"].append(package["purl"])
+# Checkpoint store of this process, created on first use
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
 
-    except Exception as e:
-        logger.error(f"Error processing dependency-checker output: {e}")
-        return {}
 
-    return result
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Return the store of per-checker task checkpoints.
+
+    Returns:
+        Optional[CheckpointStore]: None if OpenCheck.checkpoints is disabled
+    """
+    global _checkpoint_store
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("checkpoints", "false").lower() != "true":
+        return None
+
+    with _checkpoint_store_lock:
+        if _checkpoint_store is None:
+            directory = opencheck_config.get("checkpoint_dir") or os.path.join(project_root, "config", "checkpoints")
+            _checkpoint_store = CheckpointStore(directory, float(opencheck_config.get("checkpoint_ttl_s", 86400)))
+            removed = _checkpoint_store.purge_expired()
+            if removed:
+                logger.info(f"Removed {removed} expired task checkpoint(s)")
+        return _checkpoint_store
+
+
+# Registry of running scans, created on first use
+_scan_coalescer = None
+_scan_coalescer_lock = threading.Lock()
+
+
+def get_scan_coalescer() -> Optional[ScanCoalescer]:
+    """
+    Return the registry duplicate scans are coalesced in.
+
+    Returns:
+        Optional[ScanCoalescer]: None if OpenCheck.coalesce_scans is disabled
+    """
+    global _scan_coalescer
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("coalesce_scans", "false").lower() != "true":
+        return None
+
+    with _scan_coalescer_lock:
+        if _scan_coalescer is None:
+            directory = opencheck_config.get("coalesce_dir") or os.path.join(project_root, "config", "coalesce")
+            _scan_coalescer = ScanCoalescer(directory)
+            _scan_coalescer.purge_expired()
+        return _scan_coalescer
+
+
+# Cache of checker results by commit, created on first use
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Return the commit-addressed cache of checker results.
+
+    Returns:
+        Optional[ResultCache]: None if OpenCheck.result_cache is disabled
+    """
+    global _result_cache
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("result_cache", "false").lower() != "true":
+        return None
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            directory = opencheck_config.get("result_cache_dir") or os.path.join(project_root, "config", "result_cache")
+            _result_cache = ResultCache(directory, float(opencheck_config.get("result_cache_ttl_s", 7 * 86400)))
+            removed = _result_cache.purge_expired()
+            if removed:
+                logger.info(f"Removed {removed} expired cached result(s)")
+        return _result_cache
+
+
+# Bare mirrors of the scanned repositories, created on first use
+_repository_mirrors = None
+_repository_mirrors_lock = threading.Lock()
+
+
+def get_repository_mirrors() -> Optional[RepositoryMirrors]:
+    """
+    Return the store of repository mirrors checkouts are made from.
+
+    Returns:
+        Optional[RepositoryMirrors]: None if OpenCheck.repository_mirrors is disabled
+    """
+    global _repository_mirrors
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("repository_mirrors", "false").lower() != "true":
+        return None
+
+    with _repository_mirrors_lock:
+        if _repository_mirrors is None:
+            directory = opencheck_config.get("repository_mirror_dir") or os.path.join(
+                project_root, "config", "repository_mirrors"
+            )
+            _repository_mirrors = RepositoryMirrors(
+                directory, float(opencheck_config.get("repository_mirror_ttl_s", 30 * 86400))
+            )
+            if opencheck_config.get("workspace_janitor", "false").lower() != "true":
+                # Otherwise the janitor's sweeps purge them in the background
+                removed = _repository_mirrors.purge_unused()
+                if removed:
+                    logger.info(f"Removed {removed} unused repository mirror(s)")
+        return _repository_mirrors
+
+
+# Janitor of repos_dir and the repository mirrors, started on first use
+_workspace_janitor = None
+_workspace_janitor_lock = threading.Lock()
+
+
+def get_workspace_janitor() -> Optional[WorkspaceJanitor]:
+    """
+    Return the janitor deleting task workspaces in the background.
+
+    Returns:
+        Optional[WorkspaceJanitor]: None if OpenCheck.workspace_janitor is
+        disabled, workspaces are then deleted by their task
+    """
+    global _workspace_janitor
+    opencheck_config = config.get("OpenCheck", {})
+    if opencheck_config.get("workspace_janitor", "false").lower() != "true":
+        return None
+
+    with _workspace_janitor_lock:
+        if _workspace_janitor is None:
+            _workspace_janitor = WorkspaceJanitor(
+                opencheck_config.get("repos_dir", "/tmp/repos"),
+                quota=int(float(opencheck_config.get("workspace_quota_gb", 0)) * 1024 ** 3),
+                mirrors=get_repository_mirrors(),
+                interval=float(opencheck_config.get("workspace_janitor_interval_s", 300)),
+                orphan_ttl=float(opencheck_config.get("workspace_orphan_ttl_s", 86400))
+            ).start()
+        return _workspace_janitor
 
 
 def request_url(url: str, payload: Dict[str, Any]) -> tuple[str, str]:
@@ -203,10 +319,18 @@ def request_url(url: str, payload: Dict[str, Any]) -> tuple[str, str]:
         url: Target URL
         payload: Request payload
         
+    Payloads collecting their scan_results in a ResultSpool are streamed
+    from it with chunked transfer encoding, compressed as configured in
+    OpenCheck.callback_content_encoding.
+    
     Returns:
         Tuple of (response_text, error_message)
     """
-    response = post_with_backoff(url=url, json=payload)
+    if isinstance(payload.get("scan_results"), ResultSpool):
+        body = StreamingBody(payload, config.get("OpenCheck", {}).get("callback_content_encoding", "identity"))
+        response = post_with_backoff(url=url, data=body, headers=body.headers)
+    else:
+        response = post_with_backoff(url=url, json=payload)
 
     if response.status_code == 200:
         return response.text, None
@@ -214,10 +338,30 @@ def request_url(url: str, payload: Dict[str, Any]) -> tuple[str, str]:
         return None, f"Failed to send request. Status code: {response.status_code}"
 
 
+# Pool of child processes running tasks when OpenCheck.execution_mode is "process"
+task_process_pool = None
+
+# Runtimes of checkers and preparation steps observed by this process
+runtime_estimates = RuntimeEstimates()
+
+
+class TransientError(Exception):
+    """A task failure that is likely to go away on a later attempt."""
+
+
+# Failures of the infrastructure rather than the task (network, shared storage,
+# timeouts); tasks failing with these go through the retry queues
+TRANSIENT_EXCEPTIONS = (TransientError, OSError, requests.RequestException)
+
+
 @log_performance('openchecker.agent')
 def callback_func(ch, method, properties, body):
     """
     Message queue callback function, handles project check tasks.
+
+    The task itself runs in process_task, either on the calling thread or, in
+    process execution mode, in a pooled child process. Acknowledgement always
+    happens here through the (thread-safe) channel.
     
     Args:
         ch: Message channel
@@ -235,7 +379,42 @@ def callback_func(ch, method, properties, body):
         }
     )
 
-    original_cwd = os.getcwd()
+    try:
+        if task_process_pool is not None:
+            success, error_msg, retryable = task_process_pool.run(process_task, body)
+        else:
+            success, error_msg, retryable = process_task(body)
+    except Exception as e:
+        # The task could not run to completion, e.g. its child process was killed
+        logger.error(f"Error occurred while running task: {e}", exc_info=True)
+        success, error_msg, retryable = False, str(e), True
+
+    if success:
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+    else:
+        _handle_error_and_nack(ch, method, body, error_msg, properties, retryable)
+
+
+def process_task(body: bytes) -> Tuple[bool, Optional[str], bool]:
+    """
+    Process a project check task: download the source, execute the commands
+    and send the results to the callback URL.
+
+    Does not touch the message channel, so it can run in a child process.
+
+    Args:
+        body: Message body
+
+    Returns:
+        Tuple[bool, Optional[str], bool]: (success, error_message, retryable);
+        the message is acknowledged on success, retried later if the failure
+        is transient (see TRANSIENT_EXCEPTIONS) and put to dead letters otherwise
+    """
+    task_workspace = None
+    project_url = None
+    scan_results = None
+    registration = None
+    partial_results = None
     
     try:
         message = json.loads(body.decode('utf-8'))
@@ -246,6 +425,7 @@ def callback_func(ch, method, properties, body):
         callback_url = message.get('callback_url')
         task_metadata = message.get('task_metadata', {})
         version_number = task_metadata.get("version_number", "None")
+        deadline = _task_deadline(task_metadata)
         
         project_url = project_url.replace(".git", "")
         logger.info(
@@ -263,38 +443,62 @@ def callback_func(ch, method, properties, body):
 
         if not project_url:
             logger.error("Project URL is required")
-            return
-
-        repos_dir = config.get("OpenCheck", {}).get("repos_dir", "/tmp/repos")
-        logger.info(f"Repository directory: {repos_dir}")
+            return False, "Project URL is required", False
 
-        if not os.path.exists(repos_dir):
-            os.makedirs(repos_dir, exist_ok=True)
-            logger.info(f"Created repository directory: {repos_dir}")
+        coalescer = get_scan_coalescer()
+        if coalescer is not None and callback_url:
+            registration = coalescer.join(
+                project_url, version_number, commit_hash, command_list, callback_url, task_metadata
+            )
+            if registration is None:
+                # The results are sent by the task already scanning this version
+                return True, None, False
 
-        os.chdir(repos_dir)
-        logger.info(f"Switched to working directory: {os.getcwd()}")
+        task_workspace = _create_task_workspace(project_url)
+        workspace = task_workspace.root
+        scan_results = _create_result_spool()
 
         res_payload = {
             "command_list": command_list,
             "project_url": project_url,
             "task_metadata": task_metadata,
-            "scan_results": {}
+            "scan_results": scan_results
         }
 
-        if not _download_project_source(project_url, version_number):
-            _handle_error_and_nack(ch, method, body, "Failed to download project source")
-            return
+        revision = _task_revision(project_url, version_number)
+        store = get_checkpoint_store()
+        checkpoints = store.task(project_url, version_number, commit_hash, revision, command_list) if store and revision else None
+        if callback_url and PartialResults.enabled(task_metadata):
+            partial_results = PartialResults(res_payload, callback_url)
+        on_restore = partial_results.send if partial_results is not None else None
+        pending = _restore_checkpoints(checkpoints, command_list, res_payload, on_restore)
+        task_cache, pending = _restore_cached_results(
+            pending, revision, project_url, commit_hash, access_token, workspace, res_payload, on_restore
+        )
+        incremental = _incremental_scan(task_cache, task_metadata)
 
-        _generate_lock_files(project_url)
-        _execute_commands(command_list, project_url, res_payload, commit_hash, access_token)
-        _cleanup_project_source(project_url)
+        def on_result(command, results):
+            if checkpoints is not None:
+                checkpoints.save(command, get_checker(command).version, results)
+            if task_cache is not None:
+                task_cache.save(command, results)
+            if partial_results is not None:
+                partial_results.send(command, results)
 
-        os.chdir(original_cwd)
-        logger.info(f"Restored working directory: {os.getcwd()}")
+        if pending and not _execute_commands(pending, project_url, res_payload, commit_hash, access_token,
+                                             version_number, workspace, on_result, incremental, deadline):
+            task_workspace.cleanup(get_workspace_janitor())
+            return False, "Failed to download project source", True
+        _order_scan_results(res_payload, command_list)
 
-        _send_results(callback_url, res_payload)
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        task_workspace.cleanup(get_workspace_janitor())
+
+        _send_results(callback_url, partial_results.complete() if partial_results is not None else res_payload)
+        if registration is not None:
+            for attachment in registration.close():
+                _send_results(attachment.callback_url, attachment.payload(res_payload))
+        if checkpoints is not None:
+            checkpoints.clear()
 
         logger.info(
             f"Project {project_url} processed successfully",
@@ -306,36 +510,381 @@ def callback_func(ch, method, properties, body):
                 }
             }
         )
+        return True, None, False
         
     except Exception as e:
         logger.error(f"Error occurred while processing message: {e}", exc_info=True)
 
-        try:
-            os.chdir(original_cwd)
-            logger.info(f"Restored working directory after exception: {os.getcwd()}")
-        except:
-            pass
+        if task_workspace is not None:
+            task_workspace.cleanup(get_workspace_janitor())
+
+        return False, str(e), isinstance(e, TRANSIENT_EXCEPTIONS)
+
+    finally:
+        if partial_results is not None:
+            partial_results.close()
+        if registration is not None:
+            registration.release()
+        if scan_results is not None:
+            scan_results.close()
+
+
+class PartialResults:
+    """
+    Numbering and sending of progressive result callbacks.
+
+    Tasks whose task_metadata sets "progressive_callbacks" post every
+    checker's result as soon as it is available, followed by the usual
+    payload with all results marked as complete. Each callback carries a
+    sequence number so receivers can order them. Results restored from
+    checkpoints or the result cache are sent first, so every command of the
+    task gets a partial callback; a redelivered task numbers its callbacks
+    from 1 again. Partial callbacks are sent in order by a thread of their
+    own, so checkers never wait for the callback receiver.
+    """
+
+    def __init__(self, res_payload: Dict[str, Any], callback_url: Optional[str] = None):
+        """
+        Args:
+            res_payload: Response payload of the task
+            callback_url: Callback URL partial results are sent to by send()
+        """
+        self.res_payload = res_payload
+        self.callback_url = callback_url
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._sender = None
+
+    @staticmethod
+    def enabled(task_metadata: Dict[str, Any]) -> bool:
+        return str(task_metadata.get("progressive_callbacks", False)).lower() == "true"
 
-        _handle_error_and_nack(ch, method, body, str(e))
+    def partial(self, command: str, scan_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the callback payload of one checker's results; call under self.lock."""
+        self.sequence += 1
+        payload = {k: v for k, v in self.res_payload.items() if k != "scan_results"}
+        payload.update(sequence=self.sequence, complete=False, command=command, scan_results=scan_results)
+        return payload
 
+    def send(self, command: str, scan_results: Dict[str, Any]) -> None:
+        """Queue the partial callback of one checker's results for the sender thread."""
+        with self.lock:
+            self._queue.put(self.partial(command, scan_results))
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._run_sender, name='partial-results', daemon=True)
+                self._sender.start()
 
-def _download_project_source(project_url: str, version_number: str) -> bool:
+    def _run_sender(self) -> None:
+        while True:
+            payload = self._queue.get()
+            if payload is None:
+                return
+            _send_results(self.callback_url, payload)
+
+    def close(self) -> None:
+        """Wait until the queued partial callbacks are sent."""
+        with self.lock:
+            sender, self._sender = self._sender, None
+        if sender is not None:
+            self._queue.put(None)
+            sender.join()
+
+    def complete(self) -> Dict[str, Any]:
+        """Mark res_payload as the final callback, after all partial ones, and return it."""
+        self.close()
+        with self.lock:
+            self.sequence += 1
+            self.res_payload.update(sequence=self.sequence, complete=True)
+        return self.res_payload
+
+
+def _create_task_workspace(project_url: str) -> TaskWorkspace:
+    """
+    Create a fresh workspace for a task below repos_dir.
+
+    Args:
+        project_url: Project URL of the task
+
+    Returns:
+        TaskWorkspace: Workspace owning the task's checkout
+    """
+    repos_dir = config.get("OpenCheck", {}).get("repos_dir", "/tmp/repos")
+    logger.info(f"Repository directory: {repos_dir}")
+    workspace = TaskWorkspace.create(repos_dir, project_url)
+    get_workspace_janitor()
+    return workspace
+
+
+def _create_result_spool() -> ResultSpool:
+    """
+    Create the mapping a task collects its scan results in.
+
+    Results larger than OpenCheck.result_spill_threshold_kb are kept in a
+    spool directory below repos_dir instead of memory.
+
+    Returns:
+        ResultSpool: Spool, closed by the caller when the results are sent
+    """
+    opencheck_config = config.get("OpenCheck", {})
+    repos_dir = opencheck_config.get("repos_dir", "/tmp/repos")
+    os.makedirs(repos_dir, exist_ok=True)
+    return ResultSpool(repos_dir, int(opencheck_config.get("result_spill_threshold_kb", 1024)) * 1024)
+
+
+def _restore_checkpoints(
+    checkpoints: Optional[TaskCheckpoints],
+    command_list: List[str],
+    res_payload: Dict[str, Any],
+    on_restore: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> List[str]:
+    """
+    Put the checkpointed results of a redelivered task into res_payload.
+
+    Args:
+        checkpoints: Checkpoints of the task, None if checkpointing is disabled
+        command_list: Command list
+        res_payload: Response payload
+        on_restore: Optional callback invoked as on_restore(command, scan_results)
+            for every restored command
+
+    Returns:
+        List[str]: Commands that still have to run
+    """
+    if checkpoints is None:
+        return list(command_list)
+    versions = {c: get_checker(c).version for c in command_list if get_checker(c) is not None}
+    restored = checkpoints.restore(versions)
+    for command, scan_results in restored.items():
+        res_payload["scan_results"].update(scan_results)
+        if on_restore is not None:
+            on_restore(command, scan_results)
+    return [c for c in command_list if c not in restored]
+
+
+def _task_revision(project_url: str, version_number: str) -> Optional[str]:
+    """
+    Resolve the commit a task would check out, if checkpoints or the result cache need it.
+
+    The revision is resolved with git ls-remote, so a task whose commands
+    are all checkpointed or cached finishes without a clone.
+
+    Returns:
+        Optional[str]: Commit SHA, None if both are disabled or the remote
+        could not be queried
+    """
+    if get_checkpoint_store() is None and get_result_cache() is None:
+        return None
+    return resolve_revision(project_url, version_number)
+
+
+def _restore_cached_results(
+    pending: List[str],
+    revision: Optional[str],
+    project_url: str,
+    commit_hash: str,
+    access_token: str,
+    workspace: str,
+    res_payload: Dict[str, Any],
+    on_restore: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Tuple[Optional[TaskResults], List[str]]:
+    """
+    Put the cached results of the commands still to run into res_payload.
+
+    Args:
+        pending: Commands that still have to run
+        revision: Commit the task would check out, see _task_revision
+        project_url: Project URL
+        commit_hash: Commit hash
+        access_token: Access token
+        workspace: Task workspace directory
+        res_payload: Response payload
+        on_restore: Optional callback invoked as on_restore(command, scan_results)
+            for every restored command
+
+    Returns:
+        Tuple[Optional[TaskResults], List[str]]: Cache entries the task's
+        results are stored in (None if the cache is disabled or the revision
+        is unknown) and the commands that still have to run
+    """
+    cache = get_result_cache()
+    specs = [get_checker(c) for c in pending if get_checker(c) is not None]
+    if cache is None or not specs or revision is None:
+        return None, pending
+
+    task_cache = cache.task(specs, revision, project_url, commit_hash, access_token, config, workspace)
+    restored = task_cache.restore()
+    for command, scan_results in restored.items():
+        res_payload["scan_results"].update(scan_results)
+        if on_restore is not None:
+            on_restore(command, scan_results)
+    return task_cache, [c for c in pending if c not in restored]
+
+
+def _task_deadline(task_metadata: Dict[str, Any]) -> Optional[TaskDeadline]:
+    """
+    Return the time budget of a task set by task_metadata.deadline.
+
+    Returns:
+        Optional[TaskDeadline]: None if the task has no deadline
+    """
+    deadline = parse_deadline(task_metadata.get("deadline"))
+    if deadline is None:
+        return None
+    logger.info(f"Task deadline in {deadline - time.time():.0f}s")
+    return TaskDeadline(deadline, runtime_estimates)
+
+
+def _incremental_scan(task_cache: Optional[TaskResults], task_metadata: Dict[str, Any]) -> Optional[IncrementalScan]:
+    """
+    Return the incremental rescan state of a task.
+
+    File-level checkers rescan only the files changed since the project's
+    previously cached commit unless OpenCheck.incremental_rescans is disabled
+    or task_metadata sets "full_scan".
+
+    Returns:
+        Optional[IncrementalScan]: None if every checker scans the whole checkout
+    """
+    if task_cache is None or str(task_metadata.get("full_scan", False)).lower() == "true":
+        return None
+    if config.get("OpenCheck", {}).get("incremental_rescans", "false").lower() != "true":
+        return None
+    return IncrementalScan(task_cache)
+
+
+def _preparation_plan(commands: List[str], incremental: Optional[IncrementalScan]) -> PreparationPlan:
+    """
+    Return the preparation the commands need.
+
+    The clone is shallow unless a checker needs history, OpenCheck.shallow_clones
+    is disabled or an incremental rescan has to diff against an earlier commit.
+    It is sparse if every checker reading it declares its paths, unless
+    OpenCheck.sparse_checkouts is disabled. A shallow full-tree checkout no
+    checker reads git metadata from may come from a source archive if
+    OpenCheck.archive_downloads is enabled.
+    """
+    shallow = config.get("OpenCheck", {}).get("shallow_clones", "true").lower() == "true"
+    sparse = config.get("OpenCheck", {}).get("sparse_checkouts", "true").lower() == "true"
+    archives = config.get("OpenCheck", {}).get("archive_downloads", "false").lower() == "true"
+    full_history = not shallow or (incremental is not None and incremental.needs_history(commands))
+    return plan_preparation(
+        [get_checker(c) for c in commands if get_checker(c) is not None], full_history, sparse, archives
+    )
+
+
+def _order_scan_results(res_payload: Dict[str, Any], command_list: List[str]) -> None:
+    """
+    Keep scan results in the order the commands were requested.
+
+    Args:
+        res_payload: Response payload
+        command_list: Command list
+    """
+    scan_results = res_payload["scan_results"]
+    if isinstance(scan_results, ResultSpool):
+        scan_results.reorder(command_list)
+        return
+    ordered = {c: scan_results[c] for c in command_list if c in scan_results}
+    ordered.update(scan_results)
+    res_payload["scan_results"] = ordered
+
+
+def _checkout_from_mirror(
+    project_url: str,
+    version_number: str,
+    workspace: str,
+    timeout: Optional[float] = None,
+    paths: Optional[List[str]] = None
+) -> bool:
+    """
+    Check out the project from its repository mirror.
+
+    Args:
+        paths: Sparse-checkout patterns of the files to check out, None for the whole tree
+
+    Returns:
+        bool: False if mirrors are disabled or the checkout failed, the
+        project is then cloned from its URL
+    """
+    mirrors = get_repository_mirrors()
+    if mirrors is None:
+        return False
+    try:
+        checked_out = mirrors.checkout(
+            project_url, version_number, os.path.join(workspace, repository_name(project_url)), timeout, paths
+        )
+    except OSError as e:
+        logger.warning(f"Checkout from mirror failed: {project_url}, error: {e}")
+        return False
+    if checked_out:
+        logger.info(f"Source code checked out from mirror: {project_url}")
+    return checked_out
+
+
+def _download_archive(
+    project_url: str,
+    version_number: str,
+    workspace: str,
+    timeout: Optional[float] = None
+) -> bool:
+    """
+    Extract a tagged version from the source archive served by its hosting platform.
+
+    Returns:
+        bool: False if no tag is scanned or no archive could be downloaded,
+        the project is then cloned
+    """
+    if not version_number or version_number == "None":
+        return False
+    try:
+        return download_archive(
+            project_url, version_number, os.path.join(workspace, repository_name(project_url)), timeout
+        )
+    except Exception as e:
+        logger.warning(f"Archive download failed: {project_url}, error: {e}")
+        return False
+
+
+def _download_project_source(
+    project_url: str,
+    version_number: str,
+    workspace: str = ".",
+    timeout: Optional[float] = None,
+    full_history: bool = True,
+    paths: Optional[List[str]] = None,
+    archive: bool = False
+) -> bool:
     """
     Download project source code.
     
     Args:
         project_url: Project URL
         version_number: Version number
+        workspace: Task workspace directory
+        timeout: Seconds the download may take, None for the configured default
+        full_history: Clone the whole history; a clone of depth 1 of the version
+            otherwise. Checkouts from a repository mirror always have the history
+        paths: Sparse-checkout patterns of the files to check out, None for
+            the whole tree; such checkouts are partial clones (--filter=blob:none)
+        archive: Extract a tagged version from its source archive if the
+            platform serves one; the checkout is then no git repository
         
     Returns:
         Whether successful
     """
+    if archive and _download_archive(project_url, version_number, workspace, timeout):
+        return True
+    if _checkout_from_mirror(project_url, version_number, workspace, timeout, paths):
+        return True
+    if paths is not None and partial_clone(
+        project_url, version_number, os.path.join(workspace, repository_name(project_url)), paths, full_history, timeout
+    ):
+        logger.info(f"Source code download completed (sparse checkout): {project_url}")
+        return True
     try:
-        shell_script = shell_script_handlers["download-checkout"].format(
-            project_url=project_url, 
-            version_number=version_number
-        )
-        result, error = shell_exec(shell_script)
+        shell_script = download_script(project_url, version_number, full_history)
+        result, error = shell_exec(shell_script, cwd=workspace, timeout=timeout)
         
         if error is None:
             logger.info(f"Source code download completed: {project_url}")
@@ -349,16 +898,18 @@ def _download_project_source(project_url: str, version_number: str) -> bool:
         return False
 
 
-def _generate_lock_files(project_url: str) -> None:
+def _generate_lock_files(project_url: str, workspace: str = ".", timeout: Optional[float] = None) -> None:
     """
     Generate lock files.
     
     Args:
         project_url: Project URL
+        workspace: Task workspace directory
+        timeout: Seconds the generation may take, None for the configured default
     """
     try:
         shell_script = shell_script_handlers["generate-lock_files"].format(project_url=project_url)
-        result, error = shell_exec(shell_script)
+        result, error = shell_exec(shell_script, cwd=workspace, timeout=timeout)
         
         if error is None:
             logger.info(f"Lock files generation completed: {project_url}")
@@ -369,166 +920,286 @@ def _generate_lock_files(project_url: str) -> None:
         logger.error(f"Lock files generation exception: {e}")
 
 
-def _execute_commands(
-    command_list: List[str],
+def _build_command_switch(
     project_url: str,
-    res_payload: Dict[str, Any],
     commit_hash: str,
-    access_token: str
-) -> None:
+    access_token: str,
+    workspace: str,
+    command_list: List[str]
+) -> Dict[str, Callable[[Dict[str, Any]], None]]:
     """
-    Execute command list.
-    
+    Resolve the command list through the checker registry.
+
+    Every handler receives the payload it should write its results into.
+    Checker implementations are imported on first use.
+
     Args:
-        command_list: Command list
         project_url: Project URL
-        res_payload: Response payload
         commit_hash: Commit hash
         access_token: Access token
+        workspace: Task workspace directory
+        command_list: Command list
+
+    Returns:
+        Dict mapping each registered command of command_list to its handler
     """
-    command_switch = {
-        'binary-checker': lambda: binary_checker(project_url, res_payload),
-        'release-checker': lambda: release_checker(project_url, res_payload),
-        'url-checker': lambda: url_checker(project_url, res_payload),
-        'sonar-scanner': lambda: sonar_checker(project_url, res_payload, config),
-        'osv-scanner': lambda: _handle_shell_script_command('osv-scanner', project_url, res_payload),
-        'scancode': lambda: _handle_shell_script_command('scancode', project_url, res_payload),
-        'dependency-checker': lambda: _handle_shell_script_command('dependency-checker', project_url, res_payload),
-        'readme-checker': lambda: _handle_shell_script_command('readme-checker', project_url, res_payload),
-        'maintainers-checker': lambda: _handle_shell_script_command('maintainers-checker', project_url, res_payload),
-        'languages-detector': lambda: _handle_shell_script_command('languages-detector', project_url, res_payload),
-        'oat-scanner': lambda: _handle_shell_script_command('oat-scanner', project_url, res_payload),
-        'license-detector': lambda: _handle_shell_script_command('license-detector', project_url, res_payload),
-        'api-doc-checker': lambda: api_doc_checker(project_url, res_payload),
-        'build-doc-checker': lambda: build_doc_checker(project_url, res_payload),
-        'readme-opensource-checker': lambda: readme_opensource_checker(project_url, res_payload),
-        'bestpractices-checker': lambda: bestpractices_checker(project_url, res_payload),
-        'dangerous-workflow-checker': lambda: dangerous_workflow_checker(project_url, res_payload),
-        'dependency-update-tool-checker': lambda: dependency_update_tool_checker(project_url, res_payload),
-        'fuzzing-checker': lambda: fuzzing_checker(project_url, res_payload),
-        'packaging-checker': lambda: packaging_checker(project_url, res_payload),
-        'pinned-dependencies-checker': lambda: pinned_dependencies_checker(project_url, res_payload),
-        'sast-checker': lambda: sast_checker(project_url, res_payload),
-        'security-policy-checker': lambda: security_policy_checker(project_url, res_payload),
-        'token-permissions-checker': lambda: token_permissions_checker(project_url, res_payload),
-        'webhooks-checker': lambda: webhooks_checker(project_url, res_payload, access_token),
-        'changed-files-since-commit-detector': lambda: changed_files_detector(project_url, res_payload, commit_hash),
-        'criticality-score': lambda: criticality_score_checker(project_url, res_payload),
-        'scorecard-score': lambda: scorecard_score_checker(project_url, res_payload),
-        'code-count': lambda: code_count_checker(project_url, res_payload),
-        'package-info': lambda: package_info_checker(project_url, res_payload),
-        'ohpm-info': lambda: ohpm_info_checker(project_url, res_payload),
-        'repo-country-organizations': lambda: repo_country_organizations_checker(project_url, res_payload),
-        'eol-checker': lambda: eol_checker(project_url, res_payload)
+    context = {
+        "project_url": project_url,
+        "commit_hash": commit_hash,
+        "access_token": access_token,
+        "workspace": workspace,
+        "config": config
     }
-    
+    command_switch = {}
     for command in command_list:
-        if command in command_switch:
-            try:
-                command_switch[command]()
-            except Exception as e:
-                logger.error(f"Error executing command {command}: {e}")
-                res_payload["scan_results"][command] = {"error": str(e)}
-        else:
+        spec = get_checker(command)
+        if spec is not None:
+            command_switch[command] = spec.bind(context)
+    return command_switch
+
+
+def _build_task_steps(
+    command_list: List[str],
+    command_switch: Dict[str, Callable[[Dict[str, Any]], None]],
+    run_command: Callable[[str], Any],
+    download: Callable[[], Any],
+    generate_lock_files: Callable[[], Any],
+    deadline: Optional[TaskDeadline] = None,
+    plan: Optional[PreparationPlan] = None
+) -> List[Step]:
+    """
+    Build the dependency graph of a task: the preparation steps its commands
+    need (source download, lock file generation) and one step per known command.
+
+    Lock file generation rewrites the checkout, so every command reading the
+    checkout waits for it. Commands in CHECKOUT_MUTATING_COMMANDS run last and
+    one at a time.
+
+    Args:
+        command_list: Command list
+        command_switch: Command dispatch table
+        run_command: Callable executing a single command by name
+        download: Callable downloading the project source, raising on failure
+        generate_lock_files: Callable generating lock files
+        deadline: Time budget of the task; commands are then started shortest
+            expected runtime first and steps carry their runtime estimates
+        plan: Preparation of the task, derived from the commands' prerequisites if None
+
+    Returns:
+        List[Step]: Steps of the task
+    """
+    def estimate(name, resource_class=None):
+        return deadline.estimates.estimate(name, resource_class) if deadline is not None else 0
+
+    commands = []
+    for command in command_list:
+        if command not in command_switch:
             logger.warning(f"Unknown command: {command}")
+        elif command not in commands:
+            commands.append(command)
 
+    specs = {c: get_checker(c) for c in commands}
+    if plan is None:
+        plan = plan_preparation(specs.values())
 
-def _handle_shell_script_command(
-    command: str,
+    steps = []
+    preparation = []
+    if plan.clone:
+        steps.append(Step(
+            "download-checkout", download,
+            weight=step_weight("download-checkout"), estimate=estimate("download-checkout")
+        ))
+        preparation.append("download-checkout")
+    if plan.lockfiles:
+        steps.append(Step(
+            "generate-lock_files", generate_lock_files, requires=["download-checkout"],
+            weight=step_weight("generate-lock_files"), estimate=estimate("generate-lock_files")
+        ))
+        preparation.append("generate-lock_files")
+
+    if deadline is not None:
+        commands = deadline.order(commands, {c: specs[c].resource_class for c in commands})
+    readers = [c for c in commands if not specs[c].mutates_checkout and specs[c].prerequisites]
+    previous_mutating = []
+    for command in commands:
+        spec = specs[command]
+        requires = list(preparation) if spec.prerequisites else []
+        if spec.mutates_checkout:
+            requires.extend(readers + previous_mutating)
+            previous_mutating = [command]
+        steps.append(Step(
+            command, lambda command=command: run_command(command),
+            requires=requires, weight=spec.weight, estimate=estimate(command, spec.resource_class)
+        ))
+
+    return steps
+
+
+def _execute_commands(
+    command_list: List[str],
     project_url: str,
-    res_payload: Dict[str, Any]
-) -> None:
+    res_payload: Dict[str, Any],
+    commit_hash: str,
+    access_token: str,
+    version_number: str = "None",
+    workspace: str = ".",
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    incremental: Optional[IncrementalScan] = None,
+    deadline: Optional[TaskDeadline] = None
+) -> bool:
     """
-    Generic function to handle shell script commands.
-    
+    Prepare the checkout the command list needs and execute the commands.
+
+    Independent commands run concurrently on a bounded thread pool as long as
+    they fit into the resource budget; each one writes into a private payload that is merged into res_payload under a lock.
+    Paths inside the workspace are reported relative to it. Each result is
+    stored as soon as its command finishes, so a ResultSpool can spill it to
+    disk right away.
+
     Args:
-        command: Command name
+        command_list: Command list
         project_url: Project URL
         res_payload: Response payload
+        commit_hash: Commit hash
+        access_token: Access token
+        version_number: Version number
+        workspace: Task workspace directory
+        on_result: Called with the command and its scan results as soon as a
+            command finishes
+        incremental: Baselines letting file-level checkers rescan only changed files
+        deadline: Time budget of the task; commands that do not fit are
+            reported as skipped_deadline and timeouts are limited to the time left
+
+    Returns:
+        bool: False if the project source could not be downloaded
     """
-    try:
-        if command not in shell_script_handlers:
-            logger.error(f"No shell script handler found for command: {command}")
-            return
-        
-        shell_script = shell_script_handlers[command].format(project_url=project_url)
-        result, error = shell_exec(shell_script)
-        
-        if error is None:
-            logger.info(f"{command} job done: {project_url}")
-            
-            processed_result = _process_command_result(command, result)
-            res_payload["scan_results"][command] = processed_result
-        else:
-            logger.error(f"{command} job failed: {project_url}, error: {error}")
-            res_payload["scan_results"][command] = {"error": error.decode("utf-8")}
-            
-    except Exception as e:
-        logger.error(f"{command} job failed: {project_url}, error: {e}")
-        res_payload["scan_results"][command] = {"error": str(e)}
+    command_switch = _build_command_switch(project_url, commit_hash, access_token, workspace, command_list)
+    task_workspace = TaskWorkspace(workspace, project_url)
+    results_lock = threading.Lock()
+
+    def run_command(command):
+        command_payload = {"scan_results": {}}
+        baseline = incremental.baseline(command) if incremental is not None else None
+        overrides = _command_overrides(command, baseline, deadline)
+        had_checkout = task_workspace.has_checkout()
+        started = time.monotonic()
+        try:
+            command_switch[command](command_payload, **overrides)
+        except Exception as e:
+            logger.error(f"Error executing command {command}: {e}")
+            command_payload["scan_results"][command] = {"error": str(e)}
+        checkout_error = task_workspace.checkout_error(command, had_checkout)
+        if checkout_error is not None:
+            command_payload["scan_results"] = {command: {"error": checkout_error}}
+        scan_results = relativize_paths(command_payload["scan_results"], workspace)
+        if baseline is not None:
+            scan_results = baseline.merge(scan_results)
+        scan_results = _account_runtime(command, scan_results, time.monotonic() - started, baseline, deadline)
+        with results_lock:
+            res_payload["scan_results"].update(scan_results)
+        if on_result is not None:
+            on_result(command, scan_results)
+
+    def download():
+        started = time.monotonic()
+        if not _download_project_source(
+            project_url, version_number, workspace, deadline.timeout() if deadline is not None else None,
+            plan.full_history, plan.paths, plan.archive
+        ):
+            raise RuntimeError("Failed to download project source")
+        runtime_estimates.observe("download-checkout", time.monotonic() - started)
+
+    def generate_lock_files():
+        started = time.monotonic()
+        _generate_lock_files(project_url, workspace, deadline.timeout() if deadline is not None else None)
+        runtime_estimates.observe("generate-lock_files", time.monotonic() - started)
+
+    plan = _preparation_plan(list(command_switch), incremental)
+    steps = _build_task_steps(
+        command_list, command_switch, run_command, download, generate_lock_files, deadline, plan
+    )
+    max_workers = int(config.get("OpenCheck", {}).get("max_checker_workers", 4))
+    outcome = run_steps(
+        steps, max_workers=max_workers, budget=get_resource_budget(),
+        deadline=deadline.deadline if deadline is not None else None
+    )
+
+    _record_step_errors(outcome, command_switch, res_payload)
+    _order_scan_results(res_payload, command_list)
+
+    return outcome.get("download-checkout") in (None, DEADLINE_EXCEEDED)
 
 
-def _process_command_result(command: str, result: bytes) -> Any:
+def _command_overrides(command: str, baseline: Optional[Baseline], deadline: Optional[TaskDeadline]) -> Dict[str, Any]:
     """
-    Process results according to command type.
-    
-    Args:
-        command: Command name
-        result: Original result
-        
-    Returns:
-        Processed result
+    Return the per-run arguments of a command: the changed files of an
+    incremental rescan and the timeout left by the task's deadline.
     """
-    if not result:
-        return {}
-    
-    result_str = result.decode('utf-8')
-    
-    json_commands = ['osv-scanner', 'scancode', 'languages-detector']
-    if command in json_commands:
-        try:
-            return json.loads(result_str)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse JSON for {command}: {e}")
-            return {"raw_output": result_str}
-    
-    if command == 'dependency-checker':
-        return dependency_checker_output_process(result)
-    elif command == 'oat-scanner':
-        return parse_oat_txt_to_json(result_str)
-    
-    return result_str
+    overrides = {}
+    if baseline is not None:
+        overrides["files"] = baseline.changes.examine
+    if deadline is not None:
+        overrides["timeout"] = deadline.timeout(get_checker(command).timeout)
+    return overrides
 
 
-def _cleanup_project_source(project_url: str) -> None:
+def _account_runtime(
+    command: str,
+    scan_results: Dict[str, Any],
+    seconds: float,
+    baseline: Optional[Baseline],
+    deadline: Optional[TaskDeadline]
+) -> Dict[str, Any]:
     """
-    Clean up project source code.
-    
-    Args:
-        project_url: Project URL
+    Learn the runtime of a finished command.
+
+    Returns:
+        Dict[str, Any]: scan_results, replaced with a skipped_deadline entry
+        if the command failed because the task ran out of time
     """
-    try:
-        shell_script = shell_script_handlers["remove-source-code"].format(project_url=project_url)
-        result, error = shell_exec(shell_script)
-        
-        if error is None:
-            logger.info(f"Source code cleanup done: {project_url}")
-        else:
-            logger.warning(f"Source code cleanup failed: {project_url}, error: {error}")
-            
-    except Exception as e:
-        logger.error(f"Exception during source cleanup: {e}")
+    if deadline is not None and deadline.expired() and failed_results(scan_results):
+        logger.warning(f"{command} did not finish before the task deadline")
+        return {command: dict(SKIPPED_DEADLINE)}
+    if baseline is None and not failed_results(scan_results):
+        runtime_estimates.observe(command, seconds)
+    return scan_results
+
+
+def _record_step_errors(
+    outcome: Dict[str, Optional[str]],
+    command_switch: Dict[str, Any],
+    res_payload: Dict[str, Any]
+) -> None:
+    """Report commands that did not run, or failed without results, in res_payload."""
+    for command, error in outcome.items():
+        if command in command_switch and error is not None and command not in res_payload["scan_results"]:
+            if error == DEADLINE_EXCEEDED:
+                res_payload["scan_results"][command] = dict(SKIPPED_DEADLINE)
+            else:
+                res_payload["scan_results"][command] = {"error": error}
 
 
 def _send_results(callback_url: str, res_payload: Dict[str, Any]) -> None:
     """
     Send results to callback URL.
+
+    With the callback outbox enabled the results are only queued here and
+    delivered in the background; they are sent directly if queueing fails.
     
     Args:
         callback_url: Callback URL
         res_payload: Response payload
     """
     if callback_url:
+        outbox = get_callback_outbox()
+        if outbox is not None:
+            try:
+                outbox.enqueue(
+                    callback_url, res_payload, config.get("OpenCheck", {}).get("callback_content_encoding", "identity")
+                )
+                return
+            except OSError as e:
+                logger.error(f"Failed to queue results, sending them directly: {e}")
         try:
             response, err = request_url(callback_url, res_payload)
             if err is None:
@@ -539,68 +1210,73 @@ def _send_results(callback_url: str, res_payload: Dict[str, Any]) -> None:
             logger.error(f"Exception sending results: {e}")
 
 
-def _handle_error_and_nack(ch, method, body, error_msg: str) -> None:
+def _handle_error_and_nack(ch, method, body, error_msg: str, properties=None, retryable: bool = False) -> None:
     """
     Handle error and nack message.
+
+    Retryable failures are published to the next delay queue of the retry
+    ladder (RabbitMQ.retry_delays_s) and acknowledged; other failures, and
+    messages that went through every retry queue, go to dead letters.
     
     Args:
         ch: Message channel
         method: Message method
         body: Message body
         error_msg: Error message
+        properties: Message properties carrying the retry attempt header
+        retryable: Whether the failure is likely transient
     """
+    if retryable:
+        try:
+            if publish_retry(ch, "opencheck", retry_delays(config["RabbitMQ"]), properties, body, error_msg):
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                return
+        except Exception as e:
+            logger.error(f"Failed to schedule retry: {e}")
     logger.error(f"Putting message to dead letters: {error_msg}")
     ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+    for callback_url, payload in _abandoned_callbacks(body, error_msg):
+        _send_results(callback_url, payload)
 
 
-def parse_oat_txt_to_json(txt: str) -> Dict[str, Any]:
+def _abandoned_callbacks(body: bytes, error_msg: str) -> List[Tuple[str, Dict[str, Any]]]:
     """
-    Parse OAT tool output text report to JSON format.
-    
+    Abandon the coalesced scan of a task that failed for good.
+
     Args:
-        txt: OAT tool output text content
-        
+        body: Message body of the task
+        error_msg: Error of the task
+
     Returns:
-        Parsed JSON format data
+        List[Tuple[str, Dict[str, Any]]]: (callback_url, error payload) of
+        every request attached to the scan
     """
+    coalescer = get_scan_coalescer()
+    if coalescer is None:
+        return []
     try:
-        de_str = txt.decode('unicode_escape') if isinstance(txt, bytes) else txt
-        result = {}
-        lines = de_str.splitlines()
-        current_section = None
-        pattern = r"Name:\s*(.+?)\s*Content:\s*(.+?)\s*Line:\s*(\d+)\s*Project:\s*(.+?)\s*File:\s*(.+)"
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            total_count_match = re.search(r"^(.*) Total Count:\s*(\d+)", line, re.MULTILINE)
-            category_name = total_count_match.group(1).strip() if total_count_match else "Unknown"
-
-            if 'Total Count' in line:
-                current_section = category_name
-                total_count = int(line.split(":")[1].strip())
-                result[current_section] = {"total_count": total_count, "details": []}
-            elif line.startswith("Name:"):
-                matches = re.finditer(pattern, line)
-                for match in matches:
-                    entry = {
-                        "name": match.group(1).strip(),
-                        "content": match.group(2).strip(),
-                        "line": int(match.group(3).strip()),
-                        "project": match.group(4).strip(),
-                        "file": match.group(5).strip(),
-                    }
-                if current_section and "details" in result[current_section]:
-                    result[current_section]["details"].append(entry)
-        return result
+        message = json.loads(body.decode('utf-8'))
+        project_url = (message.get('project_url') or "").replace(".git", "")
+        version_number = message.get('task_metadata', {}).get("version_number", "None")
+        attachments = coalescer.abandon(project_url, version_number, message.get("commit_hash"))
     except Exception as e:
-        logger.error(f"parse_oat_txt error: {e}")
-        return {"error": str(e)}
+        logger.error(f"Failed to abandon coalesced scan: {e}")
+        return []
+    return [(a.callback_url, a.error_payload(project_url, error_msg)) for a in attachments]
+
 
 if __name__ == "__main__":
-    consumer(config["RabbitMQ"], "opencheck", callback_func)
+    task_slots = int(config.get("OpenCheck", {}).get("task_slots", 1))
+    if config.get("OpenCheck", {}).get("execution_mode", "thread") == "process":
+        max_tasks_per_child = int(config.get("OpenCheck", {}).get("max_tasks_per_child", 10))
+        task_process_pool = RecyclingProcessPool(task_slots, max_tasks_per_child)
+        logger.info(f"Running tasks in child processes, recycled after {max_tasks_per_child} task(s)")
+    delivery_worker = start_callback_delivery()
+    consumer(config["RabbitMQ"], "opencheck", callback_func, task_slots=task_slots)
+    if task_process_pool is not None:
+        task_process_pool.shutdown()
+    if delivery_worker is not None:
+        delivery_worker.stop()
     logger.info('Agents server ended.')
 
 # TODO: Add an adapter for various code platforms, like github, gitee, gitcode, etc.
\ No newline at end of file
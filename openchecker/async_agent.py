@@ -0,0 +1,558 @@
+"""
+OpenChecker asyncio agent.
+
+Alternative runtime of the agent built on one event loop: messages are
+consumed with aio-pika, network-bound checkers share one httpx.AsyncClient,
+shell based checkers run as subprocesses (through runner.run_shell, at most
+OpenCheck.async_max_subprocesses at once), and only the remaining blocking
+Python checkers go to a thread pool. The short blocking bookkeeping
+of tasks (workspaces, checkpoints, caches) has a small pool of its own, so
+tasks finish while the checker pool is busy. Many tasks can be in flight
+at once without one thread per task, which suits queues dominated by
+network-only checkers.
+
+Tasks are processed exactly like in agent.py (same dependency graph, result
+layout and acknowledgement semantics). Start it with
+``python openchecker/async_agent.py`` instead of ``agent.py``.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import aio_pika
+import httpx
+
+from agent import (
+    _abandoned_callbacks,
+    _account_runtime,
+    _build_command_switch,
+    _build_task_steps,
+    _checkout_from_mirror,
+    _download_archive,
+    _command_overrides,
+    _create_result_spool,
+    _create_task_workspace,
+    _incremental_scan,
+    _order_scan_results,
+    _preparation_plan,
+    _record_step_errors,
+    _restore_cached_results,
+    _restore_checkpoints,
+    _task_deadline,
+    _task_revision,
+    PartialResults,
+    TRANSIENT_EXCEPTIONS,
+    config,
+    get_callback_outbox,
+    get_checkpoint_store,
+    get_scan_coalescer,
+    get_resource_budget,
+    get_workspace_janitor,
+    runtime_estimates,
+    start_callback_delivery,
+)
+from checker_registry import SHELL_SCRIPT_ENTRY, get_checker
+from checkers.shell_script_checker import process_command_output
+from common import relativize_paths, shell_exec_async
+from constans import shell_script_handlers
+from logger import get_logger
+from message_queue import RETRY_ATTEMPT_HEADER, retry_attempt, retry_delays, retry_queue_name
+from preparation import download_script, partial_clone
+from result_spool import ResultSpool, StreamingBody
+from scheduler import DEADLINE_EXCEEDED, run_steps_async
+from workspace import TaskWorkspace
+
+logger = get_logger('openchecker.async_agent')
+
+class AsyncTaskRunner:
+    """Shared resources of the asyncio agent and the coroutine processing one task."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        executor: ThreadPoolExecutor,
+        max_subprocesses: int = 4,
+        housekeeping: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Args:
+            client: HTTP client shared by network-bound checkers and result callbacks
+            executor: Thread pool running blocking checkers and checkouts
+            max_subprocesses: Upper bound of concurrently running checker subprocesses
+            housekeeping: Thread pool running the short blocking bookkeeping of
+                tasks (workspaces, checkpoints, result cache, outbox), so it
+                never queues behind checkers; executor if None
+        """
+        self.client = client
+        self.executor = executor
+        self.housekeeping = housekeeping or executor
+        self.subprocesses = asyncio.Semaphore(max(1, max_subprocesses))
+        # Exchange retryable failures are published to the retry queues with, set once consuming
+        self.retry_exchange = None
+
+    async def _run_blocking(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _housekeep(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.housekeeping, func, *args)
+
+    async def _run_script(
+        self,
+        shell_script: str,
+        workspace: str,
+        timeout: Optional[float] = None,
+        stdout_path: Optional[str] = None
+    ) -> Tuple[Optional[bytes], Optional[bytes]]:
+        async with self.subprocesses:
+            return await shell_exec_async(shell_script, cwd=workspace, timeout=timeout, stdout_path=stdout_path)
+
+    async def _run_shell_script_command(
+        self,
+        command: str,
+        project_url: str,
+        payload: Dict[str, Any],
+        workspace: str,
+        timeout: Optional[float] = None
+    ) -> None:
+        shell_script = shell_script_handlers[command].format(project_url=project_url)
+        fd, stdout_path = tempfile.mkstemp(prefix="openchecker-stdout-")
+        os.close(fd)
+        try:
+            result, error = await self._run_script(
+                shell_script, workspace, timeout or get_checker(command).timeout, stdout_path
+            )
+
+            if error is None:
+                logger.info(f"{command} job done: {project_url}")
+                payload["scan_results"][command] = await self._run_blocking(
+                    process_command_output, command, stdout_path, workspace
+                )
+            else:
+                logger.error(f"{command} job failed: {project_url}, error: {error}")
+                payload["scan_results"][command] = {"error": error.decode("utf-8")}
+        finally:
+            os.remove(stdout_path)
+
+    async def execute_commands(
+        self,
+        command_list,
+        project_url: str,
+        res_payload: Dict[str, Any],
+        commit_hash: str,
+        access_token: str,
+        version_number: str,
+        workspace: str,
+        on_result=None,
+        incremental=None,
+        deadline=None
+    ) -> bool:
+        """
+        Coroutine counterpart of agent._execute_commands; on_result is a coroutine function.
+
+        Returns:
+            bool: False if the project source could not be downloaded
+        """
+        command_switch = _build_command_switch(project_url, commit_hash, access_token, workspace, command_list)
+        context = {
+            "project_url": project_url,
+            "commit_hash": commit_hash,
+            "access_token": access_token,
+            "workspace": workspace,
+            "config": config,
+            "client": self.client
+        }
+        task_workspace = TaskWorkspace(workspace, project_url)
+
+        async def run_command(command):
+            command_payload = {"scan_results": {}}
+            spec = get_checker(command)
+            native = spec.bind_async(context)
+            baseline = await self._housekeep(incremental.baseline, command) if incremental is not None else None
+            overrides = _command_overrides(command, baseline, deadline)
+            had_checkout = task_workspace.has_checkout()
+            started = time.monotonic()
+            try:
+                if native is not None:
+                    await native(command_payload, **overrides)
+                elif spec.entry == SHELL_SCRIPT_ENTRY:
+                    await self._run_shell_script_command(
+                        command, project_url, command_payload, workspace, overrides.get("timeout")
+                    )
+                else:
+                    await self._run_blocking(lambda: command_switch[command](command_payload, **overrides))
+            except Exception as e:
+                logger.error(f"Error executing command {command}: {e}")
+                command_payload["scan_results"][command] = {"error": str(e)}
+            checkout_error = task_workspace.checkout_error(command, had_checkout)
+            if checkout_error is not None:
+                command_payload["scan_results"] = {command: {"error": checkout_error}}
+            scan_results = relativize_paths(command_payload["scan_results"], workspace)
+            if baseline is not None:
+                scan_results = baseline.merge(scan_results)
+            scan_results = _account_runtime(command, scan_results, time.monotonic() - started, baseline, deadline)
+            res_payload["scan_results"].update(scan_results)
+            if on_result is not None:
+                await on_result(command, scan_results)
+
+        async def download():
+            started = time.monotonic()
+            timeout = deadline.timeout() if deadline is not None else None
+            checked_out = plan.archive and await self._run_blocking(
+                _download_archive, project_url, version_number, workspace, timeout
+            )
+            if not checked_out:
+                checked_out = await self._run_blocking(
+                    _checkout_from_mirror, project_url, version_number, workspace, timeout, plan.paths
+                )
+            if not checked_out and plan.paths is not None:
+                checked_out = await self._run_blocking(
+                    partial_clone, project_url, version_number, task_workspace.checkout,
+                    plan.paths, plan.full_history, timeout
+                )
+            if not checked_out:
+                shell_script = download_script(project_url, version_number, plan.full_history)
+                result, error = await self._run_script(shell_script, workspace, timeout)
+                if error is not None:
+                    logger.error(f"Source code download failed: {project_url}, error: {error}")
+                    raise RuntimeError("Failed to download project source")
+                logger.info(f"Source code download completed: {project_url}")
+            runtime_estimates.observe("download-checkout", time.monotonic() - started)
+
+        async def generate_lock_files():
+            shell_script = shell_script_handlers["generate-lock_files"].format(project_url=project_url)
+            started = time.monotonic()
+            result, error = await self._run_script(
+                shell_script, workspace, deadline.timeout() if deadline is not None else None
+            )
+            if error is None:
+                logger.info(f"Lock files generation completed: {project_url}")
+            else:
+                logger.error(f"Lock files generation failed: {project_url}, error: {error}")
+            runtime_estimates.observe("generate-lock_files", time.monotonic() - started)
+
+        plan = await self._housekeep(_preparation_plan, list(command_switch), incremental)
+        steps = _build_task_steps(
+            command_list, command_switch, run_command, download, generate_lock_files, deadline, plan
+        )
+        outcome = await run_steps_async(
+            steps, budget=get_resource_budget(), deadline=deadline.deadline if deadline is not None else None
+        )
+
+        _record_step_errors(outcome, command_switch, res_payload)
+        _order_scan_results(res_payload, command_list)
+
+        return outcome.get("download-checkout") in (None, DEADLINE_EXCEEDED)
+
+    async def send_results(self, callback_url: str, res_payload: Dict[str, Any], max_retries: int = 3) -> None:
+        """
+        Post results to the callback URL, retrying transport errors with exponential backoff.
+
+        With the callback outbox enabled the results are queued for the
+        background delivery worker instead.
+
+        Args:
+            callback_url: Callback URL
+            res_payload: Response payload
+            max_retries: Retries after the first attempt
+        """
+        if not callback_url:
+            return
+
+        encoding = config.get("OpenCheck", {}).get("callback_content_encoding", "identity")
+        outbox = get_callback_outbox()
+        if outbox is not None:
+            try:
+                await self._housekeep(outbox.enqueue, callback_url, res_payload, encoding)
+                return
+            except OSError as e:
+                logger.error(f"Failed to queue results, sending them directly: {e}")
+
+        delay = 1
+        for attempt in range(max_retries + 1):
+            try:
+                if isinstance(res_payload.get("scan_results"), ResultSpool):
+                    body = StreamingBody(res_payload, encoding)
+                    response = await self.client.post(callback_url, content=body.aiter(), headers=body.headers)
+                else:
+                    response = await self.client.post(callback_url, json=res_payload)
+                if response.status_code == 200:
+                    logger.info("Results sent successfully")
+                else:
+                    logger.error(f"Failed to send results: Failed to send request. Status code: {response.status_code}")
+                return
+            except httpx.TransportError as e:
+                if attempt == max_retries:
+                    logger.error(f"Exception sending results: {e}")
+                    return
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def process_task(self, body: bytes) -> Tuple[bool, Optional[str], bool]:
+        """
+        Coroutine counterpart of agent.process_task.
+
+        Args:
+            body: Message body
+
+        Returns:
+            Tuple[bool, Optional[str], bool]: (success, error_message, retryable)
+        """
+        task_workspace = None
+        project_url = None
+        scan_results = None
+        registration = None
+
+        try:
+            message = json.loads(body.decode('utf-8'))
+            command_list = message.get('command_list', [])
+            project_url = message.get('project_url')
+            callback_url = message.get('callback_url')
+            task_metadata = message.get('task_metadata', {})
+            version_number = task_metadata.get("version_number", "None")
+            deadline = _task_deadline(task_metadata)
+
+            if not project_url:
+                logger.error("Project URL is required")
+                return False, "Project URL is required", False
+
+            project_url = project_url.replace(".git", "")
+            logger.info(
+                f"Starting to process project: {project_url}",
+                extra={
+                    'extra_fields': {
+                        'project_url': project_url,
+                        'command_count': len(command_list),
+                        'commands': command_list,
+                        'callback_url': callback_url,
+                        'version_number': version_number
+                    }
+                }
+            )
+
+            coalescer = get_scan_coalescer()
+            if coalescer is not None and callback_url:
+                registration = await self._housekeep(
+                    coalescer.join, project_url, version_number, message.get("commit_hash"),
+                    command_list, callback_url, task_metadata
+                )
+                if registration is None:
+                    # The results are sent by the task already scanning this version
+                    return True, None, False
+
+            task_workspace = await self._housekeep(_create_task_workspace, project_url)
+            workspace = task_workspace.root
+            scan_results = await self._housekeep(_create_result_spool)
+
+            res_payload = {
+                "command_list": command_list,
+                "project_url": project_url,
+                "task_metadata": task_metadata,
+                "scan_results": scan_results
+            }
+
+            revision = await self._housekeep(_task_revision, project_url, version_number)
+            store = get_checkpoint_store()
+            checkpoints = (
+                store.task(project_url, version_number, message.get("commit_hash"), revision, command_list)
+                if store and revision else None
+            )
+            restored = []
+
+            def on_restore(command, results):
+                restored.append((command, results))
+
+            pending = await self._housekeep(_restore_checkpoints, checkpoints, command_list, res_payload, on_restore)
+            partial_results = (
+                PartialResults(res_payload, callback_url)
+                if callback_url and PartialResults.enabled(task_metadata) else None
+            )
+            task_cache, pending = await self._housekeep(
+                _restore_cached_results, pending, revision, project_url, message.get("commit_hash"),
+                message.get("access_token"), workspace, res_payload, on_restore
+            )
+            incremental = _incremental_scan(task_cache, task_metadata)
+            partial_lock = asyncio.Lock()
+
+            async def send_partial(command, results):
+                async with partial_lock:
+                    with partial_results.lock:
+                        payload = partial_results.partial(command, results)
+                    await self.send_results(callback_url, payload)
+
+            async def on_result(command, results):
+                if checkpoints is not None:
+                    await self._housekeep(checkpoints.save, command, get_checker(command).version, results)
+                if task_cache is not None:
+                    await self._housekeep(task_cache.save, command, results)
+                if partial_results is not None:
+                    await send_partial(command, results)
+
+            if partial_results is not None:
+                for command, results in restored:
+                    await send_partial(command, results)
+
+            downloaded = not pending or await self.execute_commands(
+                pending, project_url, res_payload, message.get("commit_hash"),
+                message.get("access_token"), version_number, workspace, on_result, incremental, deadline
+            )
+            _order_scan_results(res_payload, command_list)
+            await self._housekeep(task_workspace.cleanup, get_workspace_janitor())
+            task_workspace = None
+            if not downloaded:
+                return False, "Failed to download project source", True
+
+            await self.send_results(
+                callback_url, partial_results.complete() if partial_results is not None else res_payload
+            )
+            if registration is not None:
+                for attachment in await self._housekeep(registration.close):
+                    await self.send_results(attachment.callback_url, attachment.payload(res_payload))
+            if checkpoints is not None:
+                await self._housekeep(checkpoints.clear)
+
+            logger.info(
+                f"Project {project_url} processed successfully",
+                extra={
+                    'extra_fields': {
+                        'project_url': project_url,
+                        'command_count': len(command_list),
+                        'timestamp': datetime.now().isoformat()
+                    }
+                }
+            )
+            return True, None, False
+
+        except Exception as e:
+            logger.error(f"Error occurred while processing message: {e}", exc_info=True)
+
+            if task_workspace is not None:
+                await self._housekeep(task_workspace.cleanup, get_workspace_janitor())
+
+            return False, str(e), isinstance(e, TRANSIENT_EXCEPTIONS + (httpx.TransportError,))
+
+        finally:
+            if registration is not None:
+                await self._housekeep(registration.release)
+            if scan_results is not None:
+                await self._housekeep(scan_results.close)
+
+    async def _schedule_retry(self, message: aio_pika.abc.AbstractIncomingMessage, error_msg: str) -> bool:
+        """
+        Publish a failed message to the next retry queue, see message_queue.publish_retry.
+
+        Returns:
+            bool: False if there is no retry queue left for the message
+        """
+        delays = retry_delays(config["RabbitMQ"])
+        attempt = retry_attempt(message)
+        if self.retry_exchange is None or attempt >= len(delays):
+            return False
+        headers = dict(message.headers or {})
+        headers[RETRY_ATTEMPT_HEADER] = attempt + 1
+        headers['x-openchecker-last-error'] = str(error_msg)[:1024]
+        # Same properties as the original message, see message_queue.publish_retry
+        retry_message = aio_pika.Message(
+            message.body,
+            headers=headers,
+            content_type=message.content_type,
+            content_encoding=message.content_encoding,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            priority=message.priority,
+            correlation_id=message.correlation_id,
+            reply_to=message.reply_to,
+            message_id=message.message_id,
+            timestamp=message.timestamp,
+            type=message.type,
+            app_id=message.app_id
+        )
+        await self.retry_exchange.publish(
+            retry_message,
+            routing_key=retry_queue_name("opencheck", delays[attempt])
+        )
+        logger.warning(f"Retrying message in {delays[attempt]}s (attempt {attempt + 1}/{len(delays)}): {error_msg}")
+        return True
+
+    async def handle_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        """Process one delivery and acknowledge it, retry it later or put it to dead letters on failure."""
+        logger.info(
+            "Starting to process message queue task",
+            extra={
+                'extra_fields': {
+                    'delivery_tag': message.delivery_tag,
+                    'timestamp': datetime.now().isoformat()
+                }
+            }
+        )
+        success, error_msg, retryable = await self.process_task(message.body)
+        if success:
+            await message.ack()
+        elif retryable and await self._schedule_retry(message, error_msg):
+            await message.ack()
+        else:
+            logger.error(f"Putting message to dead letters: {error_msg}")
+            await message.nack(requeue=False)
+            for callback_url, payload in await self._housekeep(_abandoned_callbacks, message.body, error_msg):
+                await self.send_results(callback_url, payload)
+
+
+async def main(queue_name: str = "opencheck") -> None:
+    """Consume queue_name until cancelled."""
+    rabbitmq_config = config["RabbitMQ"]
+    opencheck_config = config.get("OpenCheck", {})
+    task_slots = int(opencheck_config.get("async_task_slots", 50))
+
+    connection = await aio_pika.connect_robust(
+        host=rabbitmq_config['host'],
+        port=int(rabbitmq_config['port']),
+        login=rabbitmq_config['username'],
+        password=rabbitmq_config['password'],
+        heartbeat=int(rabbitmq_config['heartbeat_interval_s'])
+    )
+    executor = ThreadPoolExecutor(
+        max_workers=int(opencheck_config.get("max_checker_workers", 4)),
+        thread_name_prefix='checker'
+    )
+    housekeeping = ThreadPoolExecutor(
+        max_workers=int(opencheck_config.get("async_housekeeping_workers", 8)),
+        thread_name_prefix='housekeeping'
+    )
+    running = set()
+    delivery_worker = start_callback_delivery()
+
+    async with connection, httpx.AsyncClient(timeout=30) as client:
+        runner = AsyncTaskRunner(
+            client, executor, int(opencheck_config.get("async_max_subprocesses", 4)), housekeeping
+        )
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=task_slots)
+        runner.retry_exchange = channel.default_exchange
+        queue = await channel.declare_queue(queue_name, passive=True)
+        logger.info(f'Waiting for messages with {task_slots} task slot(s). To exit press CTRL+C')
+
+        try:
+            async with queue.iterator() as messages:
+                async for message in messages:
+                    task = asyncio.create_task(runner.handle_message(message))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+        finally:
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            executor.shutdown(wait=True)
+            housekeeping.shutdown(wait=True)
+            if delivery_worker is not None:
+                delivery_worker.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    logger.info('Async agent server ended.')
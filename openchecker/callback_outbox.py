@@ -0,0 +1,390 @@
+"""
+Durable callback outbox.
+
+Finished result payloads are written to an outbox directory on persistent
+storage and the task's message is acknowledged right away; a background
+DeliveryWorker posts them to their callback URLs over keep-alive
+connections, several at a time and a bounded number per host, retrying
+failed deliveries with exponential backoff. A slow or unavailable callback
+receiver therefore no longer holds a task slot, and a finished scan
+survives an agent restart.
+
+Layout of the outbox directory::
+
+    tmp/        entries being written
+    pending/    <id>.json (metadata) and <id>.body (request body), ready for delivery
+    inflight/   entries claimed by a worker
+    failed/     entries that could not be delivered
+
+Entries move between the directories with atomic renames, so several agent
+processes or replicas can share one outbox: the worker whose rename into
+inflight/ succeeds owns the delivery. The worker renews its lease on the
+entry while the delivery is in progress; entries left in inflight/ by a
+worker that died are returned to pending/ after the lease expires. The body
+is removed first when an entry is delivered, so an entry without body counts
+as delivered.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from logger import get_logger
+from result_spool import StreamingBody
+
+logger = get_logger('openchecker.callback_outbox')
+
+# HTTP status codes worth retrying besides 5xx
+RETRYABLE_STATUS = (408, 425, 429)
+
+
+class CallbackOutbox:
+    """Directory of result payloads waiting for delivery."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Outbox directory, created if missing; should be on
+                persistent storage
+        """
+        self.directory = directory
+        for name in ("tmp", "pending", "inflight", "failed"):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    def _path(self, state: str, entry_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, state, entry_id + suffix)
+
+    def _write_metadata(self, state: str, entry_id: str, metadata: Dict[str, Any]) -> None:
+        tmp_path = self._path("tmp", entry_id, ".json")
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(state, entry_id, ".json"))
+
+    def enqueue(self, callback_url: str, res_payload: Dict[str, Any], encoding: str = "identity") -> str:
+        """
+        Durably store a payload for delivery.
+
+        The body is serialised (and compressed) to disk before the entry
+        becomes visible in pending/, so once this returns the payload
+        survives a crash.
+
+        Args:
+            callback_url: Callback URL
+            res_payload: Response payload, scan_results may be a ResultSpool
+            encoding: Content encoding of the stored body
+
+        Returns:
+            str: Entry id
+        """
+        entry_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex}"
+        body = StreamingBody(res_payload, encoding)
+
+        tmp_body = self._path("tmp", entry_id, ".body")
+        with open(tmp_body, "wb") as f:
+            for chunk in body:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_body, self._path("pending", entry_id, ".body"))
+
+        self._write_metadata("pending", entry_id, {
+            "callback_url": callback_url,
+            "headers": body.headers,
+            "attempts": 0,
+            "next_attempt_at": 0,
+            "created_at": time.time(),
+            "last_error": None
+        })
+        logger.info(f"Queued results for delivery to {callback_url}: {entry_id}")
+        return entry_id
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Return ids of pending entries whose next attempt is due, oldest first."""
+        now = time.time() if now is None else now
+        entries = []
+        for name in sorted(os.listdir(os.path.join(self.directory, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            entry_id = name[:-len(".json")]
+            metadata = self.metadata("pending", entry_id)
+            if metadata is not None and metadata["next_attempt_at"] <= now:
+                entries.append(entry_id)
+        return entries
+
+    def metadata(self, state: str, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata of an entry, None if it is not (or no longer) in state."""
+        try:
+            with open(self._path(state, entry_id, ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def claim(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take a pending entry for delivery.
+
+        Returns:
+            Optional[Dict[str, Any]]: Metadata, None if another worker claimed it first
+        """
+        inflight = self._path("inflight", entry_id, ".json")
+        try:
+            os.rename(self._path("pending", entry_id, ".json"), inflight)
+        except FileNotFoundError:
+            return None
+        # The lease of an inflight entry starts when it is claimed
+        os.utime(inflight)
+        return self.metadata("inflight", entry_id)
+
+    def renew(self, entry_id: str) -> None:
+        """Extend the lease of a claimed entry whose delivery is in progress."""
+        try:
+            os.utime(self._path("inflight", entry_id, ".json"))
+        except FileNotFoundError:
+            pass
+
+    def body_path(self, entry_id: str) -> str:
+        return self._path("pending", entry_id, ".body")
+
+    def complete(self, entry_id: str) -> None:
+        """Remove a delivered entry."""
+        for path in (self._path("pending", entry_id, ".body"), self._path("inflight", entry_id, ".json")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def retry(self, entry_id: str, metadata: Dict[str, Any], delay: float, error: str) -> None:
+        """Return a claimed entry to pending/ for another attempt after delay seconds."""
+        metadata = dict(metadata, attempts=metadata["attempts"] + 1,
+                        next_attempt_at=time.time() + delay, last_error=error)
+        self._write_metadata("pending", entry_id, metadata)
+        try:
+            os.remove(self._path("inflight", entry_id, ".json"))
+        except FileNotFoundError:
+            pass
+
+    def fail(self, entry_id: str, metadata: Dict[str, Any], error: str) -> None:
+        """Move a claimed entry to failed/, keeping its body for inspection."""
+        metadata = dict(metadata, attempts=metadata["attempts"] + 1, last_error=error)
+        os.replace(self._path("pending", entry_id, ".body"), self._path("failed", entry_id, ".body"))
+        self._write_metadata("failed", entry_id, metadata)
+        try:
+            os.remove(self._path("inflight", entry_id, ".json"))
+        except FileNotFoundError:
+            pass
+
+    def recover(self, lease: float) -> int:
+        """
+        Return entries claimed longer than lease seconds ago to pending/.
+
+        Returns:
+            int: Number of recovered entries
+        """
+        recovered = 0
+        inflight_dir = os.path.join(self.directory, "inflight")
+        for name in os.listdir(inflight_dir):
+            path = os.path.join(inflight_dir, name)
+            entry_id = name[:-len(".json")]
+            try:
+                if time.time() - os.path.getmtime(path) < lease:
+                    continue
+                if not os.path.exists(self.body_path(entry_id)):
+                    # Delivered by a worker that died before removing the metadata
+                    os.remove(path)
+                    continue
+                os.rename(path, self._path("pending", entry_id, ".json"))
+                recovered += 1
+            except FileNotFoundError:
+                continue
+        if recovered:
+            logger.warning(f"Recovered {recovered} abandoned callback deliveries")
+        return recovered
+
+    def __len__(self) -> int:
+        return sum(1 for n in os.listdir(os.path.join(self.directory, "pending")) if n.endswith(".json"))
+
+
+class DeliveryWorker:
+    """Background thread delivering outbox entries to their callback URLs."""
+
+    def __init__(
+        self,
+        outbox: CallbackOutbox,
+        max_deliveries: int = 8,
+        max_per_host: int = 4,
+        max_attempts: int = 10,
+        initial_delay: float = 5,
+        max_delay: float = 3600,
+        timeout: float = 300,
+        poll_interval: float = 1,
+        lease: float = 900
+    ):
+        """
+        Args:
+            outbox: Outbox to deliver from
+            max_deliveries: Deliveries in progress at once
+            max_per_host: Deliveries in progress at once to the same host
+            max_attempts: Attempts before an entry is moved to failed/
+            initial_delay: Seconds before the first retry, doubled per attempt
+            max_delay: Upper bound of the retry delay
+            timeout: Read timeout of a delivery request
+            poll_interval: Seconds between two scans of the outbox
+            lease: Seconds after which an entry claimed by a dead worker is retried
+        """
+        self.outbox = outbox
+        self.max_deliveries = max(1, max_deliveries)
+        self.max_per_host = max(1, max_per_host)
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.lease = max(lease, timeout * 2)
+
+        # One session keeps connections to each receiver alive between deliveries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_deliveries, pool_maxsize=self.max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_deliveries, thread_name_prefix='callback')
+        self._hosts: Dict[str, int] = {}
+        self._delivering: Set[str] = set()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.initial_delay * 2 ** attempts)
+        return delay * (0.5 + random.random() / 2)
+
+    def deliver(self, entry_id: str, metadata: Dict[str, Any]) -> bool:
+        """
+        Post one claimed entry and record the outcome in the outbox.
+
+        Returns:
+            bool: Whether the entry was delivered
+        """
+        url = metadata["callback_url"]
+        try:
+            body = open(self.outbox.body_path(entry_id), "rb")
+        except FileNotFoundError:
+            # Another worker delivered it after this worker's lease had expired
+            logger.info(f"Results {entry_id} for {url} were already delivered")
+            self.outbox.complete(entry_id)
+            return True
+        try:
+            with body:
+                response = self.session.post(url, data=body, headers=metadata["headers"], timeout=(10, self.timeout))
+            response.close()
+            if 200 <= response.status_code < 300:
+                self.outbox.complete(entry_id)
+                logger.info(f"Results sent successfully to {url} after {metadata['attempts'] + 1} attempt(s)")
+                return True
+            error = f"Status code: {response.status_code}"
+            retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUS
+        except requests.exceptions.RequestException as e:
+            error, retryable = str(e), True
+
+        if retryable and metadata["attempts"] + 1 < self.max_attempts:
+            delay = self._retry_delay(metadata["attempts"])
+            logger.warning(f"Failed to send results to {url} ({error}), retrying in {delay:.0f}s")
+            self.outbox.retry(entry_id, metadata, delay, error)
+        else:
+            logger.error(f"Failed to send results to {url}, giving up: {error}")
+            self.outbox.fail(entry_id, metadata, error)
+        return False
+
+    def _acquire(self, host: str) -> bool:
+        with self._lock:
+            if self._running >= self.max_deliveries or self._hosts.get(host, 0) >= self.max_per_host:
+                return False
+            self._running += 1
+            self._hosts[host] = self._hosts.get(host, 0) + 1
+            return True
+
+    def _release(self, host: str) -> None:
+        with self._lock:
+            self._running -= 1
+            self._hosts[host] -= 1
+
+    def _deliver_and_release(self, entry_id: str, metadata: Dict[str, Any], host: str) -> None:
+        with self._lock:
+            self._delivering.add(entry_id)
+        try:
+            self.deliver(entry_id, metadata)
+        except Exception as e:
+            logger.error(f"Error delivering results {entry_id}: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._delivering.discard(entry_id)
+            self._release(host)
+
+    def renew_leases(self) -> None:
+        """Extend the leases of the entries being delivered by this worker."""
+        with self._lock:
+            delivering = list(self._delivering)
+        for entry_id in delivering:
+            self.outbox.renew(entry_id)
+
+    def dispatch(self) -> int:
+        """
+        Start deliveries for due entries as far as the concurrency limits allow.
+
+        Returns:
+            int: Number of deliveries started
+        """
+        started = 0
+        for entry_id in self.outbox.due():
+            metadata = self.outbox.metadata("pending", entry_id)
+            if metadata is None:
+                continue
+            host = urlparse(metadata["callback_url"]).netloc
+            if not self._acquire(host):
+                continue
+            metadata = self.outbox.claim(entry_id)
+            if metadata is None:
+                self._release(host)
+                continue
+            self._executor.submit(self._deliver_and_release, entry_id, metadata, host)
+            started += 1
+        return started
+
+    def _run(self) -> None:
+        last_recovery = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_recovery >= self.lease / 4:
+                    self.renew_leases()
+                    self.outbox.recover(self.lease)
+                    last_recovery = time.monotonic()
+                self.dispatch()
+            except Exception as e:
+                logger.error(f"Callback delivery loop failed: {e}", exc_info=True)
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> "DeliveryWorker":
+        """Start delivering in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='callback-delivery', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop dispatching new deliveries, optionally waiting for running ones."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+        self.session.close()
@@ -0,0 +1,278 @@
+"""
+Declarative checker registry.
+
+Every checker the agent can run is described by a CheckerSpec: its command
+name, where its implementation lives, which arguments it takes, what it needs
+from the task (checkout, lock files), how much resources it uses, the key it
+writes into scan_results and a version. Implementations are referenced as
+"module:function" strings and imported only when a checker first runs, so
+an agent never pays for the dependencies of checkers it does not execute.
+
+A new checker is added with one register_checker() call below; the agent
+resolves command_list through get_checker() and needs no changes.
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from logger import get_logger
+from resources import RESOURCE_CLASSES, ResourceWeight
+
+logger = get_logger('openchecker.checker_registry')
+
+# Names of the values a checker can ask for in its args, see CheckerSpec.bind
+CONTEXT_ARGS = (
+    'command', 'project_url', 'res_payload', 'workspace', 'commit_hash', 'access_token', 'config', 'client', 'timeout',
+    'files'
+)
+# What a checker can need from the task, see preparation.py; "history" and "lockfiles" imply "clone"
+PREREQUISITES = ('clone', 'git', 'history', 'lockfiles')
+
+
+class CheckerSpec:
+    """Metadata of a checker and lazy access to its implementation."""
+
+    def __init__(
+        self,
+        name: str,
+        entry: str,
+        args: Iterable[str] = ('project_url', 'res_payload', 'workspace'),
+        prerequisites: Iterable[str] = ('clone',),
+        resource_class: str = 'light',
+        result_key: Optional[str] = None,
+        version: str = '1',
+        async_entry: Optional[str] = None,
+        async_args: Optional[Iterable[str]] = None,
+        mutates_checkout: bool = False,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        config_keys: Iterable[str] = (),
+        incremental_merge: Optional[str] = None,
+        paths: Iterable[str] = ()
+    ):
+        """
+        Args:
+            name: Command name used in command_list
+            entry: Implementation as "module:function"
+            args: Names from CONTEXT_ARGS passed positionally to the implementation
+            prerequisites: "clone" needs a checkout of the scanned version,
+                "git" needs it to be a git repository rather than a tree
+                extracted from a source archive, "history" additionally
+                needs the full history and tags,
+                "lockfiles" additionally needs generated lock files; empty for
+                checkers that only talk to remote services
+            resource_class: Key of resources.RESOURCE_CLASSES
+            result_key: Key written into scan_results, defaults to name
+            version: Version of the checker, bumped when its results change
+            async_entry: Optional coroutine implementation as "module:function"
+            async_args: Arguments of async_entry, defaults to args + ('client',)
+            mutates_checkout: Whether the checker modifies the shared checkout
+            timeout: Seconds the checker's external tool may run, passed as the
+                "timeout" argument; None for OpenCheck.command_timeout_s
+            cache_ttl: Seconds the checker's results stay in the result cache,
+                for checkers reporting external state that changes without a
+                new commit; None for the cache's TTL, 0 to never cache them
+            config_keys: "Section.option" names of the configuration the
+                checker's results depend on, part of its result cache key
+            incremental_merge: "module:function" merging the checker's results
+                of an earlier commit with those of a run restricted to the
+                changed files, see incremental.py; such checkers take "files"
+            paths: Sparse-checkout patterns (gitignore syntax) of the files the
+                checker reads; empty for checkers reading the whole tree
+        """
+        unknown = [a for a in tuple(args) + tuple(async_args or ()) if a not in CONTEXT_ARGS]
+        if unknown:
+            raise ValueError(f"Checker {name} requests unknown arguments: {unknown}")
+        if incremental_merge and 'files' not in args:
+            raise ValueError(f"Incremental checker {name} does not take the files argument")
+        if any(p not in PREREQUISITES for p in prerequisites):
+            raise ValueError(f"Checker {name} has unknown prerequisites: {prerequisites}")
+        if resource_class not in RESOURCE_CLASSES:
+            raise ValueError(f"Checker {name} has unknown resource class: {resource_class}")
+
+        self.name = name
+        self.entry = entry
+        self.args = tuple(args)
+        self.prerequisites = tuple(prerequisites)
+        self.resource_class = resource_class
+        self.result_key = result_key or name
+        self.version = version
+        self.async_entry = async_entry
+        self.async_args = tuple(async_args) if async_args is not None else self.args + ('client',)
+        self.mutates_checkout = mutates_checkout
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.config_keys = tuple(config_keys)
+        self.incremental_merge = incremental_merge
+        self.paths = tuple(paths)
+
+    def __repr__(self):
+        return f"CheckerSpec(name='{self.name}', entry='{self.entry}', version='{self.version}')"
+
+    @property
+    def weight(self) -> ResourceWeight:
+        """Resource weight of the checker's resource class."""
+        return RESOURCE_CLASSES[self.resource_class]
+
+    def load(self) -> Callable:
+        """Import and return the implementation."""
+        return _load_entry(self.entry)
+
+    def load_async(self) -> Optional[Callable]:
+        """Import and return the coroutine implementation, None if there is none."""
+        return _load_entry(self.async_entry) if self.async_entry else None
+
+    def load_merge(self) -> Optional[Callable]:
+        """Import and return the incremental merge function, None if the checker has none."""
+        return _load_entry(self.incremental_merge) if self.incremental_merge else None
+
+    def bind(self, context: Dict[str, Any]) -> Callable[..., Any]:
+        """
+        Build the handler called with the payload the checker writes into.
+
+        Args:
+            context: Values of CONTEXT_ARGS for the current task, without res_payload
+
+        Returns:
+            Callable[..., Any]: handler(payload, **overrides), where overrides
+            replace context values of this call, e.g. files
+        """
+        return self._bind(self.load, self.args, context)
+
+    def bind_async(self, context: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], Any]]:
+        """Coroutine counterpart of bind, None if the checker has no coroutine implementation."""
+        if not self.async_entry:
+            return None
+        return self._bind(self.load_async, self.async_args, context)
+
+    def _bind(self, load, args, context):
+        def handler(payload, **overrides):
+            values = dict(context, command=self.name, res_payload=payload, timeout=self.timeout)
+            values.update(overrides)
+            return load()(*(values.get(arg) for arg in args))
+        return handler
+
+
+_registry: Dict[str, CheckerSpec] = {}
+_loaded: Dict[str, Callable] = {}
+_load_lock = threading.Lock()
+
+
+def _load_entry(entry: str) -> Callable:
+    with _load_lock:
+        if entry not in _loaded:
+            module_name, _, attribute = entry.partition(':')
+            logger.debug(f"Loading checker implementation {entry}")
+            _loaded[entry] = getattr(importlib.import_module(module_name), attribute)
+        return _loaded[entry]
+
+
+def register_checker(name: str, entry: str, **metadata: Any) -> CheckerSpec:
+    """
+    Register a checker; see CheckerSpec for the accepted metadata.
+
+    Raises:
+        ValueError: If a checker with the same name is already registered
+    """
+    if name in _registry:
+        raise ValueError(f"Checker already registered: {name}")
+    spec = CheckerSpec(name, entry, **metadata)
+    _registry[name] = spec
+    return spec
+
+
+def get_checker(name: str) -> Optional[CheckerSpec]:
+    """Return the spec of a registered checker, None for unknown names."""
+    return _registry.get(name)
+
+
+def list_checkers() -> List[CheckerSpec]:
+    """Return all registered checkers in registration order."""
+    return list(_registry.values())
+
+
+SHELL_SCRIPT_ENTRY = 'checkers.shell_script_checker:shell_script_checker'
+SHELL_SCRIPT_ARGS = ('command', 'project_url', 'res_payload', 'workspace', 'timeout')
+# Results of network-only checkers reflect remote state and are cached for an hour only
+NETWORK_ONLY = dict(prerequisites=(), resource_class='network', cache_ttl=3600)
+# Workflow directories of GitHub/GitCode (.<platform>/workflows) and Gitee (.workflows), see common.list_workflow_files
+WORKFLOW_PATHS = ('/.*/workflows/', '/.workflows/')
+
+register_checker('binary-checker', 'checkers.binary_checker:binary_checker',
+                 args=('project_url', 'res_payload', 'workspace', 'timeout', 'files'), resource_class='medium',
+                 timeout=1800, incremental_merge='checkers.binary_checker:merge_binary_findings')
+register_checker('release-checker', 'checkers.release_checker:release_checker',
+                 args=('project_url', 'res_payload'), **NETWORK_ONLY)
+register_checker('url-checker', 'checkers.url_checker:url_checker',
+                 args=('project_url', 'res_payload'), async_entry='checkers.url_checker:url_checker_async',
+                 **NETWORK_ONLY)
+# Maven and Gradle projects are built for the scan (target/, build/ in the checkout)
+register_checker('sonar-scanner', 'checkers.sonar_checker:sonar_checker',
+                 args=('project_url', 'res_payload', 'config', 'workspace', 'timeout'), resource_class='heavy',
+                 mutates_checkout=True, config_keys=('SonarQube.host', 'SonarQube.port'))
+# osv-scanner renames lock files while it runs and its findings change with the vulnerability database
+register_checker('osv-scanner', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS,
+                 prerequisites=('clone', 'lockfiles'), resource_class='medium', mutates_checkout=True,
+                 timeout=900, cache_ttl=3600)
+register_checker('scancode', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS, resource_class='large', timeout=3600,
+                 config_keys=('OpenCheck.scancode_output',))
+register_checker('dependency-checker', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS,
+                 prerequisites=('clone', 'lockfiles'), resource_class='heavy', timeout=3600)
+register_checker('readme-checker', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS, timeout=300, paths=('README*',))
+# Sparse-checkout patterns are case-sensitive, the script matches these names case-insensitively
+register_checker('maintainers-checker', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS, timeout=300,
+                 paths=('[Mm][Aa][Ii][Nn][Tt][Aa][Ii][Nn][Ee][Rr][Ss]*',
+                        '[Cc][Oo][Mm][Mm][Ii][Tt][Tt][Ee][Rr][Ss]*', '*[Oo][Ww][Nn][Ee][Rr][Ss]*'))
+# github-linguist reads the tree from the git repository
+register_checker('languages-detector', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS, resource_class='medium',
+                 prerequisites=('clone', 'git'), timeout=600)
+register_checker('oat-scanner', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS, resource_class='medium', timeout=1800)
+register_checker('license-detector', SHELL_SCRIPT_ENTRY, args=SHELL_SCRIPT_ARGS,
+                 resource_class='medium', timeout=600, paths=('/*', '!/*/'))
+# Documents in the root, doc/ and docs/ directories
+DOCUMENT_PATHS = ('/*.md', '/*.markdown', '/doc/*.md', '/doc/*.markdown', '/docs/*.md', '/docs/*.markdown')
+register_checker('api-doc-checker', 'checkers.document_checker:api_doc_checker', paths=DOCUMENT_PATHS)
+register_checker('build-doc-checker', 'checkers.document_checker:build_doc_checker', paths=DOCUMENT_PATHS)
+register_checker('readme-opensource-checker', 'checkers.document_checker:readme_opensource_checker',
+                 paths=('/README.OpenSource',))
+register_checker('bestpractices-checker', 'checkers.bestpractices_checker:bestpractices_checker',
+                 args=('project_url', 'res_payload'),
+                 async_entry='checkers.bestpractices_checker:bestpractices_checker_async', **NETWORK_ONLY)
+register_checker('dangerous-workflow-checker', 'checkers.dangerous_workflow_checker:dangerous_workflow_checker',
+                 paths=WORKFLOW_PATHS)
+register_checker('dependency-update-tool-checker',
+                 'checkers.dependency_update_tool_checker:dependency_update_tool_checker',
+                 paths=('dependabot.y*ml', 'renovate.json*', '.renovaterc*', '.pyup.yml', '*scala-steward.conf'))
+register_checker('fuzzing-checker', 'checkers.fuzzing_checker:fuzzing_checker')
+register_checker('packaging-checker', 'checkers.packaging_checker:packaging_checker', paths=WORKFLOW_PATHS)
+register_checker('pinned-dependencies-checker', 'checkers.pinned_dependencies_checker:pinned_dependencies_checker',
+                 args=('project_url', 'res_payload', 'workspace', 'files'),
+                 incremental_merge='checkers.pinned_dependencies_checker:merge_pinned_dependencies')
+register_checker('sast-checker', 'checkers.sast_checker:sast_checker', paths=WORKFLOW_PATHS + ('pom.xml',))
+register_checker('security-policy-checker', 'checkers.security_policy_checker:security_policy_checker',
+                 paths=('[Ss][Ee][Cc][Uu][Rr][Ii][Tt][Yy].*',))
+register_checker('token-permissions-checker', 'checkers.token_permissions_checker:token_permissions_checker',
+                 paths=WORKFLOW_PATHS)
+register_checker('webhooks-checker', 'checkers.webhooks_checker:webhooks_checker',
+                 args=('project_url', 'res_payload', 'access_token'),
+                 async_entry='checkers.webhooks_checker:webhooks_checker_async', **NETWORK_ONLY)
+register_checker('changed-files-since-commit-detector', 'checkers.changed_files_checker:changed_files_detector',
+                 args=('project_url', 'res_payload', 'commit_hash', 'workspace'), prerequisites=('history',))
+register_checker('criticality-score', 'checkers.standard_command_checker:criticality_score_checker',
+                 args=('project_url', 'res_payload', 'timeout'), prerequisites=(), resource_class='light',
+                 cache_ttl=3600)
+register_checker('scorecard-score', 'checkers.standard_command_checker:scorecard_score_checker',
+                 args=('project_url', 'res_payload', 'timeout'), prerequisites=(), resource_class='light',
+                 cache_ttl=3600)
+register_checker('code-count', 'checkers.standard_command_checker:code_count_checker', resource_class='medium')
+register_checker('package-info', 'checkers.standard_command_checker:package_info_checker',
+                 args=('project_url', 'res_payload'), **NETWORK_ONLY)
+register_checker('ohpm-info', 'checkers.standard_command_checker:ohpm_info_checker',
+                 args=('project_url', 'res_payload'), **NETWORK_ONLY)
+register_checker('repo-country-organizations', 'checkers.standard_command_checker:repo_country_organizations_checker',
+                 args=('project_url', 'res_payload'),
+                 async_entry='checkers.standard_command_checker:repo_country_organizations_checker_async',
+                 **NETWORK_ONLY)
+register_checker('eol-checker', 'checkers.standard_command_checker:eol_checker',
+                 args=('project_url', 'res_payload'), **NETWORK_ONLY)
@@ -23,4 +23,22 @@ def bestpractices_checker(project_url: str, res_payload: dict) -> None:
         else:
             res_payload["scan_results"][COMMAND] = {}
     except Exception as e:
-        res_payload["scan_results"][COMMAND] = {}
\ No newline at end of file
+        res_payload["scan_results"][COMMAND] = {}
+
+
+async def bestpractices_checker_async(project_url: str, res_payload: dict, client) -> None:
+    """
+    bestpractices_checker 的协程版本，供 asyncio agent 使用, client 为 httpx.AsyncClient
+    """
+    api_url = f"https://www.bestpractices.dev/projects.json?url={project_url}"
+    try:
+        response = await client.get(api_url, timeout=10, follow_redirects=True)
+        response.raise_for_status()
+        
+        data = response.json()
+        if data and len(data) > 0:
+            res_payload["scan_results"][COMMAND] = data[0]
+        else:
+            res_payload["scan_results"][COMMAND] = {}
+    except Exception as e:
+        res_payload["scan_results"][COMMAND] = {}
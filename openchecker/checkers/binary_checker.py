@@ -1,42 +1,90 @@
 import os
-from typing import Dict, List, Tuple
-from common import shell_exec
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple
 from logger import get_logger
+from runner import run_shell
 
 logger = get_logger('openchecker.checkers.binary_checker')
 
 
-def binary_checker(project_url: str, res_payload: dict) -> None:
+def binary_checker(
+    project_url: str,
+    res_payload: dict,
+    workspace: str = ".",
+    timeout: Optional[float] = None,
+    files: Optional[List[str]] = None
+) -> None:
     """
     Binary file checker
     
+    The script output is streamed to a temporary file and parsed line by line.
+    
     Args:
         project_url: Project URL
         res_payload: Response payload
+        workspace: Directory containing the project checkout
+        timeout: Seconds the script may run, None for the configured default
+        files: Paths relative to the checkout to examine, None for the whole checkout
     """
+    file_list = None
     try:
         file_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(os.path.dirname(file_dir))
         binary_checker_script = os.path.join(project_root, "scripts", "binary_checker.sh")
 
-        result, error = shell_exec(binary_checker_script, project_url)
-        if error is None:
-            logger.info(f"binary-checker job done: {project_url}")
-            # Process special output format of binary checker
-            result_str = result.decode('utf-8') if result else ""
-            data_list = result_str.split('\n')
-            binary_file_list = []
-            binary_archive_list = []
-            for data in data_list[:-1]:
-                if "Binary file found:" in data:
-                    binary_file_list.append(data.split(": ")[1])
-                elif "Binary archive found:" in data:
-                    binary_archive_list.append(data.split(": ")[1])
-            binary_result = {"binary_file_list": binary_file_list, "binary_archive_list": binary_archive_list}
-            res_payload["scan_results"]["binary-checker"] = binary_result
-        else:
-            logger.error(f"binary-checker job failed: {project_url}, error: {error}")
-            res_payload["scan_results"]["binary-checker"] = {"error": error.decode("utf-8")}
+        param = project_url
+        if files is not None:
+            with tempfile.NamedTemporaryFile("w", prefix="openchecker-files-", delete=False) as f:
+                f.writelines(path + "\n" for path in files)
+            file_list = f.name
+            param = f"{project_url} {file_list}"
+
+        result = run_shell(binary_checker_script, param, cwd=workspace, timeout=timeout, stdout_to_file=True)
+        try:
+            if result.ok:
+                logger.info(f"binary-checker job done: {project_url}")
+                # Process special output format of binary checker
+                binary_file_list = []
+                binary_archive_list = []
+                with open(result.stdout_path, encoding='utf-8', errors='replace') as output:
+                    for data in output:
+                        data = data.rstrip('\n')
+                        if "Binary file found:" in data:
+                            binary_file_list.append(data.split(": ")[1])
+                        elif "Binary archive found:" in data:
+                            binary_archive_list.append(data.split(": ")[1])
+                binary_result = {"binary_file_list": binary_file_list, "binary_archive_list": binary_archive_list}
+                res_payload["scan_results"]["binary-checker"] = binary_result
+            else:
+                logger.error(f"binary-checker job failed: {project_url}, error: {result.stderr}")
+                res_payload["scan_results"]["binary-checker"] = {"error": result.stderr.decode("utf-8")}
+        finally:
+            result.cleanup()
     except Exception as e:
         logger.error(f"binary-checker job failed: {project_url}, error: {e}")
-        res_payload["scan_results"]["binary-checker"] = {"error": str(e)} 
\ No newline at end of file
+        res_payload["scan_results"]["binary-checker"] = {"error": str(e)}
+    finally:
+        if file_list is not None:
+            os.remove(file_list)
+
+
+def merge_binary_findings(previous: dict, current: dict, touched: Set[str]) -> dict:
+    """
+    Merge binary-checker results of an earlier commit with a run over the changed files.
+
+    Findings are reported as "<project>/<path>"; earlier findings of touched
+    paths are dropped.
+
+    Args:
+        previous: Results of the earlier commit
+        current: Results of the run over the changed files
+        touched: Paths relative to the checkout changed since the earlier commit
+
+    Returns:
+        dict: Results for the whole checkout
+    """
+    merged = {}
+    for key in ("binary_file_list", "binary_archive_list"):
+        kept = [p for p in previous.get(key, []) if p.split("/", 1)[-1] not in touched]
+        merged[key] = kept + [p for p in current.get(key, []) if p not in kept]
+    return merged 
\ No newline at end of file
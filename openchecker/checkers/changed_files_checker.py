@@ -7,7 +7,7 @@ from logger import get_logger
 logger = get_logger('openchecker.checkers.changed_files_checker')
 
 
-def changed_files_detector(project_url: str, res_payload: dict, commit_hash: str) -> None:
+def changed_files_detector(project_url: str, res_payload: dict, commit_hash: str, workspace: str = ".") -> None:
     """
     Changed files detector
     
@@ -15,30 +15,26 @@ def changed_files_detector(project_url: str, res_payload: dict, commit_hash: str
         project_url: Project URL
         res_payload: Response payload
         commit_hash: Commit hash
+        workspace: Directory containing the project checkout
     """
     if not commit_hash:
         logger.error("changed-files-since-commit-detector job failed: fail to get commit hash!")
         res_payload["scan_results"]["changed-files-since-commit-detector"] = {"error": "No commit hash provided"}
         return
     
-    context_path = os.getcwd()
-    try:
-        repository_path = os.path.join(context_path, os.path.splitext(os.path.basename(urlparse(project_url).path))[0])
-        os.chdir(repository_path)
-        logger.info(f"change os path to git repository directory: {repository_path}")
-    except OSError as e:
-        logger.error(f"failed to change os path to git repository directory: {e}")
-        res_payload["scan_results"]["changed-files-since-commit-detector"] = {"error": str(e)}
+    repository_path = os.path.join(workspace, os.path.splitext(os.path.basename(urlparse(project_url).path))[0])
+    if not os.path.isdir(repository_path):
+        error = f"git repository directory not found: {repository_path}"
+        logger.error(f"changed-files-since-commit-detector job failed: {error}")
+        res_payload["scan_results"]["changed-files-since-commit-detector"] = {"error": error}
         return
 
     # Get different types of changed files
-    changed_files = _get_diff_files(commit_hash, "ACDMRTUXB")
-    new_files = _get_diff_files(commit_hash, "A")
-    rename_files = _get_diff_files(commit_hash, "R")
-    deleted_files = _get_diff_files(commit_hash, "D")
-    modified_files = _get_diff_files(commit_hash, "M")
-
-    os.chdir(context_path)
+    changed_files = _get_diff_files(commit_hash, "ACDMRTUXB", repository_path)
+    new_files = _get_diff_files(commit_hash, "A", repository_path)
+    rename_files = _get_diff_files(commit_hash, "R", repository_path)
+    deleted_files = _get_diff_files(commit_hash, "D", repository_path)
+    modified_files = _get_diff_files(commit_hash, "M", repository_path)
 
     res_payload["scan_results"]["changed-files-since-commit-detector"] = {
         "changed_files": changed_files,
@@ -51,7 +47,7 @@ def changed_files_detector(project_url: str, res_payload: dict, commit_hash: str
     logger.info(f"changed-files-since-commit-detector job done: {project_url}")
 
 
-def _get_diff_files(commit_hash: str, type: str = "ACDMRTUXB") -> List[str]:
+def _get_diff_files(commit_hash: str, type: str = "ACDMRTUXB", repository_path: str = None) -> List[str]:
     """
     Get changed files of specified type
     
@@ -61,6 +57,7 @@ def _get_diff_files(commit_hash: str, type: str = "ACDMRTUXB") -> List[str]:
             Added (A), Copied (C), Deleted (D), Modified (M), Renamed (R),
             have their type changed (T), are Unmerged (U), are Unknown (X), 
             or have had their pairing Broken (B).
+        repository_path (str): Git repository directory, defaults to the current directory
             
     Returns:
         list: Changed files list
@@ -69,7 +66,8 @@ def _get_diff_files(commit_hash: str, type: str = "ACDMRTUXB") -> List[str]:
         result = subprocess.check_output(
             ["git", "diff", "--name-only", f"--diff-filter={type}", f"{commit_hash}..HEAD"],
             stderr=subprocess.STDOUT,
-            text=True
+            text=True,
+            cwd=repository_path
         )
         return result.strip().split("\n") if result else []
     except subprocess.CalledProcessError as e:
@@ -1,3 +1,4 @@
+import os
 import re
 import yaml
 from pathlib import Path
@@ -189,12 +190,13 @@ def check_workflow_file(workflow_file: Path, repo_path: str, platform_type: str)
 
 
 
-def dangerous_workflow_checker(project_url: str, res_payload: dict) -> None:
+def dangerous_workflow_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     检查仓库中的危险工作流,
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#dangerous-workflow
     """
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     workflow_files = list_workflow_files(repo_path, platform_type)
     workflows_file_detail = []
@@ -168,13 +168,14 @@ def _check_dependency_files(repo_path: str) -> List[Dict[str, Any]]:
 
     
 
-def dependency_update_tool_checker(project_url: str, res_payload: dict) -> None:
+def dependency_update_tool_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     依赖关系更新工具检查
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#dependency-update-tool
     """
     
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     dependency_tools = _check_dependency_files(repo_path)
     
     res_payload["scan_results"][COMMAND] = dependency_tools
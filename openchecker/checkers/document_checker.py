@@ -1,5 +1,4 @@
 import os
-import subprocess
 import json
 from typing import List, Tuple, Any
 from exponential_backoff import completion_with_backoff
@@ -8,21 +7,22 @@ from logger import get_logger
 logger = get_logger('openchecker.checkers.document_checker')
 
 
-def check_doc_content(project_url: str, doc_type: str) -> Tuple[List[str], str]:
+def check_doc_content(project_url: str, doc_type: str, workspace: str = ".") -> Tuple[List[str], str]:
     """
     Check document content for specified type
     
     Args:
         project_url: Project URL
         doc_type: Document type ("api-doc" or "build-doc")
+        workspace: Directory containing the project checkout
         
     Returns:
         Tuple[List[str], str]: (satisfied_doc_files, error_message)
     """
-    project_name = os.path.basename(project_url).replace('.git', '')
+    project_name = os.path.join(workspace, os.path.basename(project_url).replace('.git', ''))
 
-    if not os.path.exists(project_name):
-        subprocess.run(["git", "clone", project_url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not os.path.isdir(project_name):
+        return [], f"Project checkout not found: {project_name}"
 
     dir_list = [project_name, project_name + '/' + 'doc', project_name + '/' + 'docs']
 
@@ -94,20 +94,21 @@ def check_doc_content(project_url: str, doc_type: str) -> Tuple[List[str], str]:
     return satisfied_doc_file, None
 
 
-def check_readme_opensource(project_url: str) -> Tuple[bool, str]:
+def check_readme_opensource(project_url: str, workspace: str = ".") -> Tuple[bool, str]:
     """
     Check if README.OpenSource file exists and is properly formatted
     
     Args:
         project_url: Project URL
+        workspace: Directory containing the project checkout
         
     Returns:
         Tuple[bool, str]: (is_valid, error_message)
     """
-    project_name = os.path.basename(project_url).replace('.git', '')
+    project_name = os.path.join(workspace, os.path.basename(project_url).replace('.git', ''))
 
-    if not os.path.exists(project_name):
-        subprocess.run(["git", "clone", project_url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not os.path.isdir(project_name):
+        return False, f"Project checkout not found: {project_name}"
     readme_file = os.path.join(project_name, "README.OpenSource")
     if os.path.isfile(readme_file):
         with open(readme_file, 'r', encoding='utf-8') as file:
@@ -137,16 +138,17 @@ def check_readme_opensource(project_url: str) -> Tuple[bool, str]:
         return False, "README.OpenSource does not exist."
 
 
-def api_doc_checker(project_url: str, res_payload: dict) -> None:
+def api_doc_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     API document checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
+        workspace: Directory containing the project checkout
     """
     try:
-        result, error = check_doc_content(project_url, "api-doc")
+        result, error = check_doc_content(project_url, "api-doc", workspace)
         if error is None:
             logger.info(f"api-doc-checker job done: {project_url}")
             res_payload["scan_results"]["api-doc-checker"] = result
@@ -158,16 +160,17 @@ def api_doc_checker(project_url: str, res_payload: dict) -> None:
         res_payload["scan_results"]["api-doc-checker"] = {"error": str(e)}
 
 
-def build_doc_checker(project_url: str, res_payload: dict) -> None:
+def build_doc_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     Build document checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
+        workspace: Directory containing the project checkout
     """
     try:
-        result, error = check_doc_content(project_url, "build-doc")
+        result, error = check_doc_content(project_url, "build-doc", workspace)
         if error is None:
             logger.info(f"build-doc-checker job done: {project_url}")
             res_payload["scan_results"]["build-doc-checker"] = {"build-doc-checker": result} if result else {}
@@ -179,16 +182,17 @@ def build_doc_checker(project_url: str, res_payload: dict) -> None:
         res_payload["scan_results"]["build-doc-checker"] = {"error": str(e)}
 
 
-def readme_opensource_checker(project_url: str, res_payload: dict) -> None:
+def readme_opensource_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     README.OpenSource checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
+        workspace: Directory containing the project checkout
     """
     try:
-        result, error = check_readme_opensource(project_url)
+        result, error = check_readme_opensource(project_url, workspace)
         if error is None:
             logger.info(f"readme-opensource-checker job done: {project_url}")
             res_payload["scan_results"]["readme-opensource-checker"] = {"readme-opensource-checker": result} if result else {}
@@ -186,14 +186,15 @@ def check_file_content(file_path: str, func_pattern: str) -> bool:
     
     
 
-def fuzzing_checker(project_url: str, res_payload: dict) -> None:
+def fuzzing_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     执行模糊测试检查
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#fuzzing
     """
     
     all_results = []
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     
     # 检测 ClusterFuzzLite
     cfl_result = check_clusterfuzz_lite(repo_path)
@@ -201,7 +202,7 @@ def fuzzing_checker(project_url: str, res_payload: dict) -> None:
     
     # 检测语言特定的模糊测试
     shell_script = shell_script_handlers["languages-detector"].format(project_url=project_url)
-    result, error = shell_exec(shell_script)
+    result, error = shell_exec(shell_script, cwd=workspace)
     if error is None:
         languages = result
     else:
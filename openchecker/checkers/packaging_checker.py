@@ -1,3 +1,4 @@
+import os
 import re
 from typing import List, Dict, Tuple, Any
 from pathlib import Path
@@ -167,14 +168,15 @@ def is_packaging_workflow(file_path: str) -> Dict[str, Any]:
 
 
 
-def packaging_checker(project_url: str, res_payload: dict) -> None:
+def packaging_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     执行打包检查
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#packaging
     """
     
     packaging_workflow_data = []
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     workflow_files = list_workflow_files(repo_path, platform_type)
     for file_path in workflow_files:
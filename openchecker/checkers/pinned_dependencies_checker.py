@@ -1,7 +1,9 @@
+import os
 import re
 import yaml
 import json
-from typing import List, Dict, Tuple, Any
+from fnmatch import fnmatch
+from typing import List, Dict, Tuple, Any, Optional, Set
 from pathlib import Path
 from common import get_platform_type, list_workflow_files
 from platform_adapter import platform_manager
@@ -207,12 +209,13 @@ def _find_download_commands(line: str) -> List[Tuple[str, bool]]:
     return downloads
 
 
-def collect_dependencies(repo_path: str, platform_type: str) -> List[Dict[str, Any]]:
+def collect_dependencies(repo_path: str, platform_type: str, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     收集项目中的所有依赖信息
     
     Args:
         repo_path: 项目根目录路径
+        files: 只检查这些文件（相对项目根目录的路径），None 表示检查整个项目
         
     Returns:
         依赖列表
@@ -221,28 +224,44 @@ def collect_dependencies(repo_path: str, platform_type: str) -> List[Dict[str, A
     repo_path = Path(repo_path)
     
     # 收集 Actions 依赖
-    dependencies.extend(_collect_actions(repo_path, platform_type))
+    dependencies.extend(_collect_actions(repo_path, platform_type, files))
     
     # 收集 Docker 依赖
-    dependencies.extend(_collect_docker_dependencies(repo_path))
+    dependencies.extend(_collect_docker_dependencies(repo_path, files))
     
     # 收集 Python 依赖
-    dependencies.extend(_collect_python_dependencies(repo_path))
+    dependencies.extend(_collect_python_dependencies(repo_path, files))
     
     # 收集 Node.js 依赖
-    dependencies.extend(_collect_nodejs_dependencies(repo_path))
+    dependencies.extend(_collect_nodejs_dependencies(repo_path, files))
     
     # 收集脚本下载依赖
-    dependencies.extend(_collect_script_downloads(repo_path))
+    dependencies.extend(_collect_script_downloads(repo_path, files))
     
     return dependencies
 
 
-def _collect_actions(repo_path: Path, platform_type: str) -> List[Dict[str, Any]]:
+def _find_files(repo_path: Path, patterns: List[str], files: Optional[List[str]] = None) -> List[Path]:
+    """查找文件名匹配模式的文件；files 不为 None 时只在这些文件中查找，不遍历整个项目"""
+    if files is None:
+        found = []
+        for pattern in patterns:
+            found.extend(repo_path.rglob(pattern))
+        return found
+    return [
+        repo_path / f for f in files
+        if any(fnmatch(os.path.basename(f), pattern) for pattern in patterns) and (repo_path / f).is_file()
+    ]
+
+
+def _collect_actions(repo_path: Path, platform_type: str, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """收集 Actions 工作流中的依赖"""
     dependencies = []
     
     workflow_files = list_workflow_files(repo_path, platform_type)
+    if files is not None:
+        selected = set(files)
+        workflow_files = [f for f in workflow_files if os.path.relpath(f, repo_path) in selected]
     for workflow_file in workflow_files:
         try:
             with open(workflow_file, 'r', encoding='utf-8') as f:
@@ -290,12 +309,12 @@ def _collect_actions(repo_path: Path, platform_type: str) -> List[Dict[str, Any]
 
 
 
-def _collect_docker_dependencies(repo_path: Path) -> List[Dict[str, Any]]:
+def _collect_docker_dependencies(repo_path: Path, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """收集 Docker 文件中的依赖"""
     dependencies = []
     
     # 查找 Dockerfile 和 docker-compose.yml
-    docker_files = list(repo_path.rglob("Dockerfile*")) + list(repo_path.rglob("docker-compose*.yml"))
+    docker_files = _find_files(repo_path, ["Dockerfile*", "docker-compose*.yml"], files)
     
     for docker_file in docker_files:
         try:
@@ -335,38 +354,35 @@ def _collect_docker_dependencies(repo_path: Path) -> List[Dict[str, Any]]:
     return dependencies
 
 
-def _collect_python_dependencies(repo_path: Path) -> List[Dict[str, Any]]:
+def _collect_python_dependencies(repo_path: Path, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """收集 Python 包依赖"""
     dependencies = []
     
     # 处理 requirements.txt 文件
-    for req_file in repo_path.rglob("requirements*.txt"):
+    for req_file in _find_files(repo_path, ["requirements*.txt"], files):
         dependencies.extend(_parse_requirements_file(req_file))
     
     return dependencies
 
 
-def _collect_nodejs_dependencies(repo_path: Path) -> List[Dict[str, Any]]:
+def _collect_nodejs_dependencies(repo_path: Path, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """收集 Node.js 包依赖"""
     dependencies = []
     
     # 处理 package.json 文件
-    for package_file in repo_path.rglob("package.json"):
+    for package_file in _find_files(repo_path, ["package.json"], files):
         dependencies.extend(_parse_package_json(package_file))
     
     return dependencies
 
 
-def _collect_script_downloads(repo_path: Path) -> List[Dict[str, Any]]:
+def _collect_script_downloads(repo_path: Path, files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """收集脚本中的下载依赖"""
     dependencies = []
     
     # 查找脚本文件
     script_patterns = ["*.sh", "*.bash", "*.py", "*.js"]
-    script_files = []
-    
-    for pattern in script_patterns:
-        script_files.extend(repo_path.rglob(pattern))
+    script_files = _find_files(repo_path, script_patterns, files)
     
     for script_file in script_files:
         try:
@@ -471,19 +487,44 @@ def analyze_pinning(dependencies: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 
 
-def pinned_dependencies_checker(project_url: str, res_payload: dict) -> None:
+def pinned_dependencies_checker(project_url: str, res_payload: dict, workspace: str = ".",
+                                files: Optional[List[str]] = None) -> None:
     """
     检查项目依赖是否固定到特定版本/哈希值
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#pinned_dependencies
+
+    files 不为 None 时只检查这些文件（增量扫描），结果由 merge_pinned_dependencies 与上次结果合并
     """
     
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     
-    dependencies = collect_dependencies(repo_path, platform_type)
+    dependencies = collect_dependencies(repo_path, platform_type, files)
     analysis_results = analyze_pinning(dependencies)
     
     res_payload["scan_results"][COMMAND] = {
         "analysis_results": analysis_results,
         "dependencies": dependencies
     }
+
+
+def merge_pinned_dependencies(previous: dict, current: dict, touched: Set[str]) -> dict:
+    """
+    合并上次提交的检查结果与本次只检查变更文件的结果
+
+    Args:
+        previous: 上次提交的检查结果
+        current: 本次对变更文件的检查结果
+        touched: 自上次提交以来变更的文件（相对项目根目录的路径）
+
+    Returns:
+        整个项目的检查结果
+    """
+    # 结果中的文件路径形如 "<项目名>/<相对路径>"
+    kept = [d for d in previous.get("dependencies", []) if d['file_path'].split('/', 1)[-1] not in touched]
+    dependencies = kept + current.get("dependencies", [])
+    return {
+        "analysis_results": analyze_pinning(dependencies),
+        "dependencies": dependencies
+    }
@@ -1,3 +1,4 @@
+import os
 import re
 import yaml
 from typing import List, Dict, Tuple, Any
@@ -109,12 +110,13 @@ def detect_sonar_config(project_dir: str) -> List[Dict]:
 
 
 
-def sast_checker(project_url: str, res_payload: dict) -> None:
+def sast_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """ 
     SAST 工具检查 
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#sast
     """
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     
     workflows = detect_workflows(repo_path, platform_type)
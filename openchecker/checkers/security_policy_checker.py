@@ -84,13 +84,14 @@ def analyze_security_policy_content(file_path: str) -> Dict:
     }
 
 
-def security_policy_checker(project_url: str, res_payload: dict) -> None:
+def security_policy_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """ 
     Security-Policy 指标检测 
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#security_policy
     """
     
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     policy_files = find_security_policy_files(repo_path, platform_type)
     content_analysis = {}
@@ -0,0 +1,315 @@
+"""
+Checkers implemented as shell scripts (see constans.shell_script_handlers) and
+the post-processing of their output.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+import json_stream
+from common import shell_exec
+from constans import dependency_license_detector_shell_script, shell_script_handlers
+from helper import read_config
+from logger import get_logger
+from runner import run_shell
+
+logger = get_logger('openchecker.checkers.shell_script_checker')
+
+config_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "config", "config.ini")
+
+# Per-file fields kept from scancode results in summary mode
+SCANCODE_FILE_FIELDS = (
+    "path", "type", "detected_license_expression", "detected_license_expression_spdx",
+    "percentage_of_license_text"
+)
+
+
+def _scancode_output_mode() -> str:
+    """OpenCheck.scancode_output: "full" keeps scancode's result, "summary" keeps per-file findings."""
+    return read_config(config_file).get("OpenCheck", {}).get("scancode_output", "full")
+
+
+def get_licenses_name(data: Dict[str, Any]) -> str:
+    """
+    Extract license name from license data.
+    
+    Args:
+        data: License data dictionary
+        
+    Returns:
+        License name or None if not found
+    """
+    return next(
+        (license['meta']['title'] 
+         for license in data.get('licenses', []) 
+         if license.get('meta', {}).get('title')), 
+        None
+    )
+
+
+def _detect_missing_licenses(packages: List[Dict[str, Any]], workspace: str = ".") -> None:
+    """
+    Detect licenses of packages without declared licenses from their GitHub repositories.
+    
+    The repositories are cloned into a directory of their own below the
+    workspace, so a dependency named like the project never replaces the
+    task's checkout, and removed afterwards.
+
+    Args:
+        packages: ORT packages, updated in place
+        workspace: Task workspace directory
+    """
+    github_url_pattern = "https://github.com/"
+    
+    for item in packages:
+        declared_licenses = item["declared_licenses"]
+        homepage_url = item.get('homepage_url', '')
+        vcs_url = item.get('vcs_processed', {}).get('url', '').replace('.git', '')
+
+        # Check if declared_licenses is empty
+        if not declared_licenses or len(declared_licenses) == 0:
+            # Prioritize checking if vcs_url is a GitHub address
+            if vcs_url.startswith(github_url_pattern):
+                project_url = vcs_url
+            elif homepage_url.startswith(github_url_pattern):
+                project_url = homepage_url
+            else:
+                project_url = None
+                
+            # If a valid GitHub address is found, clone the repository and call licensee
+            if project_url:
+                shell_script = dependency_license_detector_shell_script.format(project_url=project_url)
+                clone_dir = tempfile.mkdtemp(prefix="dependency-", dir=workspace)
+                try:
+                    result, error = shell_exec(shell_script, cwd=clone_dir)
+                finally:
+                    shutil.rmtree(clone_dir, ignore_errors=True)
+                
+                if error is None:
+                    try:
+                        license_info = json.loads(result)
+                        licenses_name = get_licenses_name(license_info)
+                        item['declared_licenses'].append(licenses_name)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Failed to parse JSON from {project_url}: {e}")
+                else:
+                    logger.error(f"License detection failed: {project_url}, error: {error}")
+
+
+def _summarise_packages(packages: Iterable[Dict[str, Any]], workspace: str = ".") -> Dict[str, Any]:
+    """
+    Categorize ORT packages by license status.
+    
+    Only the fields needed for the summary are kept from each package while
+    iterating, so packages may come from a streaming parser.
+    
+    Args:
+        packages: ORT packages
+        workspace: Task workspace directory
+        
+    Returns:
+        Processed result with categorized packages
+    """
+    kept = [
+        {
+            "purl": package["purl"],
+            "declared_licenses": list(package.get("declared_licenses") or []),
+            "homepage_url": package.get("homepage_url", ""),
+            "vcs_processed": {"url": package.get("vcs_processed", {}).get("url", "")}
+        }
+        for package in packages
+    ]
+    _detect_missing_licenses(kept, workspace)
+
+    result = {
+        "packages_all": [],
+        "packages_with_license_detect": [],
+        "packages_without_license_detect": []
+    }
+    for package in kept:
+        result["packages_all"].append(package["purl"])
+        license = package["declared_licenses"]
+        if license is not None and len(license) > 0:
+            result["packages_with_license_detect"].append(package["purl"])
+        else:
+            result["packages_without_license_detect"].append(package["purl"])
+    return result
+
+
+def dependency_checker_file_process(path: str, workspace: str = ".") -> Dict[str, Any]:
+    """
+    Categorize the packages of ORT's analyzer result by license status,
+    reading the result from a file one package at a time.
+    
+    Args:
+        path: File holding the analyzer result
+        workspace: Task workspace directory
+        
+    Returns:
+        Processed result with categorized packages
+    """
+    if os.path.getsize(path) == 0:
+        return {}
+
+    try:
+        return _summarise_packages(json_stream.iter_items(path, "analyzer.result.packages.item"), workspace)
+    except Exception as e:
+        logger.error(f"Error processing dependency-checker output: {e}")
+        return {}
+
+
+def scancode_file_summary(path: str) -> Dict[str, Any]:
+    """
+    Read a scancode result file one file entry at a time, keeping the scan
+    headers and the license and copyright findings of each file.
+    
+    Args:
+        path: File holding the scancode JSON result
+        
+    Returns:
+        Summarised scancode result
+    """
+    files = []
+    for entry in json_stream.iter_items(path, "files.item"):
+        summary = {field: entry.get(field) for field in SCANCODE_FILE_FIELDS if field in entry}
+        if "copyrights" in entry:
+            summary["copyrights"] = [c.get("copyright") for c in entry["copyrights"] or []]
+        files.append(summary)
+
+    return {
+        "headers": json_stream.get(path, "headers", []),
+        "license_detections": json_stream.get(path, "license_detections", []),
+        "files": files
+    }
+
+
+def parse_oat_txt_to_json(txt: str) -> Dict[str, Any]:
+    """
+    Parse OAT tool output text report to JSON format.
+    
+    Args:
+        txt: OAT tool output text content
+        
+    Returns:
+        Parsed JSON format data
+    """
+    try:
+        de_str = txt.decode('unicode_escape') if isinstance(txt, bytes) else txt
+        result = {}
+        lines = de_str.splitlines()
+        current_section = None
+        pattern = r"Name:\s*(.+?)\s*Content:\s*(.+?)\s*Line:\s*(\d+)\s*Project:\s*(.+?)\s*File:\s*(.+)"
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+                
+            total_count_match = re.search(r"^(.*) Total Count:\s*(\d+)", line, re.MULTILINE)
+            category_name = total_count_match.group(1).strip() if total_count_match else "Unknown"
+
+            if 'Total Count' in line:
+                current_section = category_name
+                total_count = int(line.split(":")[1].strip())
+                result[current_section] = {"total_count": total_count, "details": []}
+            elif line.startswith("Name:"):
+                matches = re.finditer(pattern, line)
+                for match in matches:
+                    entry = {
+                        "name": match.group(1).strip(),
+                        "content": match.group(2).strip(),
+                        "line": int(match.group(3).strip()),
+                        "project": match.group(4).strip(),
+                        "file": match.group(5).strip(),
+                    }
+                if current_section and "details" in result[current_section]:
+                    result[current_section]["details"].append(entry)
+        return result
+    except Exception as e:
+        logger.error(f"parse_oat_txt error: {e}")
+        return {"error": str(e)}
+
+
+def process_command_output(command: str, path: str, workspace: str = ".") -> Any:
+    """
+    Process results according to command type, reading the tool output from a file.
+    
+    JSON outputs are parsed incrementally; dependency-checker and, if
+    configured, scancode outputs are summarised while they are read.
+    
+    Args:
+        command: Command name
+        path: File holding the tool output
+        workspace: Task workspace directory
+        
+    Returns:
+        Processed result
+    """
+    if os.path.getsize(path) == 0:
+        return {}
+
+    json_commands = ['osv-scanner', 'scancode', 'languages-detector']
+    if command in json_commands:
+        try:
+            if command == 'scancode' and _scancode_output_mode() == 'summary':
+                return scancode_file_summary(path)
+            return json_stream.load(path)
+        except json_stream.JSONError as e:
+            logger.warning(f"Failed to parse JSON for {command}: {e}")
+            with open(path, encoding='utf-8', errors='replace') as f:
+                return {"raw_output": f.read()}
+
+    if command == 'dependency-checker':
+        return dependency_checker_file_process(path, workspace)
+
+    with open(path, 'rb') as f:
+        result = f.read()
+    if command == 'oat-scanner':
+        return parse_oat_txt_to_json(result.decode('utf-8'))
+    return result.decode('utf-8')
+
+
+def shell_script_checker(
+    command: str,
+    project_url: str,
+    res_payload: Dict[str, Any],
+    workspace: str = ".",
+    timeout: Optional[float] = None
+) -> None:
+    """
+    Generic function to handle shell script commands.
+    
+    Args:
+        command: Command name
+        project_url: Project URL
+        res_payload: Response payload
+        workspace: Task workspace directory
+        timeout: Seconds the script may run, None for the configured default
+    """
+    try:
+        if command not in shell_script_handlers:
+            logger.error(f"No shell script handler found for command: {command}")
+            return
+        
+        shell_script = shell_script_handlers[command].format(project_url=project_url)
+        result = run_shell(shell_script, cwd=workspace, timeout=timeout, stdout_to_file=True)
+        
+        try:
+            if result.ok:
+                logger.info(f"{command} job done: {project_url}, {result}")
+                
+                processed_result = process_command_output(command, result.stdout_path, workspace)
+                res_payload["scan_results"][command] = processed_result
+            else:
+                logger.error(f"{command} job failed: {project_url}, error: {result.stderr}")
+                res_payload["scan_results"][command] = {"error": result.stderr.decode("utf-8")}
+        finally:
+            result.cleanup()
+            
+    except Exception as e:
+        logger.error(f"{command} job failed: {project_url}, error: {e}")
+        res_payload["scan_results"][command] = {"error": str(e)}
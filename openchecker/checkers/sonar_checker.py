@@ -3,7 +3,7 @@ import json
 import time
 import re
 import requests
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from constans import shell_script_handlers
 from common import shell_exec
 from platform_adapter import platform_manager
@@ -58,7 +58,13 @@ def _build_sonar_url(sonar_config: dict, path: str) -> str:
     return f"{base_url}{path}"
 
 
-def sonar_checker(project_url: str, res_payload: dict, config: dict) -> None:
+def sonar_checker(
+    project_url: str,
+    res_payload: dict,
+    config: dict,
+    workspace: str = ".",
+    timeout: Optional[float] = None
+) -> None:
     """
     SonarQube scanner checker
     
@@ -66,6 +72,8 @@ def sonar_checker(project_url: str, res_payload: dict, config: dict) -> None:
         project_url: Project URL
         res_payload: Response payload
         config: Configuration dictionary
+        workspace: Directory containing the project checkout
+        timeout: Seconds the scan may run, None for the configured default
     """
     try:
         # Use platform adapter to parse project URL
@@ -92,7 +100,7 @@ def sonar_checker(project_url: str, res_payload: dict, config: dict) -> None:
             sonar_token=sonar_config.get('token', ''),
             scan_timeout_s=sonar_config.get('scan_timeout_s', '1800')
         )
-        result, error = shell_exec(shell_script)
+        result, error = shell_exec(shell_script, cwd=workspace, timeout=timeout)
         
         if error is None:
             logger.info(f"sonar-scanner finish scanning project: {project_url}, report querying...")
@@ -1,36 +1,40 @@
+import asyncio
 import os
-import subprocess
 import json
 import re
 import time
 import requests
 import yaml
-from typing import Dict, Tuple, Any
+from typing import Any, Dict, Optional, Tuple
 from logger import get_logger
 from aksk.default_request import DefaultRequest
 from helper import read_config
 from aksk.signer import Signer
 from platform_adapter import platform_manager
+from runner import run_command
 
 logger = get_logger('openchecker.checkers.standard_command_checker')
 
+# Seconds the criticality_score, scorecard, git and cloc commands may run
+CLI_TIMEOUT = 600
 
-def run_criticality_score(project_url: str) -> Tuple[Dict, str]:
+
+def run_criticality_score(project_url: str, timeout: Optional[float] = None) -> Tuple[Dict, str]:
     """
     Run criticality score analysis
     
     Args:
         project_url: Project URL
-        config: Configuration dictionary
+        timeout: Seconds the command may run, defaults to CLI_TIMEOUT
         
     Returns:
         Tuple[Dict, str]: (result, error)
     """
     if "github.com" in project_url:
         cmd = ["criticality_score", "--repo", project_url, "--format", "json"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            json_str = result.stderr
+        result = run_command(cmd, timeout=timeout or CLI_TIMEOUT)
+        if result.ok:
+            json_str = result.stderr.decode("utf-8", errors="replace")
             json_str = json_str.replace("\n", "")
             pattern = r'{.*?}'
             match = re.search(pattern, json_str)
@@ -51,20 +55,21 @@ def run_criticality_score(project_url: str) -> Tuple[Dict, str]:
         return None, "URL is not supported by criticality score."
 
 
-def run_scorecard_cli(project_url: str) -> Tuple[Dict, str]:
+def run_scorecard_cli(project_url: str, timeout: Optional[float] = None) -> Tuple[Dict, str]:
     """
     Run scorecard CLI analysis
     
     Args:
         project_url: Project URL
+        timeout: Seconds the command may run, defaults to CLI_TIMEOUT
         
     Returns:
         Tuple[Dict, str]: (result, error)
     """
     if "github.com" in project_url:
         cmd = ["scorecard", "--repo", project_url, "--format", "json"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
+        result = run_command(cmd, timeout=timeout or CLI_TIMEOUT)
+        if result.ok:
             try:
                 scorecard_json = json.loads(result.stdout)
                 scorecard_json = simplify_scorecard(scorecard_json)
@@ -104,24 +109,25 @@ def simplify_scorecard(data: Dict) -> Dict:
     return simplified
 
 
-def get_code_count(project_url: str) -> Tuple[Dict, str]:
+def get_code_count(project_url: str, workspace: str = ".") -> Tuple[Dict, str]:
     """
     Get code count using cloc
     
     Args:
         project_url: Project URL
+        workspace: Directory containing the project checkout
         
     Returns:
         Tuple[Dict, str]: (result, error)
     """
-    project_name = os.path.basename(project_url).replace('.git', '')
-
-    if not os.path.exists(project_name):
-        subprocess.run(["git", "clone", project_url, "--depth=1"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    cmd = ["cloc", project_name, "--json"] 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        if result.stdout.strip() == "":
+    project_path = os.path.join(workspace, os.path.basename(project_url).replace('.git', ''))
+
+    if not os.path.isdir(project_path):
+        return None, f"Project checkout not found: {project_path}"
+    cmd = ["cloc", project_path, "--json"]
+    result = run_command(cmd, timeout=CLI_TIMEOUT)
+    if result.ok:
+        if result.stdout.strip() == b"":
             return {"code_count": 0}, None
         result_json = json.loads(result.stdout)
         code_count = result_json['SUM']['code']
@@ -327,6 +333,39 @@ def get_type_organizations(project_url, type)  -> Tuple[Dict, str]:
         logger.error("get_{}_organizations error: {}".format(type, e))
         return False, None
 
+async def get_type_distribution_async(project_url, type, dimension, client) -> Tuple[Dict, str]:
+    """
+    get_type_countries / get_type_organizations 的协程版本，供 asyncio agent 使用
+
+    Args:
+        project_url: 仓库地址
+        type (str): 变更类型，可以是: issue_creators, pull_request_creators, stargazers(仓库维度).
+        dimension (str): 分布维度, countries 或 organizations
+        client: httpx.AsyncClient
+
+    Returns:
+        list: 仓库'type'的'dimension'分布信息数组
+    """
+    try:
+        if "github.com" in project_url:
+            project_url = project_url.replace('.git', '')
+            owner_name, repo_name = platform_manager.parse_project_url(project_url)
+            url = f'https://api.ossinsight.io/v1/repos/{owner_name}/{repo_name}/{type}/{dimension}/'
+            response = await client.get(url, follow_redirects=True)
+            if response.status_code == 200:
+                data_body = json.loads(response.text)
+                data_json = data_body['data']
+                return data_json, None
+            else:
+                logger.error("Failed to get {}_{} for repo: {} \n Error: {}".format(type, dimension, project_url, "Not found"))
+                return False, "Not found"
+        else:
+            logger.error("Unsupported platform for {}_{}: {}".format(type, dimension, project_url))
+            return False, "Unsupported platform"
+    except Exception as e:
+        logger.error("get_{}_{} error: {}".format(type, dimension, e))
+        return False, None
+
 def get_eol_info(project_url: str) -> Tuple[Dict, str]:
     """
     Get end-of-life (EOL) information
@@ -356,16 +395,16 @@ def get_eol_info(project_url: str) -> Tuple[Dict, str]:
         logger.error("eol_info error: {}".format(e))
         return {"eol_status": "", "eol_release": "", "eol_time": ""}, None
 
-def criticality_score_checker(project_url: str, res_payload: dict) -> None:
+def criticality_score_checker(project_url: str, res_payload: dict, timeout: Optional[float] = None) -> None:
     """
     Criticality score checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
-        config: Configuration dictionary
+        timeout: Seconds the command may run, defaults to CLI_TIMEOUT
     """
-    result, error = run_criticality_score(project_url)
+    result, error = run_criticality_score(project_url, timeout)
     if error is None:
         logger.info(f"criticality-score job done: {project_url}")
         res_payload["scan_results"]["criticality-score"] = result
@@ -374,15 +413,16 @@ def criticality_score_checker(project_url: str, res_payload: dict) -> None:
         res_payload["scan_results"]["criticality-score"] = {"error": error}
 
 
-def scorecard_score_checker(project_url: str, res_payload: dict) -> None:
+def scorecard_score_checker(project_url: str, res_payload: dict, timeout: Optional[float] = None) -> None:
     """
     Scorecard score checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
+        timeout: Seconds the command may run, defaults to CLI_TIMEOUT
     """
-    result, error = run_scorecard_cli(project_url)
+    result, error = run_scorecard_cli(project_url, timeout)
     if error is None:
         logger.info(f"scorecard-score job done: {project_url}")
         res_payload["scan_results"]["scorecard-score"] = result
@@ -391,15 +431,16 @@ def scorecard_score_checker(project_url: str, res_payload: dict) -> None:
         res_payload["scan_results"]["scorecard-score"] = {"error": error}
 
 
-def code_count_checker(project_url: str, res_payload: dict) -> None:
+def code_count_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """
     Code count checker
     
     Args:
         project_url: Project URL
         res_payload: Response payload
+        workspace: Directory containing the project checkout
     """
-    result, error = get_code_count(project_url)
+    result, error = get_code_count(project_url, workspace)
     if error is None:
         logger.info(f"code-count job done: {project_url}")
         res_payload["scan_results"]["code-count"] = result
@@ -498,6 +539,37 @@ def repo_country_organizations_checker(project_url: str, res_payload: dict) -> N
         logger.error(f"stargazers_organizations job failed: {project_url}, error: {error_repo_org}")
         res_payload["scan_results"]["repo-country-organizations"]["stargazers_organizations"] = {"error": error_repo_org}
     
+async def repo_country_organizations_checker_async(project_url: str, res_payload: dict, client) -> None:
+    """
+    Repository country/organization checker, coroutine variant used by the asyncio agent.
+    All ossinsight requests are issued concurrently.
+    Args:
+        project_url: Project URL
+        res_payload: Response payload
+        client: httpx.AsyncClient
+    """
+    fields = [
+        ("issue_creators_country", "issue_creators", "countries"),
+        ("issue_creators_organizations", "issue_creators", "organizations"),
+        ("pull_request_creators_country", "pull_request_creators", "countries"),
+        ("pull_request_creators_organizations", "pull_request_creators", "organizations"),
+        ("stargazers_country", "stargazers", "countries"),
+        ("stargazers_organizations", "stargazers", "organizations")
+    ]
+    results = await asyncio.gather(
+        *(get_type_distribution_async(project_url, type, dimension, client) for _, type, dimension in fields)
+    )
+
+    res_payload["scan_results"]["repo-country-organizations"] = {}
+    for (key, type, dimension), (result, error) in zip(fields, results):
+        if error is None:
+            logger.info(f"{type}_{dimension} job done: {project_url}")
+            res_payload["scan_results"]["repo-country-organizations"][key] = result
+        else:
+            logger.error(f"{type}_{dimension} job failed: {project_url}, error: {error}")
+            res_payload["scan_results"]["repo-country-organizations"][key] = {"error": error}
+
+
 def eol_checker(project_url: str, res_payload: dict) -> None:
     """
     eol checker
@@ -186,13 +186,14 @@ def _extract_workflow_permissions(workflow_file: str, repo_path: str) -> List[Di
 
 
 
-def token_permissions_checker(project_url: str, res_payload: dict) -> None:
+def token_permissions_checker(project_url: str, res_payload: dict, workspace: str = ".") -> None:
     """ 
     检查workflows的token权限信息 ,
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#token_permissions
     """
     
-    owner_name, repo_path = platform_manager.parse_project_url(project_url)
+    owner_name, repo_name = platform_manager.parse_project_url(project_url)
+    repo_path = os.path.join(workspace, repo_name)
     platform_type = get_platform_type(project_url)
     results = {
         "num_workflows": 0,
@@ -22,4 +22,25 @@ def url_checker(project_url: str, res_payload: dict) -> None:
         logger.info(f"url-checker job done: {project_url}")
     except Exception as e:
         logger.error(f"url-checker job failed: {project_url}, error: {e}")
-        res_payload["scan_results"]["url-checker"] = {"error": str(e)} 
\ No newline at end of file
+        res_payload["scan_results"]["url-checker"] = {"error": str(e)}
+
+
+async def url_checker_async(project_url: str, res_payload: dict, client) -> None:
+    """
+    URL accessibility checker, coroutine variant used by the asyncio agent
+    
+    Args:
+        project_url: Project URL
+        res_payload: Response payload
+        client: httpx.AsyncClient used for the request
+    """
+    try:
+        response = await client.get(project_url, timeout=10, follow_redirects=True)
+        res_payload["scan_results"]["url-checker"] = {
+            "status_code": response.status_code,
+            "is_accessible": response.status_code == 200
+        }
+        logger.info(f"url-checker job done: {project_url}")
+    except Exception as e:
+        logger.error(f"url-checker job failed: {project_url}, error: {e}")
+        res_payload["scan_results"]["url-checker"] = {"error": str(e)}
@@ -7,9 +7,9 @@ from typing import Any, List, Dict
 COMMAND = 'webhooks-checker'
 
 
-def get_webhooks(project_url, access_token):
+def _webhooks_request(project_url, access_token):
     """
-    获取所有仓库webhooks, 支持github.com, gitee.com, gitcode.com。
+    构造获取仓库webhooks的请求, 返回 (url, headers)；不支持的平台返回 (None, None)。
     """
 
     owner_name = re.match(r"https://(?:github|gitee|gitcode).com/([^/]+)/", project_url).group(1)
@@ -17,41 +17,83 @@ def get_webhooks(project_url, access_token):
 
     if "github.com" in project_url:
         url = f"https://api.github.com/repos/{owner_name}/{repo_name}/hooks?&page=1&per_page=100"
-        try:
-            headers = {
-                'Accept': 'application/vnd.github.v3+json',
-                'Authorization': f'token {access_token}'
-            }
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                hooks = response.json()
-                return hooks, None
-            else:
-                return [], "token invalid"
-        except Exception as e:
-            return [], "token invalid"
+        headers = {
+            'Accept': 'application/vnd.github.v3+json',
+            'Authorization': f'token {access_token}'
+        }
+        return url, headers
 
     elif "gitee.com" in project_url or "gitcode.com" in project_url:
         if "gitee.com" in project_url:
             url = f"https://gitee.com/api/v5/repos/{owner_name}/{repo_name}/hooks?access_token={access_token}&page=1&per_page=100"
         else:
             url = f"https://api.gitcode.com/api/v5/repos/{owner_name}/{repo_name}/hooks?access_token={access_token}&page=1&per_page=100"
-        try:
-            headers = {
-                'Accept': 'application/json'
-            }
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                hooks = response.json()
-                return hooks, None
-            else:
-                return [], "token invalid"
-        except Exception as e:
+        headers = {
+            'Accept': 'application/json'
+        }
+        return url, headers
+
+    return None, None
+
+
+def get_webhooks(project_url, access_token):
+    """
+    获取所有仓库webhooks, 支持github.com, gitee.com, gitcode.com。
+    """
+
+    url, headers = _webhooks_request(project_url, access_token)
+    if url is None:
+        return [], "Not supported platform."
+
+    try:
+        response = requests.get(url, headers=headers)
+        if response.status_code == 200:
+            hooks = response.json()
+            return hooks, None
+        else:
             return [], "token invalid"
+    except Exception as e:
+        return [], "token invalid"
 
-    else:
+
+async def get_webhooks_async(project_url, access_token, client):
+    """
+    get_webhooks 的协程版本, client 为 httpx.AsyncClient。
+    """
+
+    url, headers = _webhooks_request(project_url, access_token)
+    if url is None:
         return [], "Not supported platform."
 
+    try:
+        response = await client.get(url, headers=headers, follow_redirects=True)
+        if response.status_code == 200:
+            hooks = response.json()
+            return hooks, None
+        else:
+            return [], "token invalid"
+    except Exception as e:
+        return [], "token invalid"
+
+
+def _build_result(access_token, hooks, error_msg):
+    """
+    生成检查结果, 隐藏webhooks中的密码。
+    """
+
+    webhooks_hooks = []
+    if error_msg is None:
+        webhooks_hooks = [
+            {**hook, "password": "******"} 
+            if hook.get("password") else hook for hook in hooks
+        ]
+
+    return {
+        "access_token": True if access_token else False,
+        "error_msg": error_msg,
+        "webhooks_hooks": webhooks_hooks
+    }
+
 
 def webhooks_checker(project_url: str, res_payload: dict, access_token: str) -> None:
     """
@@ -59,19 +101,22 @@ def webhooks_checker(project_url: str, res_payload: dict, access_token: str) ->
     指标详情介绍 https://github.com/ossf/scorecard/blob/main/docs/checks.md#webhooks
     """
     
-    webhooks_hooks = []
-    error_msg = None
+    hooks, error_msg = [], None
     
     if access_token:
         hooks, error_msg = get_webhooks(project_url, access_token)
-        if error_msg is None:
-            webhooks_hooks = [
-                {**hook, "password": "******"} 
-                if hook.get("password") else hook for hook in hooks
-            ]
     
-    res_payload["scan_results"][COMMAND] = {
-        "access_token": True if access_token else False,
-        "error_msg": error_msg,
-        "webhooks_hooks": webhooks_hooks
-    }
\ No newline at end of file
+    res_payload["scan_results"][COMMAND] = _build_result(access_token, hooks, error_msg)
+
+
+async def webhooks_checker_async(project_url: str, res_payload: dict, access_token: str, client) -> None:
+    """
+    webhooks_checker 的协程版本，供 asyncio agent 使用。
+    """
+    
+    hooks, error_msg = [], None
+    
+    if access_token:
+        hooks, error_msg = await get_webhooks_async(project_url, access_token, client)
+    
+    res_payload["scan_results"][COMMAND] = _build_result(access_token, hooks, error_msg)
@@ -0,0 +1,156 @@
+"""
+Per-checker checkpoints of running tasks.
+
+Every finished checker's results are stored on shared storage under a key
+derived from the task (project URL, version number, commit hash, commands)
+and the commit its checkout resolves to. When the broker redelivers a task, e.g.
+after its agent pod was evicted, the agent restores the checkpointed results
+and only runs the checkers that had not finished. Keying on the commit keeps
+a later request for a moved branch or tag from restoring results of the
+commit an earlier, failed task scanned, and keying on the commands keeps a
+concurrent task with other commands from removing this task's checkpoints
+when it finishes. Checkpoints are removed once the task's results are sent
+and expire after a TTL otherwise.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from deadline import SKIPPED_DEADLINE
+from logger import get_logger
+
+logger = get_logger('openchecker.checkpoint')
+
+
+def task_key(
+    project_url: str,
+    version_number: Optional[str],
+    commit_hash: Optional[str],
+    revision: str,
+    commands: Iterable[str]
+) -> str:
+    """Return the checkpoint key of a task running commands on a checkout that resolves to revision."""
+    identity = json.dumps([project_url, version_number, commit_hash, revision, sorted(set(commands))])
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def failed_results(scan_results: Dict[str, Any]) -> bool:
+    """Whether a checker's scan results only report an error or a skip for the task's deadline."""
+    return any(isinstance(r, dict) and (set(r) == {"error"} or r == SKIPPED_DEADLINE) for r in scan_results.values())
+
+
+class TaskCheckpoints:
+    """Checkpoints of one task."""
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, command: str) -> str:
+        return os.path.join(self.directory, command + ".json")
+
+    def save(self, command: str, version: str, scan_results: Dict[str, Any]) -> None:
+        """
+        Store the results of a finished command.
+
+        Results reporting an error are not stored, so the command runs again
+        on redelivery.
+
+        Args:
+            command: Command name
+            version: Checker version; checkpoints of other versions are ignored
+            scan_results: Results the command added to scan_results
+        """
+        if failed_results(scan_results):
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(command) + f".{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": version, "saved_at": time.time(), "scan_results": scan_results}, f)
+            os.replace(tmp_path, self._path(command))
+        except OSError as e:
+            logger.warning(f"Failed to checkpoint {command}: {e}")
+
+    def load(self, command: str, version: str) -> Optional[Dict[str, Any]]:
+        """Return the checkpointed results of command, None if there is no valid checkpoint."""
+        try:
+            with open(self._path(command)) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("version") != version or time.time() - checkpoint.get("saved_at", 0) > self.ttl:
+            return None
+        return checkpoint["scan_results"]
+
+    def restore(self, commands: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the checkpoints of several commands.
+
+        Args:
+            commands: Command names mapped to their checker versions
+
+        Returns:
+            Dict mapping each checkpointed command to its results
+        """
+        restored = {}
+        for command, version in commands.items():
+            scan_results = self.load(command, version)
+            if scan_results is not None:
+                restored[command] = scan_results
+        if restored:
+            logger.info(f"Restored checkpointed results of {sorted(restored)}")
+        return restored
+
+    def clear(self) -> None:
+        """Remove all checkpoints of the task."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class CheckpointStore:
+    """Directory holding the checkpoints of all tasks."""
+
+    def __init__(self, directory: str, ttl: float = 86400):
+        """
+        Args:
+            directory: Checkpoint directory, on storage shared by the agents
+            ttl: Seconds after which checkpoints are no longer used
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def task(
+        self,
+        project_url: str,
+        version_number: Optional[str],
+        commit_hash: Optional[str],
+        revision: str,
+        commands: Iterable[str]
+    ) -> TaskCheckpoints:
+        """Return the checkpoints of a task running commands on a checkout that resolves to revision, see resolve_revision."""
+        key = task_key(project_url, version_number, commit_hash, revision, commands)
+        return TaskCheckpoints(os.path.join(self.directory, key), self.ttl)
+
+    def purge_expired(self) -> int:
+        """
+        Remove checkpoints of tasks not updated within the TTL.
+
+        Returns:
+            int: Number of removed task directories
+        """
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.ttl:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
@@ -1,30 +1,90 @@
-import subprocess
+import asyncio
+import functools
+import os
 from pathlib import Path
 from typing import List, Dict, Tuple, Any
 
-def shell_exec(shell_script, param=None):
+from logger import get_logger
+from runner import run_shell
+
+logger = get_logger('openchecker.common')
+
+def shell_exec(shell_script, param=None, cwd=None, timeout=None):
     """
     Execute shell script using bash
     
+    The script runs through runner.run_shell, in its own process group with
+    the configured resource limits; on timeout the whole group is killed.
+    
     Args:
         shell_script: Shell script to execute
         param: Optional parameter to append to script
+        cwd: Working directory of the script, defaults to the current directory
+        timeout: Seconds after which the script is killed, defaults to OpenCheck.command_timeout_s
         
     Returns:
         Tuple of (stdout, stderr) - stderr is None on success
     """
-    if param is not None:
-        cmd = ["/bin/bash", "-c", shell_script + " " + param]
+    result = run_shell(shell_script, param, cwd=cwd, timeout=timeout)
+    logger.debug(f"Shell script finished: {result}")
+
+    if result.ok:
+        return result.stdout, None
     else:
-        cmd = ["/bin/bash", "-c", shell_script]
+        return None, result.stderr
+
+async def shell_exec_async(shell_script, param=None, cwd=None, timeout=None, stdout_path=None):
+    """
+    Coroutine counterpart of shell_exec
     
-    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False)
-    shell_output, error = process.communicate()
+    The script runs through runner.run_shell on a thread of the event loop's
+    default executor, with the same process group handling, resource limits
+    and stderr tail as shell_exec; callers bound how many run at once.
+    
+    Args:
+        shell_script: Shell script to execute
+        param: Optional parameter to append to script
+        cwd: Working directory of the script, defaults to the current directory
+        timeout: Seconds after which the script's process group is killed,
+            defaults to OpenCheck.command_timeout_s
+        stdout_path: Write stdout to this file instead of memory; stdout is
+            then returned as b""
+        
+    Returns:
+        Tuple of (stdout, stderr) - stderr is None on success
+    """
+    result = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(run_shell, shell_script, param, cwd=cwd, timeout=timeout, stdout_path=stdout_path)
+    )
+    logger.debug(f"Shell script finished: {result}")
 
-    if process.returncode == 0:
-        return shell_output, None
+    if result.ok:
+        return result.stdout or b"", None
     else:
-        return None, error
+        return None, result.stderr
+
+def relativize_paths(data: Any, base_dir: str) -> Any:
+    """
+    Rewrite absolute paths below base_dir into paths relative to it
+
+    Checkers resolve files inside a per-task workspace; results keep reporting
+    them relative to that workspace.
+
+    Args:
+        data: Result structure (dicts, lists and strings are traversed)
+        base_dir: Directory the paths should be relative to
+
+    Returns:
+        Result structure with paths rewritten
+    """
+    prefix = os.path.join(os.path.abspath(base_dir), "")
+    if isinstance(data, str):
+        return data[len(prefix):] if data.startswith(prefix) else data
+    if isinstance(data, dict):
+        return {key: relativize_paths(value, base_dir) for key, value in data.items()}
+    if isinstance(data, list):
+        return [relativize_paths(item, base_dir) for item in data]
+    return data
 
 def get_platform_type(url):
     """
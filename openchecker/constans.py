@@ -9,6 +9,13 @@ fi"""
 
 BASE_SCRIPT = _get_project_name("{project_url}") + "\n" + _clone_project("{project_url}")
 
+# Checker scripts read the task's checkout made by download-checkout and never clone it themselves
+CHECKOUT_SCRIPT = _get_project_name("{project_url}") + """
+if [ ! -d "$project_name" ]; then
+    echo "Project checkout not found: $project_name" >&2
+    exit 1
+fi"""
+
 download_checkout_shell_script = """
     """ + BASE_SCRIPT + """
     cd "$project_name"
@@ -22,8 +29,21 @@ download_checkout_shell_script = """
     fi
     """
 
+shallow_checkout_shell_script = """
+    """ + _get_project_name("{project_url}") + """
+    if [ ! -e "$project_name" ]; then
+        if [ {version_number} != "None" ] && \\
+            GIT_ASKPASS=/bin/true git ls-remote --exit-code --tags {project_url} "refs/tags/{version_number}" > /dev/null; then
+            GIT_ASKPASS=/bin/true git clone --depth 1 --branch "{version_number}" {project_url} > /dev/null && \\
+            echo "成功切换到标签 {version_number}"
+        else
+            GIT_ASKPASS=/bin/true git clone --depth 1 {project_url} > /dev/null
+        fi
+    fi
+    """
+
 generate_lock_files_shell_script = """
-    """ + BASE_SCRIPT + """
+    """ + CHECKOUT_SCRIPT + """
     if [ -e "$project_name/package.json" ] && [ ! -e "$project_name/package-lock.json" ]; then
         cd $project_name && npm install && rm -fr node_modules > /dev/null
         echo "Generate lock files for $project_name with command npm."
@@ -35,8 +55,7 @@ generate_lock_files_shell_script = """
     """
 
 osv_scanner_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
+    """ + CHECKOUT_SCRIPT + """
 
     if [ -f "$project_name/oh-package-lock.json5" ] && [ ! -f "$project_name/package-lock.json" ]; then
         mv $project_name/oh-package-lock.json5 $project_name/package-lock.json > /dev/null
@@ -52,27 +71,23 @@ osv_scanner_shell_script = """
     """
 
 scancode_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
+    """ + CHECKOUT_SCRIPT + """
     scancode -lc --json-pp scan_result.json $project_name --license-score 90 -n 4 > /dev/null
     cat scan_result.json
     rm -rf scan_result.json > /dev/null
     """
 
 sonar_scanner_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
-    
-    if [ ! -d "$project_name" ]; then
-        echo "错误: 项目目录不存在: $project_name" >&2
-        exit 1
-    fi
+    """ + CHECKOUT_SCRIPT + """
     
     cd $project_name || {{
         echo "错误: 无法进入项目目录: $project_name" >&2
         exit 1
     }}
 
+    # 扫描器工作目录放在检出目录之外，其他检查器同时读取检出目录
+    SONAR_WORK_DIR="$(dirname "$PWD")/.scannerwork-$project_name"
+
     # 排除规则
     EXCLUSIONS="**/node_modules/**,**/target/**,**/build/**,**/dist/**,**/venv/**,**/.venv/**,**/vendor/**,**/bin/**,**/obj/**,**/.git/**,**/coverage/**,**/__pycache__/**"
     
@@ -143,6 +158,7 @@ sonar_scanner_shell_script = """
             -Dsonar.token="{sonar_token}" \\
             -Dsonar.projectKey="{sonar_project_name}" \\
             -Dsonar.projectName="{sonar_project_name}" \\
+            -Dsonar.working.directory="$SONAR_WORK_DIR" \\
             -Dsonar.sources="." \\
             -Dsonar.exclusions="$EXCLUSIONS",**/*.java \\
             -Dsonar.scm.disabled=true 2>&1 | tail -n 100 >&2
@@ -163,6 +179,7 @@ sonar_scanner_shell_script = """
             -Dsonar.token="{sonar_token}" \\
             -Dsonar.projectKey="{sonar_project_name}" \\
             -Dsonar.projectName="{sonar_project_name}" \\
+            -Dsonar.working.directory="$SONAR_WORK_DIR" \\
             -DskipTests 2>&1 | tail -n 50 >&2
         
         scan_exit_code=$?
@@ -181,7 +198,8 @@ sonar_scanner_shell_script = """
                 -Dsonar.host.url="$sonar_url" \\
                 -Dsonar.token="{sonar_token}" \\
                 -Dsonar.projectKey="{sonar_project_name}" \\
-                -Dsonar.projectName="{sonar_project_name}" 2>&1 | tail -n 50 >&2
+                -Dsonar.projectName="{sonar_project_name}" \\
+                -Dsonar.working.directory="$SONAR_WORK_DIR" 2>&1 | tail -n 50 >&2
             
             scan_exit_code=$?
             handle_scan_result "Gradle" $scan_exit_code "$sonar_url"
@@ -209,36 +227,36 @@ sonar_scanner_shell_script = """
     esac
     
     cd ..
+    rm -rf ".scannerwork-$project_name"
     """
 
 dependency_checker_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
-    ort -P ort.analyzer.allowDynamicVersions=true analyze -i $project_name -o $project_name -f JSON > /dev/null
-    cat $project_name/analyzer-result.json
+    """ + CHECKOUT_SCRIPT + """
+    # ORT writes its result next to the checkout, other checkers read the checkout meanwhile
+    ort -P ort.analyzer.allowDynamicVersions=true analyze -i $project_name -o ".ort-$project_name" -f JSON > /dev/null
+    cat ".ort-$project_name/analyzer-result.json"
+    status=$?
+    rm -rf ".ort-$project_name"
+    exit $status
     """
 
 readme_checker_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
+    """ + CHECKOUT_SCRIPT + """
     find "$project_name" -type f \\( -name "README*" -o -name "docs/README*" \\) -print
     """
 
 maintainers_checker_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
+    """ + CHECKOUT_SCRIPT + """
     find "$project_name" -type f \\( -iname "MAINTAINERS*" -o -iname "COMMITTERS*" -o -iname "OWNERS*" -o -iname "CODEOWNERS*" \\) -print
     """
 
 languages_detector_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """
+    """ + CHECKOUT_SCRIPT + """
     github-linguist $project_name --breakdown --json
     """
 
 oat_scanner_shell_script = """
-    """ + _get_project_name("{project_url}") + """
-    """ + _clone_project("{project_url}", depth=True) + """                
+    """ + CHECKOUT_SCRIPT + """                
     if [ ! -f "$project_name/OAT.xml" ]; then
         echo "OAT.xml not found in the project root directory."
         exit 1   
@@ -256,14 +274,20 @@ remove_source_code_shell_script = """
     """
 
 license_detector_shell_script = """
+    """ + CHECKOUT_SCRIPT + """
+    licensee detect "$project_name" --json
+    """
+
+# Clones a dependency's repository into the working directory, which the caller removes afterwards
+dependency_license_detector_shell_script = """
     """ + _get_project_name("{project_url}") + """
     """ + _clone_project("{project_url}", depth=True) + """
     licensee detect "$project_name" --json
-    rm -rf $project_name > /dev/null
     """
 
 shell_script_handlers = {
     "download-checkout": download_checkout_shell_script,
+    "download-checkout-shallow": shallow_checkout_shell_script,
     "generate-lock_files": generate_lock_files_shell_script,
     "osv-scanner": osv_scanner_shell_script,
     "scancode": scancode_shell_script,
@@ -0,0 +1,126 @@
+"""
+Deadline budgets of tasks.
+
+A task may carry ``task_metadata.deadline``, either an ISO 8601 timestamp
+or a number of seconds the agent may spend on it. The agent then starts the
+checkers expected to finish soonest first, limits the timeout of every
+checker to the time left and reports the checkers it could not fit as
+``{"status": "skipped_deadline"}`` instead of running past the deadline.
+
+Expected runtimes are learnt per checker from the runs of this process, as
+a moving average seeded from the checker's resource class.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from logger import get_logger
+from runner import default_timeout
+
+logger = get_logger('openchecker.deadline')
+
+# Result of a checker that did not fit into the task's deadline
+SKIPPED_DEADLINE = {"status": "skipped_deadline"}
+
+# Expected seconds of a run before any has been observed, by resource class or step name
+DEFAULT_ESTIMATES = {
+    'network': 5,
+    'light': 15,
+    'medium': 120,
+    'large': 900,
+    'heavy': 1200,
+    'download-checkout': 60,
+    'generate-lock_files': 120,
+}
+
+
+def parse_deadline(value: Any, now: Optional[float] = None) -> Optional[float]:
+    """
+    Return the deadline of a task as a UNIX timestamp.
+
+    Args:
+        value: task_metadata.deadline, an ISO 8601 timestamp (UTC unless it
+            names a time zone) or seconds from now
+        now: Current UNIX time, defaults to time.time()
+
+    Returns:
+        Optional[float]: None if value is empty or cannot be parsed
+    """
+    if value is None or value == "":
+        return None
+    now = time.time() if now is None else now
+    try:
+        return now + float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning(f"Ignoring invalid task deadline: {value}")
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class RuntimeEstimates:
+    """Exponential moving averages of the runtimes of checkers and preparation steps."""
+
+    def __init__(self, alpha: float = 0.3):
+        """
+        Args:
+            alpha: Weight of the latest observation
+        """
+        self.alpha = alpha
+        self._estimates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, name: str, resource_class: Optional[str] = None) -> float:
+        """Return the expected seconds of a run of name."""
+        with self._lock:
+            if name in self._estimates:
+                return self._estimates[name]
+        return DEFAULT_ESTIMATES.get(name, DEFAULT_ESTIMATES.get(resource_class, DEFAULT_ESTIMATES['light']))
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record the duration of a completed run."""
+        with self._lock:
+            previous = self._estimates.get(name)
+            self._estimates[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+
+class TaskDeadline:
+    """Time budget of one task."""
+
+    def __init__(self, deadline: float, estimates: RuntimeEstimates):
+        """
+        Args:
+            deadline: UNIX timestamp by which the task's results should be sent
+            estimates: Runtime estimates of the checkers
+        """
+        self.deadline = deadline
+        self.estimates = estimates
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline, negative once it passed."""
+        return self.deadline - time.time()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def order(self, commands: List[str], resource_classes: Dict[str, str]) -> List[str]:
+        """Return commands ordered by expected runtime, shortest first, so that most of them fit."""
+        return sorted(commands, key=lambda c: self.estimates.estimate(c, resource_classes.get(c)))
+
+    def timeout(self, timeout: Optional[float] = None) -> float:
+        """
+        Return the timeout of a checker starting now.
+
+        Args:
+            timeout: The checker's own timeout, None for the configured default
+        """
+        timeout = default_timeout() if timeout is None else timeout
+        remaining = max(1.0, self.remaining())
+        return min(timeout, remaining) if timeout else remaining
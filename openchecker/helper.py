@@ -1,14 +1,20 @@
 import configparser
+import functools
+import os
 
-def read_config(filename, modulename=None):
+
+@functools.lru_cache(maxsize=None)
+def _parse_config(path):
     config = configparser.ConfigParser()
-    config.read(filename)
-    
+    config.read(path)
+    return {section_name: dict(config[section_name]) for section_name in config.sections()}
+
+
+def read_config(filename, modulename=None):
+    # The file is parsed once per process; callers get their own copies
+    sections = _parse_config(os.path.abspath(filename))
+
     if modulename is not None:
-        section = config[modulename]
-        return dict(section)
+        return dict(sections[modulename])
     else:
-        result = {}
-        for section_name in config.sections():
-            result[section_name] = dict(config[section_name])
-        return result
\ No newline at end of file
+        return {section_name: dict(section) for section_name, section in sections.items()}
@@ -0,0 +1,143 @@
+"""
+Incremental rescans of file-level checkers.
+
+Checkers reporting per-file findings declare an ``incremental_merge``
+function in the checker registry and accept a ``files`` argument. When the
+result cache holds the checker's results for an earlier commit of the
+project and that commit is part of the clone, the checker only examines the
+files added, modified, copied or renamed since then; its findings are merged
+with the earlier ones for the files left untouched. The merged results are
+cached for the new commit and serve as the base of the next rescan.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from checkpoint import failed_results
+from logger import get_logger
+from result_cache import TaskResults
+from runner import run_command
+
+logger = get_logger('openchecker.incremental')
+
+# Statuses of git diff --name-status whose (new) path has to be examined again
+EXAMINED_STATUSES = "ACMRT"
+
+
+class ChangeSet:
+    """Files changed between two commits, as paths relative to the checkout."""
+
+    def __init__(self, examine: List[str], touched: Set[str]):
+        """
+        Args:
+            examine: Files that exist in the new commit and have to be examined
+            touched: Every path involved in a change, including deleted files
+                and the old paths of renamed ones; earlier findings for them
+                are dropped
+        """
+        self.examine = examine
+        self.touched = touched
+
+
+def changes_since(checkout: str, revision: str) -> Optional[ChangeSet]:
+    """
+    Return the files changed in a checkout since revision.
+
+    Returns:
+        Optional[ChangeSet]: None if revision is not part of the clone
+    """
+    try:
+        result = run_command(["git", "diff", "--name-status", "-z", "-M", f"{revision}..HEAD"], cwd=checkout)
+    except OSError as e:
+        logger.warning(f"Failed to run git diff: {e}")
+        return None
+    if not result.ok:
+        error = result.stderr.decode(errors='replace').strip()
+        logger.info(f"Cannot diff against {revision[:12]}, scanning fully: {error}")
+        return None
+
+    fields = result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    examine, touched = [], set()
+    i = 0
+    while i < len(fields) - 1:
+        status = fields[i]
+        # Renames and copies list the old and the new path; the source of a copy is unchanged
+        paths = fields[i + 1:i + 3] if status[:1] in "RC" else fields[i + 1:i + 2]
+        i += 1 + len(paths)
+        touched.update(paths[-1:] if status[:1] == "C" else paths)
+        if status[:1] in EXAMINED_STATUSES:
+            examine.append(paths[-1])
+    return ChangeSet(examine, touched)
+
+
+class Baseline:
+    """Earlier results of a checker the current run is merged with."""
+
+    def __init__(self, result_key: str, revision: str, previous: Dict[str, Any], changes: ChangeSet,
+                 merge: Callable[[Any, Any, Set[str]], Any]):
+        self.result_key = result_key
+        self.revision = revision
+        self.previous = previous
+        self.changes = changes
+        self._merge = merge
+
+    def merge(self, scan_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge the scan results of the incremental run with the baseline.
+
+        Results reporting an error are returned unchanged.
+        """
+        if failed_results(scan_results) or self.result_key not in scan_results:
+            return scan_results
+        merged = dict(scan_results)
+        merged[self.result_key] = self._merge(
+            self.previous[self.result_key], scan_results[self.result_key], self.changes.touched
+        )
+        return merged
+
+
+class IncrementalScan:
+    """Baselines of the incremental checkers of one task."""
+
+    def __init__(self, task_cache: TaskResults):
+        """
+        Args:
+            task_cache: Result cache entries of the task, holding the earlier results
+        """
+        self.task_cache = task_cache
+        self._changes: Dict[str, Optional[ChangeSet]] = {}
+        self._lock = threading.Lock()
+
+    def _changes_since(self, revision: str) -> Optional[ChangeSet]:
+        with self._lock:
+            if revision not in self._changes:
+                self._changes[revision] = changes_since(self.task_cache.checkout, revision)
+            return self._changes[revision]
+
+    def needs_history(self, commands: Iterable[str]) -> bool:
+        """Whether any of commands may rescan incrementally, which needs a clone with history."""
+        return any(
+            command in self.task_cache.specs and self.task_cache.specs[command].incremental_merge
+            and self.task_cache.previous(command) is not None
+            for command in commands
+        )
+
+    def baseline(self, command: str) -> Optional[Baseline]:
+        """
+        Return the baseline of a command, to be called once the project is cloned.
+
+        Returns:
+            Optional[Baseline]: None if the command has to scan the whole checkout
+        """
+        spec = self.task_cache.specs.get(command)
+        if spec is None or not spec.incremental_merge:
+            return None
+        previous = self.task_cache.previous(command)
+        if previous is None:
+            return None
+        revision, scan_results = previous
+        changes = self._changes_since(revision)
+        if changes is None or spec.result_key not in scan_results:
+            return None
+        logger.info(f"Rescanning {len(changes.examine)} changed file(s) for {command} since {revision[:12]}")
+        return Baseline(spec.result_key, revision, scan_results, changes, spec.load_merge())
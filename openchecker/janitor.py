@@ -0,0 +1,305 @@
+"""
+Garbage collection of task workspaces and repository mirrors.
+
+Nothing on a task's critical path waits for a tree to be deleted: the
+janitor renames the directory into a .trash directory next to it, which is
+instant on the same file system, and a background thread deletes it.
+
+A background sweep keeps repos_dir and the mirror directory in check:
+
+- workspaces of tasks that died without cleaning up are removed; a live
+  task holds an flock on its workspace's lock file, see workspace.py;
+- other leftovers below repos_dir (result spools of crashed tasks) are
+  removed once they are older than the orphan TTL;
+- above the disk quota, the least recently used repository mirrors are
+  evicted, except mirrors a live checkout borrows objects from (checkouts
+  made with git clone --shared break without them).
+"""
+
+import fcntl
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from typing import Iterator, Optional, Set
+
+from logger import get_logger
+from repository_mirrors import RepositoryMirrors
+from workspace import LOCK_FILE
+
+logger = get_logger('openchecker.janitor')
+
+TRASH_DIR = ".trash"
+
+# Seconds a workspace lock may be unlocked before the workspace counts as
+# orphaned, covering the moment between creating the lock file and locking it
+LOCK_GRACE = 60
+
+
+def disk_usage(path: str) -> int:
+    """Return the bytes allocated to a file or directory tree, 0 if it vanished."""
+    try:
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_blocks * 512
+        total = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += disk_usage(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_blocks * 512
+        return total
+    except OSError:
+        return 0
+
+
+def _lock_is_held(lock_path: str) -> bool:
+    """Whether a live process holds the flock on lock_path."""
+    try:
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+    except OSError:
+        return True
+
+
+class WorkspaceJanitor:
+    """Background deletion of trees and sweeps of repos_dir and the repository mirrors."""
+
+    def __init__(
+        self,
+        repos_dir: str,
+        quota: int = 0,
+        mirrors: Optional[RepositoryMirrors] = None,
+        interval: float = 300,
+        orphan_ttl: float = 86400
+    ):
+        """
+        Args:
+            repos_dir: Directory holding the task workspaces
+            quota: Bytes repos_dir and the mirror directory may use together,
+                0 for no quota
+            mirrors: Repository mirrors to evict above the quota and to purge
+                after their TTL, None if mirrors are disabled
+            interval: Seconds between two sweeps
+            orphan_ttl: Seconds after which entries of repos_dir that are
+                not task workspaces are removed
+        """
+        self.repos_dir = repos_dir
+        self.quota = quota
+        self.mirrors = mirrors
+        self.interval = interval
+        self.orphan_ttl = orphan_ttl
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _directories(self) -> Iterator[str]:
+        yield self.repos_dir
+        if self.mirrors is not None:
+            yield self.mirrors.directory
+
+    def discard(self, path: str) -> None:
+        """
+        Move a tree out of the way and delete it in the background.
+
+        Args:
+            path: File or directory to delete; may already be gone
+        """
+        trash = os.path.join(os.path.dirname(path), TRASH_DIR)
+        target = os.path.join(trash, f"{os.path.basename(path)}-{uuid.uuid4().hex[:8]}")
+        try:
+            os.makedirs(trash, exist_ok=True)
+            os.rename(path, target)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            # Not renamable (e.g. another file system): delete it in place, still off the caller's path
+            logger.warning(f"Failed to move {path} to the trash: {e}")
+            target = path
+        self._enqueue(target)
+
+    def _enqueue(self, path: str) -> None:
+        with self._pending_lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+        self._queue.put(path)
+
+    def _delete(self, path: str) -> None:
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to delete {path}: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.discard(path)
+
+    def drain(self) -> None:
+        """Delete everything discarded so far in the calling thread."""
+        while True:
+            try:
+                path = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._delete(path)
+
+    def _live_workspaces(self) -> Iterator[str]:
+        try:
+            names = os.listdir(self.repos_dir)
+        except OSError:
+            return
+        for name in names:
+            lock_path = os.path.join(self.repos_dir, name, LOCK_FILE)
+            if os.path.exists(lock_path) and _lock_is_held(lock_path):
+                yield os.path.join(self.repos_dir, name)
+
+    def _borrowed_mirrors(self) -> Set[str]:
+        """Return the mirrors the checkouts of live tasks borrow objects from."""
+        borrowed = set()
+        for workspace in self._live_workspaces():
+            try:
+                checkouts = os.listdir(workspace)
+            except OSError:
+                continue
+            for checkout in checkouts:
+                alternates = os.path.join(workspace, checkout, ".git", "objects", "info", "alternates")
+                try:
+                    with open(alternates) as f:
+                        borrowed.update(os.path.dirname(os.path.normpath(line.strip())) for line in f if line.strip())
+                except OSError:
+                    continue
+        return borrowed
+
+    def _borrowed(self, mirror: str) -> bool:
+        """Whether the checkout of a live task borrows objects from mirror."""
+        return mirror in self._borrowed_mirrors()
+
+    def remove_orphans(self) -> int:
+        """
+        Discard the workspaces of dead tasks and leftovers older than the orphan TTL.
+
+        Returns:
+            int: Number of discarded entries
+        """
+        removed = 0
+        now = time.time()
+        try:
+            names = os.listdir(self.repos_dir)
+        except OSError:
+            return 0
+        for name in names:
+            if name == TRASH_DIR:
+                continue
+            path = os.path.join(self.repos_dir, name)
+            lock_path = os.path.join(path, LOCK_FILE)
+            try:
+                if os.path.exists(lock_path):
+                    orphaned = now - os.path.getmtime(lock_path) > LOCK_GRACE and not _lock_is_held(lock_path)
+                else:
+                    orphaned = now - os.lstat(path).st_mtime > self.orphan_ttl
+            except OSError:
+                continue
+            if orphaned:
+                logger.info(f"Removing orphaned workspace entry {path}")
+                self.discard(path)
+                removed += 1
+        return removed
+
+    def usage(self) -> int:
+        """Return the bytes used by repos_dir and the mirror directory, trash excluded."""
+        total = 0
+        for directory in self._directories():
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            total += sum(disk_usage(os.path.join(directory, name)) for name in names if name != TRASH_DIR)
+        return total
+
+    def enforce_quota(self) -> int:
+        """
+        Evict least recently used mirrors until the usage is below the quota.
+
+        Returns:
+            int: Number of evicted mirrors
+        """
+        if not self.quota:
+            return 0
+        usage = self.usage()
+        if usage <= self.quota:
+            return 0
+        evicted = 0
+        if self.mirrors is not None:
+            for mirror in self.mirrors.least_recently_used():
+                if usage <= self.quota:
+                    break
+                size = disk_usage(mirror)
+                if self.mirrors.evict(mirror, self.discard, self._borrowed):
+                    logger.info(f"Evicted mirror {mirror} ({size // (1024 * 1024)} MB) above the disk quota")
+                    usage -= size
+                    evicted += 1
+        if usage > self.quota:
+            logger.warning(
+                f"Workspaces use {usage // (1024 * 1024)} MB, above the quota of "
+                f"{self.quota // (1024 * 1024)} MB, with nothing left to evict"
+            )
+        return evicted
+
+    def sweep(self) -> None:
+        """Remove orphans and expired mirrors, enforce the quota and collect leftover trash."""
+        for directory in self._directories():
+            trash = os.path.join(directory, TRASH_DIR)
+            for name in os.listdir(trash) if os.path.isdir(trash) else []:
+                self._enqueue(os.path.join(trash, name))
+        self.remove_orphans()
+        if self.mirrors is not None:
+            removed = self.mirrors.purge_unused(self.discard, self._borrowed)
+            if removed:
+                logger.info(f"Removed {removed} unused repository mirror(s)")
+        self.enforce_quota()
+
+    def _run_deletions(self):
+        while not self._stop.is_set():
+            try:
+                path = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            self._delete(path)
+
+    def _run_sweeps(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Workspace sweep failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> "WorkspaceJanitor":
+        """Start deleting and sweeping in daemon threads."""
+        if not self._threads:
+            self._threads = [
+                threading.Thread(target=self._run_deletions, name='janitor-delete', daemon=True),
+                threading.Thread(target=self._run_sweeps, name='janitor-sweep', daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background threads."""
+        self._stop.set()
@@ -0,0 +1,81 @@
+"""
+Streaming JSON reading for large tool outputs.
+
+Tools such as scancode, osv-scanner and ORT write results of hundreds of MB.
+These helpers read them from a file incrementally with ijson, so neither the
+raw bytes nor the decoded text are held in memory next to the parsed data,
+and callers can iterate the interesting array items one at a time. Without
+ijson installed they fall back to json.load on the file.
+"""
+
+import json
+from typing import Any, Iterator
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - exercised only without ijson
+    ijson = None
+
+# Errors raised for malformed documents by either backend
+JSONError = (ValueError, ijson.JSONError) if ijson is not None else (ValueError,)
+
+
+def load(path: str) -> Any:
+    """
+    Parse the JSON document in path.
+
+    Raises:
+        ValueError: If the file is empty or not valid JSON
+    """
+    with open(path, "rb") as f:
+        if ijson is not None:
+            for document in ijson.items(f, "", use_float=True):
+                return document
+            raise ValueError(f"No JSON document in {path}")
+        return json.load(f)
+
+
+def _navigate(node: Any, keys) -> Any:
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def get(path: str, prefix: str, default: Any = None) -> Any:
+    """
+    Return the value at prefix (dot separated keys), default if it does not exist.
+
+    Only the addressed value is built; the rest of the document is skipped.
+    """
+    with open(path, "rb") as f:
+        if ijson is not None:
+            for value in ijson.items(f, prefix, use_float=True):
+                return value
+            return default
+        value = _navigate(json.load(f), prefix.split("."))
+    return default if value is None else value
+
+
+def iter_items(path: str, prefix: str) -> Iterator[Any]:
+    """
+    Yield the items of the array at prefix one at a time.
+
+    Args:
+        path: JSON file
+        prefix: ijson prefix of the array items, e.g. "analyzer.result.packages.item"
+
+    Yields:
+        Parsed array items; nothing if the array does not exist
+    """
+    with open(path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, prefix, use_float=True)
+            return
+        node = json.load(f)
+
+    keys = prefix.split(".")
+    if keys[-1] != "item":
+        raise ValueError(f"Prefix must address array items: {prefix}")
+    yield from _navigate(node, keys[:-1]) or ()
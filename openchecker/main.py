@@ -1,10 +1,6 @@
 from flask import Flask, request
-from flask_restful import Resource, Api
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity, create_access_token
-from user_manager import authenticate, identity
 from datetime import timedelta
 import os
-from message_queue import test_rabbitmq_connection, create_queue, publish_message
 from helper import read_config
 from logger import setup_logging, get_logger, log_performance
 import json
@@ -25,17 +21,42 @@ jwt_config = read_config('config/config.ini', "JWT")
 secret_key = jwt_config.get("secret_key", "your_secret_key")
 expires_minutes = int(jwt_config.get("expires_minutes", 30))
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = secret_key
-app.config['JWT_SECRET_KEY'] = secret_key
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=expires_minutes)
+config = read_config('config/config.ini', "RabbitMQ")
+
+
+# flask_restful, flask_jwt_extended, user_manager and message_queue (pika) are
+# imported on first use, so starting the API only pays for Flask itself.
+def authenticate(username, password):
+    from user_manager import authenticate
+    return authenticate(username, password)
+
+
+def identity(payload):
+    from user_manager import identity
+    return identity(payload)
+
+
+def create_access_token(identity):
+    from flask_jwt_extended import create_access_token
+    return create_access_token(identity=identity)
+
 
-api = Api(app)
+def jwt_required(*args, **kwargs):
+    from flask_jwt_extended import jwt_required
+    return jwt_required(*args, **kwargs)
+
+
+def get_jwt_identity():
+    from flask_jwt_extended import get_jwt_identity
+    return get_jwt_identity()
+
+
+def publish_message(config, queue_name, message_body):
+    from message_queue import publish_message
+    return publish_message(config, queue_name, message_body)
 
-jwt = JWTManager(app)
 
 # Authentication route
-@app.route('/auth', methods=['POST'])
 def auth():
     # try Basic Auth
     auth = request.authorization
@@ -55,9 +76,6 @@ def auth():
         return {"access_token": access_token, "token_type": "Bearer"}
     return {"error": "Missing credentials"}, 401
 
-config = read_config('config/config.ini', "RabbitMQ")
-
-@app.before_request
 def before_request():
     """Pre-request processing"""
     logger.info(f"Received request: {request.method} {request.path}", 
@@ -68,7 +86,6 @@ def before_request():
                    'user_agent': request.headers.get('User-Agent', '')
                }})
 
-@app.after_request
 def after_request(response):
     """Post-request processing"""
     logger.info(f"Response completed: {response.status_code}", 
@@ -78,78 +95,113 @@ def after_request(response):
                }})
     return response
 
-@app.errorhandler(Exception)
 def handle_exception(e):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
     return {"error": "Internal Server Error"}, 500
 
-class Test(Resource):
-    @jwt_required()
-    def get(self):
-        user_id = get_jwt_identity()
-        user = identity({'identity': user_id})
-        logger.info("Test endpoint called", extra={'extra_fields': {'user_id': user_id}})
-        return user
-
-    @jwt_required()
-    def post(self):
-        payload = request.get_json()
-        message = payload['message']
-
-        user_id = get_jwt_identity()
-        logger.info("Test POST endpoint called", 
-                   extra={'extra_fields': {
-                       'user_id': user_id,
-                       'message': message
-                   }})
 
-        return "Message received: {}, test pass!".format(message)
-
-class OpenCheck(Resource):
-    @jwt_required()
-    @log_performance('openchecker.api')
-    def post(self):
-        payload = request.get_json()
-
-        #TODO  do request body check here.
-
-        message_body = {
-            "command_list": payload['commands'],
-            "project_url": payload['project_url'],
-            "commit_hash": payload.get("commit_hash"),
-            "access_token": payload.get("access_token"),
-            "callback_url": payload['callback_url'],
-            "task_metadata": payload['task_metadata']
-        }
-
-        user_id = get_jwt_identity()
-        logger.info("Started processing OpenCheck request", 
-                   extra={'extra_fields': {
-                       'user_id': user_id,
-                       'project_url': payload['project_url'],
-                       'commands': payload['commands'],
-                       'callback_url': payload['callback_url']
-                   }})
-
-        pub_res = publish_message(config, "opencheck", json.dumps(message_body))
-
-        logger.info("OpenCheck message published to queue", 
-                   extra={'extra_fields': {
-                       'publish_result': pub_res,
-                       'project_url': payload['project_url']
-                   }})
-
-        return "Message received: {}, start check, the results would sent to callback_url you passed later.".format(message_body)
-
-
-api.add_resource(Test, '/test')
-api.add_resource(OpenCheck, '/opencheck')
+def create_app():
+    """
+    Build the Flask application with its JWT setup and REST resources.
+
+    Returns:
+        Flask: The configured application
+    """
+    from flask_restful import Resource, Api
+    from flask_jwt_extended import JWTManager
+
+    class Test(Resource):
+        @jwt_required()
+        def get(self):
+            user_id = get_jwt_identity()
+            user = identity({'identity': user_id})
+            logger.info("Test endpoint called", extra={'extra_fields': {'user_id': user_id}})
+            return user
+
+        @jwt_required()
+        def post(self):
+            payload = request.get_json()
+            message = payload['message']
+
+            user_id = get_jwt_identity()
+            logger.info("Test POST endpoint called", 
+                       extra={'extra_fields': {
+                           'user_id': user_id,
+                           'message': message
+                       }})
+
+            return "Message received: {}, test pass!".format(message)
+
+    class OpenCheck(Resource):
+        @jwt_required()
+        @log_performance('openchecker.api')
+        def post(self):
+            payload = request.get_json()
+
+            #TODO  do request body check here.
+
+            message_body = {
+                "command_list": payload['commands'],
+                "project_url": payload['project_url'],
+                "commit_hash": payload.get("commit_hash"),
+                "access_token": payload.get("access_token"),
+                "callback_url": payload['callback_url'],
+                "task_metadata": payload['task_metadata']
+            }
+
+            user_id = get_jwt_identity()
+            logger.info("Started processing OpenCheck request", 
+                       extra={'extra_fields': {
+                           'user_id': user_id,
+                           'project_url': payload['project_url'],
+                           'commands': payload['commands'],
+                           'callback_url': payload['callback_url']
+                       }})
+
+            pub_res = publish_message(config, "opencheck", json.dumps(message_body))
+
+            logger.info("OpenCheck message published to queue", 
+                       extra={'extra_fields': {
+                           'publish_result': pub_res,
+                           'project_url': payload['project_url']
+                       }})
+
+            return "Message received: {}, start check, the results would sent to callback_url you passed later.".format(message_body)
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = secret_key
+    app.config['JWT_SECRET_KEY'] = secret_key
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=expires_minutes)
+
+    api = Api(app)
+
+    JWTManager(app)
+
+    app.add_url_rule('/auth', view_func=auth, methods=['POST'])
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.register_error_handler(Exception, handle_exception)
+
+    api.add_resource(Test, '/test')
+    api.add_resource(OpenCheck, '/opencheck')
+    return app
+
+
+def __getattr__(name):
+    # The application is built when first requested, e.g. by
+    # ``from main import app``
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # @log_performance('openchecker.init')
 def init():
     """Initialize application"""
+    from message_queue import test_rabbitmq_connection, create_queue, create_retry_queues, retry_delays
+
     logger.info("Starting application initialization")
     
     try:
@@ -161,6 +213,8 @@ def init():
         
         create_queue(config, "opencheck", arguments={'x-dead-letter-exchange': '', 'x-dead-letter-routing-key': 'dead_letters'})
         # logger.info("Main queue created successfully")
+
+        create_retry_queues(config, "opencheck", retry_delays(config))
         
         logger.info("Application initialization completed")
     except Exception as e:
@@ -169,6 +223,7 @@ def init():
 
 if __name__ == '__main__':
     init()
+    app = create_app()
 
     server_config = read_config('config/config.ini', "OpenCheck")
 
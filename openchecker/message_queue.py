@@ -4,6 +4,10 @@ import time
 import threading
 from logger import get_logger
 import functools
+import copy
+import hashlib
+import random
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 
 
@@ -36,6 +40,18 @@ class ThreadSafeChannel:
         )
         self._connection.add_callback_threadsafe(cb)
         logger.debug(f"Scheduled NACK for delivery_tag: {delivery_tag}, requeue: {requeue}")
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        """Thread-safe message publishing"""
+        cb = functools.partial(
+            self._channel.basic_publish,
+            exchange=exchange,
+            routing_key=routing_key,
+            body=body,
+            properties=properties
+        )
+        self._connection.add_callback_threadsafe(cb)
+        logger.debug(f"Scheduled publish to: {routing_key}")
     
     def __getattr__(self, name):
         """Proxy other methods to the original channel"""
@@ -44,6 +60,234 @@ class ThreadSafeChannel:
 # Get logger for message queue module
 logger = get_logger('openchecker.queue')
 
+
+class ReconnectBackoff:
+    """
+    Delays between reconnect attempts: exponential with full jitter, starting
+    in the milliseconds so that a short broker blip costs almost nothing.
+
+    Opening a connection does not reset the delays: a consumer whose channel
+    fails right away (missing queue, access refused) keeps backing off. They
+    start over once a connection delivered a message or stayed up for
+    stable_after seconds.
+    """
+    def __init__(self, initial=0.1, maximum=30.0, multiplier=2.0, stable_after=60.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.stable_after = stable_after
+        self.attempts = 0
+        self._connected_at = None
+
+    def connected(self):
+        """Record that a connection was established."""
+        self._connected_at = time.monotonic()
+
+    def next_delay(self):
+        """Return the delay before the next attempt and count the attempt."""
+        if self._connected_at is not None and time.monotonic() - self._connected_at >= self.stable_after:
+            self.attempts = 0
+        self._connected_at = None
+        ceiling = min(self.maximum, self.initial * self.multiplier ** self.attempts)
+        self.attempts += 1
+        return random.uniform(ceiling / 2, ceiling)
+
+    def reset(self):
+        """Start over, e.g. after a connection delivered a message."""
+        self.attempts = 0
+
+
+class InFlightTask:
+    """A task running on this consumer and the delivery it will settle."""
+    def __init__(self, key, channel, delivery_tag, generation):
+        self.key = key
+        self.channel = channel
+        self.delivery_tag = delivery_tag
+        self.generation = generation
+
+
+class InFlightTasks:
+    """
+    Tasks of a consumer tracked across connection generations.
+
+    Delivery tags are only valid on the channel that delivered the message.
+    When the connection is lost while a task runs, the broker redelivers its
+    message; the redelivery is attached to the running task instead of
+    starting the work again, and the task settles the newest delivery when
+    it finishes. Redeliveries of messages this consumer already finished are
+    settled right away with the recorded outcome.
+    """
+    def __init__(self, completed_ttl=3600, max_completed=10000):
+        self.completed_ttl = completed_ttl
+        self.max_completed = max_completed
+        self.generation = 0
+        self._running = {}
+        self._completed = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def message_key(properties, body):
+        """Identify a message by its message_id, or by its body if it has none."""
+        message_id = getattr(properties, 'message_id', None)
+        return message_id if message_id else hashlib.sha256(body).hexdigest()
+
+    def new_generation(self):
+        """Start a connection generation; returns its number."""
+        with self._lock:
+            self.generation += 1
+            return self.generation
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(tasks) for tasks in self._running.values())
+
+    def begin(self, key, channel, delivery_tag, redelivered):
+        """
+        Register a delivery.
+
+        Returns:
+            InFlightTask to run, or None if the delivery was attached to a
+            running task or settled from a recorded outcome
+        """
+        with self._lock:
+            # Without the redelivered flag it is a new submission of the same body, run on its own
+            running = self._running.get(key, []) if redelivered else []
+            for task in running:
+                if task.generation < self.generation:
+                    logger.warning(f"Message {key[:12]} redelivered while its task is still running, attaching delivery")
+                    task.channel, task.delivery_tag, task.generation = channel, delivery_tag, self.generation
+                    return None
+
+            outcome = self._completed.get(key) if redelivered else None
+            if outcome is None or time.time() - outcome[1] > self.completed_ttl:
+                task = InFlightTask(key, channel, delivery_tag, self.generation)
+                self._running.setdefault(key, []).append(task)
+                return task
+
+        success = outcome[0]
+        logger.warning(f"Message {key[:12]} redelivered after its task finished, settling it with the recorded outcome")
+        if success:
+            channel.basic_ack(delivery_tag=delivery_tag)
+        else:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=False)
+        return None
+
+    def settle(self, task, success, requeue=False):
+        """
+        Acknowledge (success) or reject the newest delivery of a finished task.
+
+        If that delivery belongs to a lost connection the broker redelivers
+        the message; the recorded outcome then settles the redelivery.
+        """
+        with self._lock:
+            tasks = self._running.get(task.key, [])
+            if task in tasks:
+                tasks.remove(task)
+            if not tasks:
+                self._running.pop(task.key, None)
+            if not requeue:
+                self._completed[task.key] = (success, time.time())
+                self._completed.move_to_end(task.key)
+                while len(self._completed) > self.max_completed:
+                    self._completed.popitem(last=False)
+            channel, delivery_tag = task.channel, task.delivery_tag
+
+        try:
+            if success:
+                channel.basic_ack(delivery_tag=delivery_tag)
+            else:
+                channel.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
+        except Exception as e:
+            logger.warning(f"Could not settle message {task.key[:12]} on its connection, "
+                           f"its redelivery will be settled instead: {e}")
+
+
+class TaskChannel:
+    """
+    Channel handed to a task's callback: basic_ack and basic_nack settle the
+    task's newest delivery through InFlightTasks, whatever connection
+    delivered it.
+    """
+    def __init__(self, tasks, task):
+        self._tasks = tasks
+        self._task = task
+
+    def basic_ack(self, delivery_tag=None, multiple=False):
+        self._tasks.settle(self._task, True)
+
+    def basic_nack(self, delivery_tag=None, multiple=False, requeue=True):
+        self._tasks.settle(self._task, False, requeue=requeue)
+
+    def __getattr__(self, name):
+        return getattr(self._task.channel, name)
+
+# Header counting how often a message went through the retry queues
+RETRY_ATTEMPT_HEADER = 'x-openchecker-attempt'
+
+
+def retry_delays(config):
+    """Delays in seconds of the retry queue ladder, from RabbitMQ.retry_delays_s."""
+    return [int(d) for d in str(config.get('retry_delays_s', '')).split(',') if d.strip()]
+
+
+def retry_queue_name(queue_name, delay):
+    return f"{queue_name}.retry.{delay}s"
+
+
+def retry_attempt(properties):
+    """Number of retries a delivered message already went through."""
+    headers = getattr(properties, 'headers', None) or {}
+    return int(headers.get(RETRY_ATTEMPT_HEADER, 0))
+
+
+def create_retry_queues(config, queue_name, delays):
+    """
+    Declare the retry queue ladder of queue_name.
+
+    Messages published to a retry queue expire after its delay and are
+    dead-lettered back to queue_name, so failed tasks are retried later
+    without a busy requeue loop.
+    """
+    for delay in delays:
+        create_queue(config, retry_queue_name(queue_name, delay), arguments={
+            'x-message-ttl': delay * 1000,
+            'x-dead-letter-exchange': '',
+            'x-dead-letter-routing-key': queue_name
+        })
+
+
+def publish_retry(channel, queue_name, delays, properties, body, error_msg):
+    """
+    Publish a failed message to the next retry queue.
+
+    The message keeps its properties (message_id, content_type,
+    correlation_id, ...), only the retry headers are updated. The
+    per-message TTL and the validated user_id are not carried over.
+
+    Returns:
+        bool: False if the message has gone through every retry queue already
+    """
+    attempt = retry_attempt(properties)
+    if attempt >= len(delays):
+        return False
+    headers = dict(getattr(properties, 'headers', None) or {})
+    headers[RETRY_ATTEMPT_HEADER] = attempt + 1
+    headers['x-openchecker-last-error'] = str(error_msg)[:1024]
+    retry_properties = copy.copy(properties) if properties is not None else pika.BasicProperties()
+    retry_properties.headers = headers
+    retry_properties.delivery_mode = 2
+    retry_properties.expiration = None
+    retry_properties.user_id = None
+    channel.basic_publish(
+        exchange='',
+        routing_key=retry_queue_name(queue_name, delays[attempt]),
+        body=body,
+        properties=retry_properties
+    )
+    logger.warning(f"Retrying message in {delays[attempt]}s (attempt {attempt + 1}/{len(delays)}): {error_msg}")
+    return True
+
+
 def create_queue(config, queue_name, arguments={}):
     credentials = pika.PlainCredentials(config['username'], config['password'])
     parameters = pika.ConnectionParameters(config['host'], int(config['port']), '/', credentials)
@@ -81,7 +325,7 @@ def publish_message(config, queue_name, message_body):
         logger.error(f"Message publishing failed: {e}")
         return str(e)
 
-def consumer(config, queue_name, callback_func):
+def consumer(config, queue_name, callback_func, task_slots=1):
     """
     Consumer function that supports long-running tasks while maintaining heartbeat.
     
@@ -89,7 +333,17 @@ def consumer(config, queue_name, callback_func):
     1. Use thread pool to execute actual time-consuming tasks (callback_func)
     2. Main thread sends heartbeat periodically via connection.process_data_events()
     3. Use connection.add_callback_threadsafe() to ensure thread-safe message acknowledgment
+
+    Up to task_slots tasks run at the same time. The prefetch count equals the
+    number of slots, so the broker only delivers a new message once a running
+    task has acknowledged (and thereby freed) its slot.
+
+    Lost connections are re-established after a jittered exponential backoff
+    starting at reconnect_initial_delay_ms. Tasks keep running across
+    reconnects and are tracked in InFlightTasks, so redelivered messages are
+    not scanned a second time.
     """
+    task_slots = max(1, int(task_slots))
     credentials = pika.PlainCredentials(config['username'], config['password'])
     parameters = pika.ConnectionParameters(
         config['host'], 
@@ -100,8 +354,14 @@ def consumer(config, queue_name, callback_func):
         blocked_connection_timeout=int(config['blocked_connection_timeout_ms'])
     )
     
+    backoff = ReconnectBackoff(
+        initial=float(config.get('reconnect_initial_delay_ms', 100)) / 1000,
+        maximum=float(config.get('reconnect_max_delay_s', 30))
+    )
+    in_flight = InFlightTasks()
+
     # Create thread pool for executing time-consuming tasks
-    executor = ThreadPoolExecutor(max_workers=1)
+    executor = ThreadPoolExecutor(max_workers=task_slots)
 
     def create_threaded_callback_wrapper(connection, channel):
         """Create a thread-safe callback wrapper"""
@@ -111,17 +371,23 @@ def consumer(config, queue_name, callback_func):
         def threaded_callback_wrapper(ch, method, properties, body):
             """
             Wrapper callback function that executes actual tasks in thread pool.
-            Passes thread-safe channel wrapper to ensure ACK/NACK operations are thread-safe.
+            Passes a task channel settling the task's newest delivery thread-safely.
             """
+            backoff.reset()
+            key = InFlightTasks.message_key(properties, body)
+            task = in_flight.begin(key, thread_safe_channel, method.delivery_tag, method.redelivered)
+            if task is None:
+                return
+            task_channel = TaskChannel(in_flight, task)
+
             def do_work():
                 try:
-                    # Pass thread-safe channel instead of original channel
-                    callback_func(thread_safe_channel, method, properties, body)
+                    callback_func(task_channel, method, properties, body)
                 except Exception as e:
                     logger.error(f"Error in callback execution: {e}", exc_info=True)
                     # When exception occurs, use thread-safe way to NACK message
                     try:
-                        thread_safe_channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+                        task_channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
                         logger.warning(f"Message NACKed due to error: {method.delivery_tag}")
                     except Exception as nack_error:
                         logger.error(f"Failed to NACK message: {nack_error}")
@@ -132,18 +398,25 @@ def consumer(config, queue_name, callback_func):
         
         return threaded_callback_wrapper
 
+    def wait_before_reconnect():
+        delay = backoff.next_delay()
+        logger.info(f"Reconnecting in {delay:.2f} seconds ({len(in_flight)} task(s) in flight)...")
+        time.sleep(delay)
+
     while True:
         connection = None
         try:
             connection = pika.BlockingConnection(parameters)
             channel = connection.channel()
-            channel.basic_qos(prefetch_count=1)
+            channel.basic_qos(prefetch_count=task_slots)
+            generation = in_flight.new_generation()
+            backoff.connected()
 
             # Create wrapped callback for current connection and channel
             wrapped_callback = create_threaded_callback_wrapper(connection, channel)
             channel.basic_consume(queue=queue_name, on_message_callback=wrapped_callback, auto_ack=False)
-            logger.info('Consumer connected, waiting for messages...')
-            logger.info('Task execution mode: Serial (prefetch_count=1, max_workers=1, manual ACK)')
+            logger.info(f'Consumer connected (connection generation {generation}), waiting for messages...')
+            logger.info(f'Task execution mode: {task_slots} task slot(s) (prefetch_count={task_slots}, max_workers={task_slots}, manual ACK)')
             
             # Periodically call process_data_events to handle heartbeat and message reception
             # This ensures heartbeat is sent normally even when callback executes for long time in worker thread
@@ -152,20 +425,17 @@ def consumer(config, queue_name, callback_func):
 
         except pika.exceptions.ConnectionClosedByBroker as e:
             logger.error(f"Broker closed connection: {e}")
-            logger.info("Retrying in 60 seconds...")
-            time.sleep(60)
+            wait_before_reconnect()
             continue
 
         except pika.exceptions.AMQPChannelError as e:
             logger.error(f"AMQP channel error: {e}")
-            logger.info("Retrying in 60 seconds...")
-            time.sleep(60)
+            wait_before_reconnect()
             continue
 
         except pika.exceptions.AMQPConnectionError as e:
             logger.error(f"AMQP connection error: {e}")
-            logger.info("Retrying in 60 seconds...")
-            time.sleep(60)
+            wait_before_reconnect()
             continue
 
         except KeyboardInterrupt:
@@ -174,8 +444,7 @@ def consumer(config, queue_name, callback_func):
 
         except Exception as e:
             logger.error(f"Consumer failed: {e}", exc_info=True)
-            logger.info("Retrying in 60 seconds...")
-            time.sleep(60)
+            wait_before_reconnect()
             continue
 
         finally:
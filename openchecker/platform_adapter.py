@@ -11,7 +11,6 @@ from logger import get_logger
 import requests
 from typing import Dict, List, Tuple, Optional, Any
 from urllib.parse import urlparse
-from ghapi.all import GhApi, paged
 from helper import read_config
 import os
 
@@ -71,6 +70,19 @@ class PlatformAdapter:
         """
         raise NotImplementedError
         
+    def get_tarball_url(self, project_url: str, tag: str) -> Optional[str]:
+        """
+        获取指定tag的tarball下载URL
+        
+        Args:
+            project_url: 项目URL
+            tag: 标签名称
+            
+        Returns:
+            Optional[str]: tarball URL
+        """
+        raise NotImplementedError
+        
     def get_repo_info(self, project_url: str) -> Tuple[Dict, Optional[str]]:
         """
         获取仓库基本信息
@@ -123,6 +135,9 @@ class GitHubAdapter(PlatformAdapter):
     def get_releases(self, project_url: str) -> Tuple[List[Dict], Optional[str]]:
         """获取GitHub releases"""
         try:
+            # ghapi is imported on first use, it is slow to import
+            from ghapi.all import GhApi, paged
+
             owner_name, repo_name = self.parse_project_url(project_url)
             api = GhApi(owner=owner_name, repo=repo_name)
             
@@ -142,6 +157,14 @@ class GitHubAdapter(PlatformAdapter):
         except ValueError:
             return None
             
+    def get_tarball_url(self, project_url: str, tag: str) -> Optional[str]:
+        """获取GitHub tarball URL"""
+        try:
+            owner_name, repo_name = self.parse_project_url(project_url)
+            return f"https://github.com/{owner_name}/{repo_name}/archive/refs/tags/{tag}.tar.gz"
+        except ValueError:
+            return None
+            
     def get_repo_info(self, project_url: str) -> Tuple[Dict, Optional[str]]:
         """获取GitHub仓库信息"""
         try:
@@ -223,6 +246,14 @@ class GiteeAdapter(PlatformAdapter):
         except ValueError:
             return None
             
+    def get_tarball_url(self, project_url: str, tag: str) -> Optional[str]:
+        """获取Gitee tarball URL"""
+        try:
+            owner_name, repo_name = self.parse_project_url(project_url)
+            return f"https://gitee.com/{owner_name}/{repo_name}/repository/archive/{tag}.tar.gz"
+        except ValueError:
+            return None
+            
     def get_repo_info(self, project_url: str) -> Tuple[Dict, Optional[str]]:
         """获取Gitee仓库信息"""
         try:
@@ -299,6 +330,14 @@ class GitCodeAdapter(PlatformAdapter):
         except ValueError:
             return None
             
+    def get_tarball_url(self, project_url: str, tag: str) -> Optional[str]:
+        """获取GitCode tarball URL"""
+        try:
+            owner_name, repo_name = self.parse_project_url(project_url)
+            return f"https://raw.gitcode.com/{owner_name}/{repo_name}/archive/refs/tags/{tag}.tar.gz"
+        except ValueError:
+            return None
+            
     def get_repo_info(self, project_url: str) -> Tuple[Dict, Optional[str]]:
         """获取GitCode仓库信息"""
         try:
@@ -429,6 +468,23 @@ class PlatformManager:
         else:
             return None
             
+    def get_tarball_url(self, project_url: str, tag: str) -> Optional[str]:
+        """
+        获取指定tag的tarball下载URL
+        
+        Args:
+            project_url: 项目URL
+            tag: 标签名称
+            
+        Returns:
+            Optional[str]: tarball URL
+        """
+        adapter = self.get_adapter(project_url)
+        if adapter:
+            return adapter.get_tarball_url(project_url, tag)
+        else:
+            return None
+            
     def get_repo_info(self, project_url: str) -> Tuple[Dict, Optional[str]]:
         """
         获取仓库基本信息
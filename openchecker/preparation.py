@@ -0,0 +1,183 @@
+"""
+Preparation of the project checkout a task's checkers need.
+
+Checkers declare their prerequisites in the checker registry: nothing for
+checkers that only talk to remote services, "clone" for a checkout of the
+scanned version, "history" for the full history and tags, "lockfiles" for
+generated lock files. plan_preparation derives the least a task has to do:
+no clone at all if no requested checker reads the checkout, a shallow clone
+of the version's tag if none needs history, and lock file generation (which
+runs npm install / ohpm install) only if a checker reads lock files.
+
+Checkers that read only a few files declare them as sparse-checkout
+patterns. If every checker reading the checkout does, the project is cloned
+without file contents (--filter=blob:none) and only the matching files are
+checked out, so their contents are the only ones fetched. A tagged version
+none of whose checkers needs git metadata is downloaded as a source archive
+instead, see source_archives.py.
+"""
+
+import os
+import shutil
+from typing import Iterable, List, Optional
+
+from constans import shell_script_handlers
+from logger import get_logger
+from runner import run_command
+
+logger = get_logger('openchecker.preparation')
+
+GIT_ENV = dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ASKPASS="/bin/true")
+
+
+class PreparationPlan:
+    """Preparation steps of one task."""
+
+    def __init__(
+        self,
+        clone: bool,
+        full_history: bool,
+        lockfiles: bool,
+        paths: Optional[List[str]] = None,
+        archive: bool = False
+    ):
+        """
+        Args:
+            clone: Whether the project has to be cloned
+            full_history: Whether the clone needs the full history and tags;
+                a shallow clone of the scanned version otherwise
+            lockfiles: Whether lock files have to be generated
+            paths: Sparse-checkout patterns of the files to check out, None
+                for the whole tree
+            archive: Whether the tree of a tagged version may be extracted
+                from a source archive instead of cloned
+        """
+        self.clone = clone
+        self.full_history = clone and full_history
+        self.lockfiles = clone and lockfiles
+        self.paths = paths if clone else None
+        self.archive = clone and archive and not self.full_history and self.paths is None
+
+    def __repr__(self):
+        return (
+            f"PreparationPlan(clone={self.clone}, full_history={self.full_history}, "
+            f"lockfiles={self.lockfiles}, paths={self.paths}, archive={self.archive})"
+        )
+
+
+def download_script(project_url: str, version_number: str, full_history: bool = True) -> str:
+    """
+    Return the shell script cloning the project and checking out version_number.
+
+    Args:
+        project_url: Project URL
+        version_number: Tag to check out, "None" for the default branch
+        full_history: Clone the whole history; a clone of depth 1 of the tag otherwise
+    """
+    name = "download-checkout" if full_history else "download-checkout-shallow"
+    return shell_script_handlers[name].format(project_url=project_url, version_number=version_number)
+
+
+def sparse_checkout(checkout: str, paths: List[str], timeout: Optional[float] = None) -> bool:
+    """
+    Check out the files matching paths in a clone made with --no-checkout.
+
+    Args:
+        checkout: Directory of the clone
+        paths: Sparse-checkout patterns (gitignore syntax)
+        timeout: Seconds each git command may take, None for the configured default
+
+    Returns:
+        bool: False if the checkout failed
+    """
+    info_dir = os.path.join(checkout, ".git", "info")
+    os.makedirs(info_dir, exist_ok=True)
+    with open(os.path.join(info_dir, "sparse-checkout"), "w") as f:
+        f.writelines(path + "\n" for path in paths)
+    for args in (["config", "core.sparseCheckout", "true"], ["checkout", "-q", "HEAD"]):
+        result = run_command(["git", "-C", checkout] + args, timeout=timeout, env=GIT_ENV)
+        if not result.ok:
+            logger.warning(f"Sparse checkout failed: {result.stderr.decode(errors='replace').strip()}")
+            return False
+    return True
+
+
+def partial_clone(
+    project_url: str,
+    version_number: str,
+    destination: str,
+    paths: List[str],
+    full_history: bool = True,
+    timeout: Optional[float] = None
+) -> bool:
+    """
+    Clone a project without file contents and check out the files matching paths.
+
+    Mirrors download-checkout: the tag named version_number if it exists,
+    the default branch otherwise.
+
+    Args:
+        project_url: Project URL
+        version_number: Tag to check out, "None" for the default branch
+        destination: Directory of the checkout, removed again on failure
+        paths: Sparse-checkout patterns (gitignore syntax)
+        full_history: Clone the whole history; only the scanned commit otherwise
+        timeout: Seconds each git command may take, None for the configured default
+
+    Returns:
+        bool: False if nothing was checked out
+    """
+    clone = ["git", "clone", "-q", "--filter=blob:none", "--no-checkout"]
+    if not full_history:
+        clone += ["--depth", "1"]
+    if version_number and version_number != "None" and run_command(
+        ["git", "ls-remote", "--exit-code", "--tags", project_url, f"refs/tags/{version_number}"],
+        timeout=timeout, env=GIT_ENV
+    ).ok:
+        clone += ["--branch", version_number]
+    result = run_command(clone + [project_url, destination], timeout=timeout, env=GIT_ENV)
+    if not result.ok:
+        logger.warning(f"Partial clone failed: {result.stderr.decode(errors='replace').strip()}")
+    if result.ok and sparse_checkout(destination, paths, timeout):
+        return True
+    shutil.rmtree(destination, ignore_errors=True)
+    return False
+
+
+def plan_preparation(
+    specs: Iterable,
+    full_history: bool = False,
+    sparse: bool = True,
+    archives: bool = True
+) -> PreparationPlan:
+    """
+    Return the minimal preparation of a task.
+
+    Args:
+        specs: CheckerSpecs of the commands to run
+        full_history: Clone the full history even if no checker declares it,
+            e.g. because shallow clones are disabled or an incremental rescan
+            diffs against an earlier commit
+        sparse: Check out only the paths declared by the checkers if all of
+            them declare some
+        archives: Allow source archives if no checker needs git metadata
+
+    Returns:
+        PreparationPlan: Preparation steps of the task
+    """
+    readers = [spec for spec in specs if spec.prerequisites]
+    prerequisites = set()
+    for spec in readers:
+        prerequisites.update(spec.prerequisites)
+    paths = None
+    if sparse and readers and all(spec.paths for spec in readers):
+        paths = sorted({path for spec in readers for path in spec.paths})
+    plan = PreparationPlan(
+        clone=bool(prerequisites),
+        full_history=full_history or 'history' in prerequisites,
+        lockfiles='lockfiles' in prerequisites,
+        paths=paths,
+        archive=archives and 'git' not in prerequisites
+    )
+    logger.debug(f"Preparation of the task: {plan}")
+    return plan
@@ -0,0 +1,90 @@
+"""
+Recycling process pool.
+
+Runs tasks in pooled child processes so that CPU-bound Python work in
+different tasks does not contend on one GIL, and retires the children after
+a number of tasks so that memory leaked by one task cannot grow forever.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from logger import get_logger
+
+logger = get_logger('openchecker.process_pool')
+
+
+class RecyclingProcessPool:
+    """
+    Process pool whose worker processes are replaced after max_tasks_per_child tasks.
+
+    ProcessPoolExecutor only supports per-child recycling from Python 3.11, so
+    the whole executor is retired instead once max_workers * max_tasks_per_child
+    tasks were submitted to it. A retired executor finishes its running tasks
+    before its processes exit. A pool broken by a killed child is replaced too.
+    """
+
+    def __init__(self, max_workers: int = 1, max_tasks_per_child: int = 10):
+        """
+        Args:
+            max_workers: Number of child processes
+            max_tasks_per_child: Tasks a child process runs before it is replaced
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_tasks_per_child = max(1, int(max_tasks_per_child))
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._executor = None
+        self._submitted = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        logger.info(f"Starting task process pool with {self.max_workers} worker(s)")
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context)
+
+    def _retire(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+            self._submitted = 0
+        executor.shutdown(wait=False)
+
+    def _submit(self, func: Callable, *args: Any):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+            executor = self._executor
+            self._submitted += 1
+            future = executor.submit(func, *args)
+            if self._submitted >= self.max_workers * self.max_tasks_per_child:
+                logger.info("Recycling task process pool")
+                self._retire(executor)
+        return executor, future
+
+    def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Run func(*args) in a child process and wait for its result.
+
+        The arguments and the result travel through the pool's pipe, so both
+        must be picklable.
+
+        Raises:
+            Exception: Whatever func raised, or BrokenProcessPool if the child died
+        """
+        executor, future = self._submit(func, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            logger.error("Task process pool is broken, a child process terminated abruptly")
+            with self._lock:
+                if self._executor is executor:
+                    self._retire(executor)
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
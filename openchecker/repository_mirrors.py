@@ -0,0 +1,250 @@
+"""
+Persistent mirrors of the scanned repositories.
+
+The first task scanning a project fetches its branches and tags into a bare
+mirror kept by the agent; later tasks only fetch what changed since. A task's
+checkout is a local clone sharing the mirror's objects (git clone --shared),
+which takes seconds even for repositories with long histories and puts no
+load on the hosting platform beyond the incremental fetch.
+
+Fetches and removals of a mirror hold an exclusive flock on it, checkouts a
+shared one. A task that waited for another task's fetch of the same mirror
+does not fetch again. Mirrors no task used for the store's TTL are removed;
+above the workspace disk quota the janitor evicts the least recently used
+ones, see janitor.py.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from logger import get_logger
+from preparation import GIT_ENV, sparse_checkout
+from result_cache import repository_name
+from runner import run_command
+
+logger = get_logger('openchecker.repository_mirrors')
+
+# Refs kept in a mirror; pull request refs and other platform refs are left out
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+def _remove_tree(path: str) -> None:
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _git(args: List[str], timeout: Optional[float] = None):
+    return run_command(["git"] + args, timeout=timeout, env=GIT_ENV)
+
+
+class RepositoryMirrors:
+    """Directory of bare repository mirrors on storage local to the agent."""
+
+    def __init__(self, directory: str, ttl: float = 30 * 86400):
+        """
+        Args:
+            directory: Mirror directory
+            ttl: Seconds after which a mirror no task fetched or checked out is removed
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def mirror_path(self, project_url: str) -> str:
+        """Return the directory of a project's mirror."""
+        digest = hashlib.sha256(project_url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{repository_name(project_url)}-{digest}.git")
+
+    @contextmanager
+    def _locked(self, mirror: str, exclusive: bool) -> Iterator[None]:
+        with open(f"{mirror}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def update(self, project_url: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Create or fetch the mirror of a project.
+
+        Args:
+            project_url: Project URL
+            timeout: Seconds each git command may take, None for the configured default
+
+        Returns:
+            Optional[str]: Mirror directory, None if the remote could not be fetched
+        """
+        mirror = self.mirror_path(project_url)
+        waiting_since = time.time()
+        with self._locked(mirror, exclusive=True):
+            if os.path.isdir(mirror) and os.path.getmtime(mirror) >= waiting_since:
+                # Fetched by another task while this one waited for the lock
+                return mirror
+            if os.path.isdir(mirror):
+                fetched = self._fetch(mirror, timeout)
+            else:
+                fetched = self._create(project_url, mirror, timeout)
+            if not fetched:
+                return None
+            os.utime(mirror)
+            os.utime(f"{mirror}.lock")
+        return mirror
+
+    def _create(self, project_url: str, mirror: str, timeout: Optional[float]) -> bool:
+        tmp_path = f"{mirror}.{uuid.uuid4().hex}.tmp"
+        try:
+            commands = [
+                ["init", "-q", "--bare", tmp_path],
+                ["-C", tmp_path, "config", "remote.origin.url", project_url],
+            ] + [
+                ["-C", tmp_path, "config", "--add", "remote.origin.fetch", refspec] for refspec in MIRROR_REFSPECS
+            ]
+            for args in commands:
+                if not _git(args, timeout).ok:
+                    return False
+            if not self._fetch(tmp_path, timeout):
+                return False
+            os.rename(tmp_path, mirror)
+            logger.info(f"Created mirror of {project_url}")
+            return True
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _fetch(self, mirror: str, timeout: Optional[float]) -> bool:
+        result = _git(["-C", mirror, "fetch", "--prune", "--quiet", "origin"], timeout)
+        if not result.ok:
+            logger.warning(f"Failed to fetch mirror {mirror}: {result.stderr.decode(errors='replace').strip()}")
+            return False
+        # Follow changes of the remote's default branch
+        result = _git(["-C", mirror, "ls-remote", "--symref", "origin", "HEAD"], timeout)
+        for line in result.stdout.decode(errors="replace").splitlines() if result.ok else []:
+            if line.startswith("ref: "):
+                _git(["-C", mirror, "symbolic-ref", "HEAD", line[len("ref: "):].split("\t")[0]], timeout)
+                break
+        return True
+
+    def checkout(
+        self,
+        project_url: str,
+        version_number: Optional[str],
+        destination: str,
+        timeout: Optional[float] = None,
+        paths: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Check out a project version from its mirror, updating the mirror first.
+
+        Mirrors download-checkout: the tag named version_number if it exists,
+        the default branch otherwise. The checkout's origin is the project URL.
+
+        Args:
+            project_url: Project URL
+            version_number: Tag to check out, "None" for the default branch
+            destination: Directory of the checkout, must not exist
+            timeout: Seconds each git command may take, None for the configured default
+            paths: Sparse-checkout patterns of the files to check out, None for the whole tree
+
+        Returns:
+            bool: False if nothing was checked out
+        """
+        mirror = self.update(project_url, timeout)
+        if mirror is None:
+            return False
+        with self._locked(mirror, exclusive=False):
+            clone = ["clone", "-q", "--shared"] + (["--no-checkout"] if paths is not None else [])
+            if version_number and version_number != "None" and _git(
+                ["-C", mirror, "rev-parse", "--verify", "-q", f"refs/tags/{version_number}^{{commit}}"], timeout
+            ).ok:
+                clone += ["--branch", version_number]
+            result = _git(clone + [mirror, destination], timeout)
+            if result.ok:
+                result = _git(["-C", destination, "remote", "set-url", "origin", project_url], timeout)
+            if not result.ok:
+                logger.warning(f"Checkout from mirror failed: {result.stderr.decode(errors='replace').strip()}")
+            if not result.ok or (paths is not None and not sparse_checkout(destination, paths, timeout)):
+                shutil.rmtree(destination, ignore_errors=True)
+                return False
+        os.utime(f"{mirror}.lock")
+        return True
+
+    def _last_used(self, mirror: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(f"{mirror}.lock")
+        except FileNotFoundError:
+            return None
+
+    def least_recently_used(self) -> List[str]:
+        """Return the mirror directories, least recently fetched or checked out first."""
+        mirrors = []
+        for name in os.listdir(self.directory):
+            mirror = os.path.join(self.directory, name)
+            if name.endswith(".git") and os.path.isdir(mirror) and self._last_used(mirror) is not None:
+                mirrors.append(mirror)
+        return sorted(mirrors, key=lambda mirror: self._last_used(mirror) or 0)
+
+    def evict(
+        self,
+        mirror: str,
+        discard: Callable[[str], None] = _remove_tree,
+        borrowed: Callable[[str], bool] = lambda mirror: False
+    ) -> bool:
+        """
+        Remove a mirror unless a task is fetching or checking it out.
+
+        Args:
+            mirror: Mirror directory
+            discard: Function removing the directory
+            borrowed: Whether live checkouts borrow objects from the mirror;
+                asked while holding the mirror's lock, so no checkout starts
+                borrowing from it in the meantime
+
+        Returns:
+            bool: False if the mirror is in use
+        """
+        # The lock file stays, tasks may be waiting for it
+        with open(f"{mirror}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                if borrowed(mirror):
+                    return False
+                discard(mirror)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+    def purge_unused(
+        self,
+        discard: Callable[[str], None] = _remove_tree,
+        borrowed: Callable[[str], bool] = lambda mirror: False
+    ) -> int:
+        """
+        Remove mirrors no task fetched or checked out for longer than the store's TTL.
+
+        Args:
+            discard: Function removing a mirror directory
+            borrowed: Whether live checkouts borrow objects from a mirror,
+                asked while holding its lock; such mirrors are kept
+
+        Returns:
+            int: Number of removed mirrors
+        """
+        removed = 0
+        for mirror in self.least_recently_used():
+            if time.time() - (self._last_used(mirror) or time.time()) <= self.ttl:
+                break
+            # The lock file stays, tasks may be waiting for it
+            with self._locked(mirror, exclusive=True):
+                if borrowed(mirror):
+                    continue
+                discard(mirror)
+            removed += 1
+        return removed
@@ -0,0 +1,387 @@
+"""
+Resource-aware admission control.
+
+Every step of a task carries a resource weight (CPU cores, memory and disk).
+A ResourceBudget derived from the container's cgroup limits admits steps only
+while the summed weights of the running steps fit into it. A step that has
+waited longer than the budget's max_wait holds back every later step until it
+fits, so a stream of light steps cannot starve a heavy one, and a
+PressureMonitor scales the budget down when the kernel reports memory or CPU
+pressure (PSI) or memory usage gets close to the limit, and back up when the
+pressure is gone.
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+from logger import get_logger
+
+logger = get_logger('openchecker.resources')
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+class ResourceWeight(NamedTuple):
+    """Resources a step is expected to use at its peak."""
+    cpu: float
+    memory_mb: int
+    disk_mb: int = 0
+
+
+# Weights of the resource classes checkers declare in the checker registry
+RESOURCE_CLASSES = {
+    # Only calls remote APIs
+    'network': ResourceWeight(cpu=0.1, memory_mb=64),
+    # Reads a few files of the checkout
+    'light': ResourceWeight(cpu=0.5, memory_mb=256),
+    # Runs a single-threaded tool over the checkout
+    'medium': ResourceWeight(cpu=1, memory_mb=512),
+    # Runs a multi-threaded scanner over the checkout
+    'large': ResourceWeight(cpu=2, memory_mb=2048, disk_mb=512),
+    # Builds the project or resolves its whole dependency tree
+    'heavy': ResourceWeight(cpu=2, memory_mb=4096, disk_mb=2048),
+}
+
+# Weight of steps without a declared resource class
+DEFAULT_WEIGHT = RESOURCE_CLASSES['light']
+
+# Weights of the preparation steps of a task
+STEP_WEIGHTS = {
+    # git clone: one core for delta resolution, the checkout on disk
+    'download-checkout': ResourceWeight(cpu=1, memory_mb=1024, disk_mb=2048),
+    # npm/ohpm install resolve and download the whole dependency tree
+    'generate-lock_files': RESOURCE_CLASSES['heavy'],
+}
+
+# Seconds after which a waiting step that stopped polling the budget no
+# longer holds back other steps
+STALE_WAITER_S = 10
+
+
+def step_weight(name: str) -> ResourceWeight:
+    """Resource weight of a preparation step, DEFAULT_WEIGHT for unknown steps."""
+    return STEP_WEIGHTS.get(name, DEFAULT_WEIGHT)
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def read_cgroup_limits(cgroup_root: str = CGROUP_ROOT) -> Dict[str, float]:
+    """
+    Read the CPU and memory limits of the container.
+
+    Supports cgroup v2 (cpu.max, memory.max) and v1 (cpu.cfs_quota_us,
+    memory.limit_in_bytes) and falls back to the host's CPU count and
+    physical memory when no limit is set.
+
+    Returns:
+        Dict[str, float]: {"cpu": cores, "memory_mb": megabytes}
+    """
+    cpu = None
+    cpu_max = _read_file(os.path.join(cgroup_root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            cpu = int(quota) / int(period)
+    else:
+        quota = _read_file(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us"))
+        period = _read_file(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            cpu = int(quota) / int(period)
+    if cpu is None:
+        cpu = float(os.cpu_count() or 1)
+
+    memory = _read_file(os.path.join(cgroup_root, "memory.max"))
+    if memory is None:
+        memory = _read_file(os.path.join(cgroup_root, "memory", "memory.limit_in_bytes"))
+    host_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    if memory and memory != "max" and int(memory) < host_memory:
+        memory_bytes = int(memory)
+    else:
+        memory_bytes = host_memory
+
+    return {"cpu": cpu, "memory_mb": memory_bytes / (1024 * 1024)}
+
+
+def read_pressure(resource: str, cgroup_root: str = CGROUP_ROOT) -> Optional[float]:
+    """
+    Read the PSI "some avg10" value of a resource ("memory", "cpu" or "io").
+
+    Returns:
+        Optional[float]: Percentage of time stalled over the last 10 seconds,
+        None if PSI is not available
+    """
+    content = _read_file(os.path.join(cgroup_root, f"{resource}.pressure"))
+    if content is None and cgroup_root == CGROUP_ROOT:
+        # cgroup v1 hosts only expose system wide pressure
+        content = _read_file(f"/proc/pressure/{resource}")
+    if not content:
+        return None
+    for line in content.splitlines():
+        if line.startswith("some"):
+            for field in line.split()[1:]:
+                key, _, value = field.partition("=")
+                if key == "avg10":
+                    return float(value)
+    return None
+
+
+def read_memory_usage(cgroup_root: str = CGROUP_ROOT) -> Optional[float]:
+    """
+    Fraction of the cgroup memory limit currently in use.
+
+    Returns:
+        Optional[float]: Usage between 0 and 1, None without a memory limit
+    """
+    current = _read_file(os.path.join(cgroup_root, "memory.current"))
+    limit = _read_file(os.path.join(cgroup_root, "memory.max"))
+    if current is None or limit in (None, "max"):
+        return None
+    return int(current) / int(limit)
+
+
+class ResourceBudget:
+    """
+    Thread-safe budget of CPU, memory and disk that running steps reserve from.
+
+    The effective capacity is the configured capacity multiplied by scale,
+    which the PressureMonitor adjusts at runtime. A step is always admitted
+    when nothing else is running, so an oversized weight cannot block forever.
+
+    Callers that retry identify themselves with a ticket. Once the oldest
+    ticket has waited max_wait seconds, no other step is admitted until it
+    fits; the running steps drain and a step heavier than the whole budget
+    then runs alone.
+    """
+
+    def __init__(self, cpu: float, memory_mb: float, disk_mb: float, scale: float = 1.0, max_wait: float = 30):
+        """
+        Args:
+            cpu: CPU cores available to steps
+            memory_mb: Memory available to steps
+            disk_mb: Disk space available to steps
+            scale: Initial fraction of the capacity that may be used
+            max_wait: Seconds a step may wait before later steps are held back for it
+        """
+        self.cpu = cpu
+        self.memory_mb = memory_mb
+        self.disk_mb = disk_mb
+        self.scale = scale
+        self.max_wait = max_wait
+        self._used = ResourceWeight(0, 0, 0)
+        self._running = 0
+        # Ticket -> [first, last] monotonic time a waiting step was turned down
+        self._waiting: Dict[Hashable, List[float]] = {}
+        self._condition = threading.Condition()
+
+    def _fits(self, weight: ResourceWeight) -> bool:
+        if self._running == 0:
+            return True
+        return (
+            self._used.cpu + weight.cpu <= self.cpu * self.scale
+            and self._used.memory_mb + weight.memory_mb <= self.memory_mb * self.scale
+            and self._used.disk_mb + weight.disk_mb <= self.disk_mb
+        )
+
+    def _starving(self, now: float) -> Optional[Hashable]:
+        """Return the oldest ticket that waited longer than max_wait, dropping stale ones."""
+        for ticket, (_, last) in list(self._waiting.items()):
+            if now - last > STALE_WAITER_S:
+                del self._waiting[ticket]
+        if not self._waiting:
+            return None
+        ticket = min(self._waiting, key=lambda t: self._waiting[t][0])
+        return ticket if now - self._waiting[ticket][0] >= self.max_wait else None
+
+    def _try_acquire(self, weight: ResourceWeight, ticket: Optional[Hashable]) -> bool:
+        now = time.monotonic()
+        starving = self._starving(now)
+        if (starving is None or starving == ticket) and self._fits(weight):
+            self._waiting.pop(ticket, None)
+            self._used = ResourceWeight(*(u + w for u, w in zip(self._used, weight)))
+            self._running += 1
+            return True
+        if ticket is not None:
+            self._waiting.setdefault(ticket, [now, now])[1] = now
+        return False
+
+    def try_acquire(self, weight: ResourceWeight, ticket: Optional[Hashable] = None) -> bool:
+        """
+        Reserve weight if it fits into the budget; never blocks.
+
+        Args:
+            weight: Resources to reserve
+            ticket: Hashable identifying a caller that retries until admitted,
+                e.g. the step; it ages while it is turned down
+        """
+        with self._condition:
+            return self._try_acquire(weight, ticket)
+
+    def acquire(self, weight: ResourceWeight, timeout: Optional[float] = None) -> bool:
+        """Reserve weight, waiting until it fits into the budget."""
+        ticket = object()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while not self._try_acquire(weight, ticket):
+                # Wake up in time to keep the ticket from going stale
+                wait = STALE_WAITER_S / 2
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        self._waiting.pop(ticket, None)
+                        return False
+                self._condition.wait(wait)
+            return True
+
+    def withdraw(self, ticket: Hashable) -> None:
+        """Forget a waiting ticket whose step will not be started."""
+        with self._condition:
+            self._waiting.pop(ticket, None)
+            self._condition.notify_all()
+
+    def release(self, weight: ResourceWeight) -> None:
+        """Return a reservation made by try_acquire or acquire."""
+        with self._condition:
+            self._used = ResourceWeight(*(max(0, u - w) for u, w in zip(self._used, weight)))
+            self._running = max(0, self._running - 1)
+            self._condition.notify_all()
+
+    def set_scale(self, scale: float) -> None:
+        """Change the usable fraction of the CPU and memory capacity."""
+        with self._condition:
+            self.scale = scale
+            self._condition.notify_all()
+
+    def set_disk(self, disk_mb: float) -> None:
+        """Change the disk capacity."""
+        with self._condition:
+            self.disk_mb = disk_mb
+            self._condition.notify_all()
+
+    @property
+    def used(self) -> ResourceWeight:
+        with self._condition:
+            return self._used
+
+
+class PressureMonitor:
+    """Background thread adapting a ResourceBudget to the observed pressure."""
+
+    def __init__(
+        self,
+        budget: ResourceBudget,
+        interval: float = 10,
+        pressure_high: float = 10,
+        pressure_low: float = 1,
+        memory_high: float = 0.9,
+        min_scale: float = 0.25,
+        max_scale: float = 1.0,
+        disk_path: Optional[str] = None,
+        disk_share: float = 1.0,
+        cgroup_root: str = CGROUP_ROOT
+    ):
+        """
+        Args:
+            budget: Budget to adjust
+            interval: Seconds between two measurements
+            pressure_high: PSI avg10 above which the budget shrinks
+            pressure_low: PSI avg10 below which the budget may grow
+            memory_high: Fraction of the memory limit above which the budget shrinks
+            min_scale: Lower bound of the budget scale
+            max_scale: Upper bound of the budget scale
+            disk_path: Directory whose free space (plus the disk reserved by
+                running steps) becomes the disk capacity
+            disk_share: Fraction of the free disk space this process may use
+            cgroup_root: cgroup mount point
+        """
+        self.budget = budget
+        self.interval = interval
+        self.pressure_high = pressure_high
+        self.pressure_low = pressure_low
+        self.memory_high = memory_high
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.disk_path = disk_path
+        self.disk_share = disk_share
+        self.cgroup_root = cgroup_root
+        self._stop = threading.Event()
+        self._thread = None
+
+    def adjust(self) -> float:
+        """Take one measurement and rescale the budget; returns the new scale."""
+        pressures = [read_pressure(r, self.cgroup_root) for r in ("memory", "cpu")]
+        pressures = [p for p in pressures if p is not None]
+        memory_usage = read_memory_usage(self.cgroup_root)
+
+        scale = self.budget.scale
+        if (pressures and max(pressures) > self.pressure_high) or (
+                memory_usage is not None and memory_usage > self.memory_high):
+            scale = max(self.min_scale, scale * 0.75)
+        elif all(p < self.pressure_low for p in pressures) and (
+                memory_usage is None or memory_usage < self.memory_high * 0.8):
+            scale = min(self.max_scale, scale + 0.1)
+
+        if scale != self.budget.scale:
+            logger.info(
+                f"Resource budget scale {self.budget.scale:.2f} -> {scale:.2f} "
+                f"(pressure: {pressures}, memory usage: {memory_usage})"
+            )
+            self.budget.set_scale(scale)
+
+        if self.disk_path:
+            try:
+                free_mb = shutil.disk_usage(self.disk_path).free / (1024 * 1024)
+                self.budget.set_disk(free_mb * self.disk_share + self.budget.used.disk_mb)
+            except OSError as e:
+                logger.warning(f"Failed to read free disk space of {self.disk_path}: {e}")
+
+        return scale
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.adjust()
+            except Exception as e:
+                logger.error(f"Pressure monitor failed: {e}")
+
+    def start(self) -> None:
+        """Start monitoring in a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='pressure-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+
+
+def budget_from_environment(share: float = 1.0, disk_path: Optional[str] = None, max_wait: float = 30) -> ResourceBudget:
+    """
+    Create a budget from the container's cgroup limits.
+
+    Args:
+        share: Fraction of the limits this process may use, e.g. 1 / task_slots
+            when every task runs in its own process
+        disk_path: Directory holding the task workspaces
+        max_wait: Seconds a step may wait before later steps are held back for it
+
+    Returns:
+        ResourceBudget
+    """
+    limits = read_cgroup_limits()
+    disk_mb = float("inf")
+    if disk_path and os.path.isdir(disk_path):
+        disk_mb = shutil.disk_usage(disk_path).free / (1024 * 1024)
+    budget = ResourceBudget(limits["cpu"] * share, limits["memory_mb"] * share, disk_mb * share, max_wait=max_wait)
+    logger.info(
+        f"Resource budget: {budget.cpu:.1f} CPU, {budget.memory_mb:.0f} MB memory, {budget.disk_mb:.0f} MB disk"
+    )
+    return budget
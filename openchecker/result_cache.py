@@ -0,0 +1,335 @@
+"""
+Commit-addressed cache of checker results.
+
+Before a task clones anything, the commit its checkout would resolve to is
+looked up with ``git ls-remote``. Results are cached under a key made of
+that commit, the repository (host and owner/name), the checker's name and
+version and the configuration options the checker declares it depends on.
+The host is part of the key because checkers look for platform-specific
+files (.github/workflows vs .workflows). Checkers talking to remote
+services expire after the checker's cache_ttl, because what they report
+changes without a new commit. A rescan of an unchanged repository
+is served from the cache and needs no clone.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from checkpoint import failed_results
+from logger import get_logger
+from runner import run_command
+
+logger = get_logger('openchecker.result_cache')
+
+# Seconds git ls-remote may take before the cache is bypassed
+LS_REMOTE_TIMEOUT = 30
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def repository_name(project_url: str) -> str:
+    """Return the name of the directory a project is cloned into."""
+    name = os.path.basename(project_url.rstrip("/"))
+    return name[:-len(".git")] if name.endswith(".git") else name
+
+
+def repository_identity(project_url: str) -> str:
+    """Return host and path of a project URL (e.g. github.com/owner/repo), the repository part of cache keys."""
+    parsed = urlparse(project_url if "://" in project_url else f"//{project_url}")
+    path = parsed.path.strip("/")
+    if path.endswith(".git"):
+        path = path[:-len(".git")]
+    return f"{parsed.netloc.lower().rpartition('@')[2]}/{path}"
+
+
+def resolve_revision(project_url: str, version_number: Optional[str]) -> Optional[str]:
+    """
+    Return the commit a checkout of the project version resolves to, without cloning.
+
+    Mirrors download-checkout: the tag named version_number if it exists,
+    the default branch otherwise.
+
+    Returns:
+        Optional[str]: Commit SHA, None if the remote could not be queried
+    """
+    refs = ["HEAD"]
+    if version_number and version_number != "None":
+        refs += [f"refs/tags/{version_number}", f"refs/tags/{version_number}^{{}}"]
+    try:
+        result = run_command(
+            ["git", "ls-remote", project_url] + refs,
+            timeout=LS_REMOTE_TIMEOUT,
+            env=dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ASKPASS="/bin/true")
+        )
+    except OSError as e:
+        logger.warning(f"Failed to run git ls-remote: {e}")
+        return None
+    if not result.ok:
+        logger.warning(f"git ls-remote failed for {project_url}: {result.stderr.decode(errors='replace').strip()}")
+        return None
+
+    resolved = {}
+    for line in result.stdout.decode(errors="replace").splitlines():
+        sha, _, ref = line.partition("\t")
+        resolved[ref] = sha
+    # Prefer the commit an annotated tag points to, then the tag, then the default branch
+    for ref in reversed(refs):
+        if ref in resolved:
+            return resolved[ref]
+    return None
+
+
+def revision_file(checkout: str) -> str:
+    """Return the file recording the commit of a checkout extracted from a source archive."""
+    return f"{checkout}.revision"
+
+
+def checkout_revision(checkout: str) -> Optional[str]:
+    """Return the commit checked out in a directory, None if it is unknown."""
+    if not os.path.isdir(os.path.join(checkout, ".git")):
+        try:
+            with open(revision_file(checkout)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    try:
+        result = run_command(["git", "-C", checkout, "rev-parse", "HEAD"], timeout=LS_REMOTE_TIMEOUT)
+    except OSError:
+        return None
+    return result.stdout.decode().strip() if result.ok else None
+
+
+def cache_key(
+    spec,
+    revision: Optional[str],
+    project_url: str,
+    commit_hash: Optional[str],
+    access_token: Optional[str],
+    config: Dict[str, Any]
+) -> str:
+    """
+    Return the cache key of a checker's results.
+
+    Args:
+        spec: CheckerSpec of the checker
+        revision: Commit the task's checkout resolves to; None for the key
+            identifying the checker's results of the project at any commit
+        project_url: Project URL
+        commit_hash: commit_hash of the task, part of the key if the checker takes it
+        access_token: Access token of the task, part of the key (hashed) if the checker takes it
+        config: Agent configuration; the options in spec.config_keys are part of the key
+    """
+    identity = [spec.name, spec.version, revision]
+    identity.append(repository_identity(project_url))
+    for option in spec.config_keys:
+        section, _, name = option.partition(".")
+        identity.append(config.get(section, {}).get(name))
+    if "commit_hash" in spec.args:
+        identity.append(commit_hash)
+    if "access_token" in spec.args:
+        identity.append(hashlib.sha256((access_token or "").encode("utf-8")).hexdigest())
+    return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+
+
+class TaskResults:
+    """Cache entries of the checkers of one task."""
+
+    def __init__(
+        self,
+        cache: "ResultCache",
+        revision: str,
+        specs: Dict[str, Any],
+        identity: Dict[str, Any],
+        checkout: str
+    ):
+        """
+        Args:
+            cache: Result cache
+            revision: Commit the task's checkout resolves to
+            specs: CheckerSpecs of the cached commands by name
+            identity: Remaining arguments of cache_key (project_url,
+                commit_hash, access_token, config)
+            checkout: Directory the project is cloned into
+        """
+        self.cache = cache
+        self.revision = revision
+        self.specs = specs
+        self.identity = identity
+        self.checkout = checkout
+        self.keys = {name: cache_key(spec, revision, **identity) for name, spec in specs.items()}
+        self._checkout_matches = None
+        self._lock = threading.Lock()
+
+    def restore(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the cached results of the task's checkers.
+
+        Returns:
+            Dict mapping each command with a fresh cache entry to its results
+        """
+        restored = {}
+        for command, key in self.keys.items():
+            scan_results = self.cache.load(key, self.specs[command].cache_ttl)
+            if scan_results is not None:
+                restored[command] = scan_results
+        if restored:
+            logger.info(f"Using cached results of {sorted(restored)} at {self.revision[:12]}")
+        return restored
+
+    def save(self, command: str, scan_results: Dict[str, Any]) -> None:
+        """
+        Cache the results of a finished command.
+
+        Results of checkers reading the checkout are only cached if the
+        checkout is at the revision the key was derived from, i.e. nothing
+        was pushed between git ls-remote and the clone.
+        """
+        if command not in self.keys:
+            return
+        if self.specs[command].prerequisites:
+            with self._lock:
+                if self._checkout_matches is None and os.path.isdir(self.checkout):
+                    self._checkout_matches = checkout_revision(self.checkout) == self.revision
+                if not self._checkout_matches:
+                    return
+        self.cache.store(self.keys[command], scan_results)
+        if self.specs[command].incremental_merge and not failed_results(scan_results):
+            # Results of incremental checkers are the base of the next rescan of the project
+            self.cache.set_latest(cache_key(self.specs[command], None, **self.identity), self.revision)
+
+    def previous(self, command: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Return the cached results of a command for the commit scanned before.
+
+        Returns:
+            Optional[Tuple[str, Dict[str, Any]]]: (revision, scan results),
+            None if there are none or they are for the current revision
+        """
+        spec = self.specs[command]
+        revision = self.cache.latest(cache_key(spec, None, **self.identity))
+        if revision is None or revision == self.revision:
+            return None
+        scan_results = self.cache.load(cache_key(spec, revision, **self.identity), spec.cache_ttl)
+        return (revision, scan_results) if scan_results is not None else None
+
+
+class ResultCache:
+    """Directory of cached checker results, on storage shared by the agents."""
+
+    def __init__(self, directory: str, ttl: float = 7 * 86400):
+        """
+        Args:
+            directory: Cache directory
+            ttl: Seconds after which any cached result is no longer used
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, kind: str = "json") -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{kind}")
+
+    def task(
+        self,
+        specs: Iterable[Any],
+        revision: str,
+        project_url: str,
+        commit_hash: Optional[str],
+        access_token: Optional[str],
+        config: Dict[str, Any],
+        workspace: str
+    ) -> TaskResults:
+        """
+        Return the cache entries of a task's checkers.
+
+        Args:
+            specs: CheckerSpecs of the task's commands; checkers with a
+                cache_ttl of 0 are left out
+            revision: Commit the task's checkout resolves to, see resolve_revision
+            workspace: Task workspace the project is cloned into
+        """
+        specs = {spec.name: spec for spec in specs if spec.cache_ttl != 0}
+        identity = dict(project_url=project_url, commit_hash=commit_hash, access_token=access_token, config=config)
+        return TaskResults(self, revision, specs, identity, os.path.join(workspace, repository_name(project_url)))
+
+    def load(self, key: str, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return cached scan results.
+
+        Args:
+            key: Cache key
+            ttl: Maximum age in seconds, capped by the cache's TTL
+
+        Returns:
+            Optional[Dict[str, Any]]: Scan results, None if there is no fresh entry
+        """
+        max_age = self.ttl if ttl is None else min(ttl, self.ttl)
+        entry = _read_json(self._path(key))
+        if entry is None:
+            return None
+        if time.time() - entry.get("stored_at", 0) > max_age:
+            return None
+        return entry["scan_results"]
+
+    def store(self, key: str, scan_results: Dict[str, Any]) -> None:
+        """Cache the scan results of a finished checker; results reporting an error are not cached."""
+        if failed_results(scan_results):
+            return
+        try:
+            _write_json(self._path(key), {"stored_at": time.time(), "scan_results": scan_results})
+        except OSError as e:
+            logger.warning(f"Failed to cache results {key[:12]}: {e}")
+
+    def latest(self, lineage: str) -> Optional[str]:
+        """Return the revision last stored for a lineage (a cache key without revision)."""
+        entry = _read_json(self._path(lineage, "latest"))
+        return entry.get("revision") if entry else None
+
+    def set_latest(self, lineage: str, revision: str) -> None:
+        """Record the revision last stored for a lineage."""
+        try:
+            _write_json(self._path(lineage, "latest"), {"revision": revision})
+        except OSError as e:
+            logger.warning(f"Failed to record latest revision {lineage[:12]}: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        Remove entries older than the cache's TTL.
+
+        Returns:
+            int: Number of removed entries
+        """
+        removed = 0
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, name)
+                try:
+                    if time.time() - os.path.getmtime(path) > self.ttl:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
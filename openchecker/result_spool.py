@@ -0,0 +1,236 @@
+"""
+Disk-backed scan results.
+
+A task's scan_results used to live in memory until the callback serialised
+them in one piece, so large scancode or osv-scanner results were held
+several times over. ResultSpool is the mapping tasks now collect their
+results in: results whose JSON exceeds a threshold are written to a
+task-local spool file as soon as they are stored, and the callback body is
+produced from the spool as a stream of (optionally compressed) chunks, so
+memory no longer grows with the size of the results.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is optional
+    zstandard = None
+
+logger = get_logger('openchecker.result_spool')
+
+CHUNK_SIZE = 64 * 1024
+
+# Results whose JSON is larger than this are spilled to disk
+DEFAULT_SPILL_THRESHOLD = 1024 * 1024
+
+CONTENT_ENCODINGS = ('identity', 'gzip', 'zstd')
+
+
+class ResultSpool(MutableMapping):
+    """Ordered, thread-safe mapping of scan results spilling large values to disk."""
+
+    def __init__(self, directory: Optional[str] = None, spill_threshold: int = DEFAULT_SPILL_THRESHOLD):
+        """
+        Args:
+            directory: Directory the spool directory is created in, defaults to
+                the system temporary directory
+            spill_threshold: Size in bytes of a result's JSON above which it is
+                stored on disk
+        """
+        self.spill_threshold = spill_threshold
+        self._directory = tempfile.mkdtemp(prefix="openchecker-results-", dir=directory)
+        self._entries: Dict[str, Tuple[bool, Any]] = {}
+        self._lock = threading.Lock()
+        self._files = 0
+        self._view = False
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._view:
+            raise TypeError("ResultSpool views are read-only")
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        if len(data) <= self.spill_threshold:
+            entry = (False, value)
+        else:
+            with self._lock:
+                self._files += 1
+                path = os.path.join(self._directory, f"{self._files}.json")
+            with open(path, 'wb') as f:
+                f.write(data)
+            logger.info(f"Spilled result {key} ({len(data)} bytes) to {path}")
+            entry = (True, path)
+        del data
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            self._entries[key] = entry
+        if previous is not None and previous[0]:
+            os.remove(previous[1])
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            spilled, value = self._entries[key]
+        if not spilled:
+            return value
+        with open(value, 'rb') as f:
+            return json.load(f)
+
+    def __delitem__(self, key: str) -> None:
+        if self._view:
+            raise TypeError("ResultSpool views are read-only")
+        with self._lock:
+            spilled, value = self._entries.pop(key)
+        if spilled:
+            os.remove(value)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        spilled = sum(1 for s, _ in self._entries.values() if s)
+        return f"ResultSpool(results={len(self)}, spilled={spilled})"
+
+    def reorder(self, keys: Iterable[str]) -> None:
+        """Move keys (in this order) to the front, leaving the remaining results after them."""
+        with self._lock:
+            ordered = {k: self._entries[k] for k in keys if k in self._entries}
+            ordered.update(self._entries)
+            self._entries = ordered
+
+    def select(self, keys: Iterable[str]) -> "ResultSpool":
+        """Return a view of the results of keys sharing this spool's files; it is valid until this spool is closed."""
+        view = ResultSpool.__new__(ResultSpool)
+        view.spill_threshold = self.spill_threshold
+        view._directory = self._directory
+        view._lock = threading.Lock()
+        view._files = 0
+        view._view = True
+        with self._lock:
+            view._entries = {k: self._entries[k] for k in keys if k in self._entries}
+        return view
+
+    def iter_json(self) -> Iterator[bytes]:
+        """Yield the JSON object of all results in chunks, reading spilled results from disk."""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        yield b"{"
+        for index, (key, (spilled, value)) in enumerate(entries):
+            prefix = b", " if index else b""
+            yield prefix + json.dumps(key, ensure_ascii=False).encode('utf-8') + b": "
+            if spilled:
+                with open(value, 'rb') as f:
+                    yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+            else:
+                yield json.dumps(value, ensure_ascii=False).encode('utf-8')
+        yield b"}"
+
+    def close(self) -> None:
+        """Remove the spool directory."""
+        if not self._view:
+            shutil.rmtree(self._directory, ignore_errors=True)
+        self._entries = {}
+
+
+def iter_payload(res_payload: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Yield the JSON of a result payload in chunks.
+
+    scan_results given as a ResultSpool are streamed from it; every other
+    field is serialised with json.
+    """
+    yield b"{"
+    for index, (key, value) in enumerate(res_payload.items()):
+        prefix = b", " if index else b""
+        yield prefix + json.dumps(key, ensure_ascii=False).encode('utf-8') + b": "
+        if isinstance(value, ResultSpool):
+            yield from value.iter_json()
+        else:
+            yield json.dumps(value, ensure_ascii=False).encode('utf-8')
+    yield b"}"
+
+
+def resolve_encoding(encoding: str) -> str:
+    """Return the content encoding to use for encoding, falling back to gzip without zstandard."""
+    encoding = (encoding or 'identity').lower()
+    if encoding not in CONTENT_ENCODINGS:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    if encoding == 'zstd' and zstandard is None:
+        logger.warning("zstandard is not installed, compressing callbacks with gzip")
+        return 'gzip'
+    return encoding
+
+
+def compress(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks incrementally.
+
+    Args:
+        chunks: Uncompressed data
+        encoding: One of CONTENT_ENCODINGS, see resolve_encoding
+
+    Yields:
+        Compressed data
+    """
+    if encoding == 'identity':
+        yield from chunks
+        return
+
+    if encoding == 'gzip':
+        # wbits 31 writes a gzip header and trailer
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    else:
+        compressor = zstandard.ZstdCompressor().compressobj()
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class StreamingBody:
+    """
+    Re-iterable request body streaming a result payload.
+
+    HTTP clients send bodies without a length with chunked transfer encoding;
+    every iteration starts from the beginning, so the body can be resent
+    when a request is retried.
+    """
+
+    def __init__(self, res_payload: Dict[str, Any], encoding: str = 'gzip'):
+        self.res_payload = res_payload
+        self.encoding = resolve_encoding(encoding)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.encoding != 'identity':
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+    def __iter__(self) -> Iterator[bytes]:
+        return compress(iter_payload(self.res_payload), self.encoding)
+
+    async def aiter(self):
+        """Async iterator over the body for asyncio HTTP clients, a new one per request."""
+        for chunk in self:
+            yield chunk
+
+
+def materialize(res_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Return res_payload with a ResultSpool replaced by a plain dict of its results."""
+    return {k: dict(v) if isinstance(v, ResultSpool) else v for k, v in res_payload.items()}
@@ -0,0 +1,282 @@
+"""
+Hardened subprocess runner.
+
+Runs external tools (shell scripts, scanners, git) with a timeout that kills
+the whole process group, optional resource limits, stdout streamed to a
+temporary file or an incremental consumer instead of Python memory, and
+returns the resource usage of the finished command.
+"""
+
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+from helper import read_config
+from logger import get_logger
+
+logger = get_logger('openchecker.runner')
+
+file_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(file_dir)
+config_file = os.path.join(project_root, "config", "config.ini")
+
+# Seconds between SIGTERM and SIGKILL when a command times out
+KILL_GRACE_PERIOD = 5
+
+# Bytes of stderr kept in memory; longer output keeps its tail
+STDERR_LIMIT = 64 * 1024
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ResourceLimits:
+    """Resource limits (rlimits) applied to a command and every process it starts."""
+
+    def __init__(self, cpu_seconds: int = 0, memory_mb: int = 0, open_files: int = 0):
+        """
+        Args:
+            cpu_seconds: CPU time limit (RLIMIT_CPU), 0 for unlimited
+            memory_mb: Address space limit (RLIMIT_AS) in megabytes, 0 for unlimited
+            open_files: Open file limit (RLIMIT_NOFILE), 0 for unlimited
+        """
+        self.cpu_seconds = int(cpu_seconds)
+        self.memory_mb = int(memory_mb)
+        self.open_files = int(open_files)
+
+    def ulimit_args(self) -> str:
+        """Arguments of the bash ulimit builtin applying these limits."""
+        args = []
+        if self.cpu_seconds > 0:
+            args.append(f"-t {self.cpu_seconds}")
+        if self.memory_mb > 0:
+            args.append(f"-v {self.memory_mb * 1024}")
+        if self.open_files > 0:
+            args.append(f"-n {self.open_files}")
+        return " ".join(args)
+
+    def wrap(self, cmd: Sequence[str]) -> List[str]:
+        """
+        Return cmd prefixed so that the limits are set before it starts.
+
+        The limits are applied by a bash ulimit that then execs cmd, so they
+        are in place before the first instruction of cmd and are inherited by
+        every process it starts.
+        """
+        ulimit_args = self.ulimit_args()
+        if not ulimit_args:
+            return list(cmd)
+        return ["/bin/bash", "-c", f'ulimit -S -H {ulimit_args} && exec "$@"', "openchecker-runner"] + list(cmd)
+
+
+class CommandResult:
+    """Outcome of a command run by run_command."""
+
+    def __init__(self, returncode: int, stdout: Optional[bytes], stdout_path: Optional[str], stderr: bytes,
+                 timed_out: bool, duration: float, cpu_time: float, max_rss_kb: int):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stdout_path = stdout_path
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.duration = duration
+        self.cpu_time = cpu_time
+        self.max_rss_kb = max_rss_kb
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    def read_stdout(self) -> bytes:
+        """Return stdout, reading it from stdout_path if it was written to a file."""
+        if self.stdout is not None:
+            return self.stdout
+        if self.stdout_path is None:
+            return b""
+        with open(self.stdout_path, "rb") as f:
+            return f.read()
+
+    def cleanup(self) -> None:
+        """Remove the temporary stdout file created by run_command."""
+        if self.stdout_path is not None:
+            try:
+                os.remove(self.stdout_path)
+            except OSError:
+                pass
+            self.stdout_path = None
+
+    def __repr__(self):
+        return (f"CommandResult(returncode={self.returncode}, timed_out={self.timed_out}, "
+                f"duration={self.duration:.1f}s, cpu_time={self.cpu_time:.1f}s, max_rss_kb={self.max_rss_kb})")
+
+
+def default_limits() -> ResourceLimits:
+    """Resource limits configured in the OpenCheck section of config.ini."""
+    opencheck_config = read_config(config_file).get("OpenCheck", {})
+    return ResourceLimits(
+        cpu_seconds=opencheck_config.get("command_max_cpu_s", 0),
+        memory_mb=opencheck_config.get("command_max_memory_mb", 0),
+        open_files=opencheck_config.get("command_max_open_files", 0)
+    )
+
+
+def default_timeout() -> Optional[float]:
+    """Timeout of commands without an explicit one, None for no timeout."""
+    timeout = float(read_config(config_file).get("OpenCheck", {}).get("command_timeout_s", 0))
+    return timeout if timeout > 0 else None
+
+
+def _kill_group(process: subprocess.Popen, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _drain(stream, consumer: Callable[[bytes], None]) -> None:
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        consumer(chunk)
+    stream.close()
+
+
+def run_command(
+    cmd: Sequence[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    limits: Optional[ResourceLimits] = None,
+    stdout_to_file: bool = False,
+    on_stdout: Optional[Callable[[bytes], None]] = None,
+    env: Optional[dict] = None,
+    stdout_path: Optional[str] = None
+) -> CommandResult:
+    """
+    Run cmd in its own process group.
+
+    Args:
+        cmd: Program and arguments
+        cwd: Working directory
+        timeout: Seconds after which the whole process group is killed, None
+            for default_timeout()
+        limits: Resource limits, None for default_limits()
+        stdout_to_file: Write stdout to a temporary file (result.stdout_path,
+            removed with result.cleanup()) instead of memory
+        on_stdout: Incremental consumer receiving stdout chunks as they arrive;
+            stdout is then neither kept in memory nor written to a file
+        env: Environment of the command, defaults to the current one
+        stdout_path: Write stdout to this file, owned by the caller, instead
+            of a temporary one
+
+    Returns:
+        CommandResult
+    """
+    timeout = default_timeout() if timeout is None else timeout
+    limits = default_limits() if limits is None else limits
+
+    stdout_file = None
+    if stdout_path is not None:
+        stdout_file = open(stdout_path, "wb")
+    elif stdout_to_file and on_stdout is None:
+        stdout_file = tempfile.NamedTemporaryFile(prefix="openchecker-stdout-", delete=False)
+
+    start = time.monotonic()
+    process = subprocess.Popen(
+        limits.wrap(cmd),
+        stdout=stdout_file if stdout_file is not None else subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True
+    )
+    if stdout_file is not None:
+        stdout_file.close()
+
+    stdout_chunks, stderr_chunks = [], []
+    stderr_size = [0]
+
+    def keep_stderr(chunk):
+        stderr_chunks.append(chunk)
+        stderr_size[0] += len(chunk)
+        while stderr_size[0] > STDERR_LIMIT and len(stderr_chunks) > 1:
+            stderr_size[0] -= len(stderr_chunks.pop(0))
+
+    readers = [threading.Thread(target=_drain, args=(process.stderr, keep_stderr), daemon=True)]
+    if stdout_file is None:
+        readers.append(threading.Thread(
+            target=_drain, args=(process.stdout, on_stdout or stdout_chunks.append), daemon=True
+        ))
+    for reader in readers:
+        reader.start()
+
+    timed_out = threading.Event()
+    # The group is only signalled while the leader is unreaped: its zombie keeps
+    # the PID, and with it the process group ID, from being reused
+    reaped = False
+    reap_lock = threading.Lock()
+    timers = []
+
+    def signal_group(sig):
+        with reap_lock:
+            if not reaped:
+                _kill_group(process, sig)
+
+    def expire():
+        timed_out.set()
+        logger.error(f"Command timed out after {timeout}s, killing process group: {cmd[0]}")
+        signal_group(signal.SIGTERM)
+        killer = threading.Timer(KILL_GRACE_PERIOD, signal_group, args=(signal.SIGKILL,))
+        killer.daemon = True
+        timers.append(killer)
+        killer.start()
+
+    if timeout:
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+        timers.append(timer)
+        timer.start()
+
+    # Wait for the leader to exit without reaping it
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    with reap_lock:
+        for timer in timers:
+            timer.cancel()
+        # Descendants left behind in the group would keep the pipes open
+        _kill_group(process, signal.SIGKILL)
+        reaped = True
+        _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join()
+
+    stderr = b"".join(stderr_chunks)[-STDERR_LIMIT:]
+    if timed_out.is_set():
+        stderr += f"\nCommand timed out after {timeout}s".encode()
+
+    return CommandResult(
+        returncode=process.returncode,
+        stdout=None if stdout_file is not None or on_stdout is not None else b"".join(stdout_chunks),
+        stdout_path=stdout_file.name if stdout_file is not None else None,
+        stderr=stderr,
+        timed_out=timed_out.is_set(),
+        duration=time.monotonic() - start,
+        cpu_time=rusage.ru_utime + rusage.ru_stime,
+        max_rss_kb=rusage.ru_maxrss
+    )
+
+
+def run_shell(shell_script: str, param: Optional[str] = None, **kwargs) -> CommandResult:
+    """
+    Run a bash script with run_command.
+
+    Args:
+        shell_script: Script to execute
+        param: Optional parameter appended to the script
+        **kwargs: Passed to run_command
+
+    Returns:
+        CommandResult
+    """
+    script = shell_script if param is None else shell_script + " " + param
+    return run_command(["/bin/bash", "-c", script], **kwargs)
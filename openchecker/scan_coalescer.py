@@ -0,0 +1,310 @@
+"""
+Coalescing of duplicate scans.
+
+CI systems and portals often submit the same project version several times
+within minutes. The first task scanning a (project_url, version_number,
+commit_hash) registers itself as the owner of that scan in a directory on
+storage shared by the agents; a task arriving while the scan runs and
+requesting a subset of its commands attaches its callback there and
+finishes right away. The owner sends its results to every attached
+callback when it is done.
+
+Registrations move with atomic renames: a registration is created by
+renaming a prepared directory into place and closed by renaming it away, so
+an attachment either lands in the registration before it is closed (and is
+served by the owner) or fails (and the task scans on its own). An owner
+keeps a heartbeat in its registration; a registration whose owner stopped
+beating, e.g. because its task failed or its agent died, is adopted by the
+next task scanning the same version, together with the callbacks attached
+to it. Adopting an owner takes an exclusive claim on that owner, so two
+tasks never both take over the same registration.
+
+A task that fails for good (its message goes to dead letters) abandons its
+registration: the attached requests are sent an error result instead of
+waiting for a retry that never comes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from logger import get_logger
+
+logger = get_logger('openchecker.scan_coalescer')
+
+
+def scan_key(project_url: str, version_number: Optional[str], commit_hash: Optional[str]) -> str:
+    """Return the key identifying a scan of a project version."""
+    identity = json.dumps([project_url, version_number, commit_hash])
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Attachment:
+    """A request attached to a scan owned by another task."""
+
+    def __init__(self, callback_url: str, command_list: List[str], task_metadata: Dict[str, Any]):
+        self.callback_url = callback_url
+        self.command_list = command_list
+        self.task_metadata = task_metadata
+
+    def error_payload(self, project_url: str, error: str) -> Dict[str, Any]:
+        """Return the payload reporting that the scan this request was attached to failed."""
+        return {
+            "command_list": self.command_list,
+            "project_url": project_url,
+            "task_metadata": self.task_metadata,
+            "scan_results": {command: {"error": error} for command in self.command_list}
+        }
+
+    def payload(self, res_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the owner's results restricted to this request's commands."""
+        scan_results = res_payload["scan_results"]
+        selected = scan_results.select(self.command_list) if hasattr(scan_results, "select") else {
+            c: scan_results[c] for c in self.command_list if c in scan_results
+        }
+        return {
+            "command_list": self.command_list,
+            "project_url": res_payload["project_url"],
+            "task_metadata": self.task_metadata,
+            "scan_results": selected
+        }
+
+
+class Registration:
+    """Ownership of a scan by the current task; without a key the scan is not coalesced."""
+
+    def __init__(self, coalescer: "ScanCoalescer", key: Optional[str] = None, owner: Optional[Dict[str, Any]] = None):
+        self.coalescer = coalescer
+        self.key = key
+        self.owner = owner
+        self._stop = threading.Event()
+        if key is not None:
+            threading.Thread(target=self._beat, name='scan-heartbeat', daemon=True).start()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.coalescer.directory, self.key)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.coalescer.lease / 4):
+            current = _read_json(os.path.join(self.path, "owner.json"))
+            if current is None:
+                continue
+            if current.get("owner") != self.owner["owner"]:
+                return
+            self.owner["heartbeat"] = time.time()
+            try:
+                _write_json(os.path.join(self.path, "owner.json"), self.owner)
+            except OSError as e:
+                logger.warning(f"Failed to renew scan registration {self.key[:12]}: {e}")
+
+    def close(self) -> List[Attachment]:
+        """
+        End the registration after a successful scan.
+
+        Returns:
+            List[Attachment]: Requests attached to the scan, to be sent the results
+        """
+        self._stop.set()
+        if self.key is None:
+            return []
+        attachments = self.coalescer._close(self.path)
+        if attachments:
+            logger.info(f"Sending coalesced scan results to {len(attachments)} attached request(s)")
+        return attachments
+
+    def release(self) -> None:
+        """
+        Give up ownership after a failed scan.
+
+        Attached requests stay registered and are served by the next task
+        scanning the same version, e.g. the retry of this one. Does nothing
+        after close().
+        """
+        if self.key is None or self._stop.is_set():
+            return
+        self._stop.set()
+        current = _read_json(os.path.join(self.path, "owner.json"))
+        if current is None or current.get("owner") != self.owner["owner"]:
+            return
+        try:
+            _write_json(os.path.join(self.path, "owner.json"), dict(self.owner, heartbeat=0))
+        except OSError as e:
+            logger.warning(f"Failed to release scan registration {self.key[:12]}: {e}")
+
+
+class ScanCoalescer:
+    """Registry of running scans on storage shared by the agents."""
+
+    def __init__(self, directory: str, lease: float = 120, ttl: float = 86400):
+        """
+        Args:
+            directory: Registry directory
+            lease: Seconds without heartbeat after which an owner is considered gone
+            ttl: Seconds after which orphaned registrations are removed
+        """
+        self.directory = directory
+        self.lease = lease
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def join(
+        self,
+        project_url: str,
+        version_number: Optional[str],
+        commit_hash: Optional[str],
+        command_list: List[str],
+        callback_url: str,
+        task_metadata: Dict[str, Any]
+    ) -> Optional[Registration]:
+        """
+        Register a scan, or attach to an identical one that is already running.
+
+        Returns:
+            Optional[Registration]: The registration if the caller should scan
+            (and send the results to the attached requests when done); None if
+            the request was attached to a running scan and needs no work
+        """
+        key = scan_key(project_url, version_number, commit_hash)
+        path = os.path.join(self.directory, key)
+        owner = {"owner": uuid.uuid4().hex, "command_list": list(command_list), "heartbeat": time.time()}
+
+        prepared = os.path.join(self.directory, f".new-{owner['owner']}")
+        os.makedirs(os.path.join(prepared, "callbacks"))
+        _write_json(os.path.join(prepared, "owner.json"), owner)
+        try:
+            os.rename(prepared, path)
+            return Registration(self, key, owner)
+        except OSError:
+            shutil.rmtree(prepared, ignore_errors=True)
+
+        current = _read_json(os.path.join(path, "owner.json"))
+        if current is None:
+            # The registration was closed in the meantime
+            return Registration(self)
+
+        if time.time() - current.get("heartbeat", 0) > self.lease:
+            # The owner is gone: adopt its registration and the callbacks attached to it,
+            # as long as this scan covers the commands they asked for
+            if not set(current.get("command_list", [])) <= set(command_list):
+                return Registration(self)
+            if not self._claim(path, current):
+                # Adopted or abandoned by another task
+                return Registration(self)
+            logger.info(f"Adopting abandoned scan registration {key[:12]}")
+            try:
+                _write_json(os.path.join(path, "owner.json"), owner)
+                return Registration(self, key, owner)
+            except OSError:
+                return Registration(self)
+
+        if not set(command_list) <= set(current.get("command_list", [])):
+            return Registration(self)
+        if self._attach(path, callback_url, command_list, task_metadata):
+            logger.info(f"Attached request to running scan {key[:12]} of {project_url}")
+            return None
+        return Registration(self)
+
+    def _claim(self, path: str, owner: Dict[str, Any]) -> bool:
+        """Take the exclusive right to replace a gone owner; False if another task has it."""
+        try:
+            os.close(os.open(os.path.join(path, f"claimed-{owner['owner']}"), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except OSError:
+            return False
+
+    def _close(self, path: str) -> List[Attachment]:
+        """Move a registration away and return the requests attached to it."""
+        closed = os.path.join(self.directory, f".closed-{uuid.uuid4().hex}")
+        try:
+            os.rename(path, closed)
+        except OSError:
+            return []
+
+        attachments = []
+        callbacks_dir = os.path.join(closed, "callbacks")
+        for name in sorted(os.listdir(callbacks_dir)):
+            if not name.endswith(".json"):
+                continue
+            data = _read_json(os.path.join(callbacks_dir, name))
+            if data is not None:
+                attachments.append(Attachment(data["callback_url"], data["command_list"], data["task_metadata"]))
+        shutil.rmtree(closed, ignore_errors=True)
+        return attachments
+
+    def abandon(self, project_url: str, version_number: Optional[str], commit_hash: Optional[str]) -> List[Attachment]:
+        """
+        Close the registration of a scan whose task failed for good.
+
+        Does nothing if the registration's owner is alive, e.g. because a
+        task adopted it in the meantime.
+
+        Returns:
+            List[Attachment]: Requests attached to the scan, to be sent an error result
+        """
+        path = os.path.join(self.directory, scan_key(project_url, version_number, commit_hash))
+        current = _read_json(os.path.join(path, "owner.json"))
+        if current is None or time.time() - current.get("heartbeat", 0) <= self.lease:
+            return []
+        if not self._claim(path, current):
+            return []
+        attachments = self._close(path)
+        if attachments:
+            logger.warning(f"Scan of {project_url} failed, sending the error to {len(attachments)} attached request(s)")
+        return attachments
+
+    def _attach(self, path: str, callback_url: str, command_list: List[str], task_metadata: Dict[str, Any]) -> bool:
+        try:
+            _write_json(os.path.join(path, "callbacks", f"{uuid.uuid4().hex}.json"), {
+                "callback_url": callback_url,
+                "command_list": list(command_list),
+                "task_metadata": task_metadata
+            })
+            return True
+        except OSError:
+            return False
+
+    def purge_expired(self) -> int:
+        """
+        Remove registrations older than the TTL whose owner is gone.
+
+        Returns:
+            int: Number of removed registrations
+        """
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            owner = _read_json(os.path.join(path, "owner.json")) or {}
+            try:
+                if time.time() - max(os.path.getmtime(path), owner.get("heartbeat", 0)) <= self.ttl:
+                    continue
+            except FileNotFoundError:
+                continue
+            callbacks = os.path.join(path, "callbacks")
+            lost = len(os.listdir(callbacks)) if os.path.isdir(callbacks) else 0
+            if lost:
+                logger.warning(f"Dropping expired scan registration {name[:12]} with {lost} attached request(s)")
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        return removed
+
@@ -0,0 +1,284 @@
+"""
+Dependency-aware step scheduler.
+
+Runs the steps of a single task (repository preparation and checkers) on a
+bounded thread pool, or as coroutines on an event loop. Each step names the
+steps it depends on and starts as soon as all of them have finished
+successfully, so independent checkers run concurrently instead of one after
+another. Steps carrying a resource weight are only started while they fit
+into an optional ResourceBudget. With a deadline, a step is only started if
+its estimated runtime fits into the time left; otherwise it and the steps
+depending on it are reported as DEADLINE_EXCEEDED.
+"""
+
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+from logger import get_logger
+from resources import ResourceBudget, ResourceWeight
+
+logger = get_logger('openchecker.scheduler')
+
+# Seconds between two admission attempts of a step that did not fit into the budget
+ADMISSION_POLL_INTERVAL = 0.5
+
+# Outcome of steps skipped because they could not finish before the deadline
+DEADLINE_EXCEEDED = "Deadline exceeded"
+
+
+class Step:
+    """A unit of work in the task graph."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], None],
+        requires: Iterable[str] = (),
+        weight: Optional[ResourceWeight] = None,
+        estimate: float = 0
+    ):
+        """
+        Args:
+            name: Unique step name
+            func: Callable executed on a worker thread (run_steps) or coroutine
+                function awaited on the event loop (run_steps_async); raising
+                marks the step as failed
+            requires: Names of the steps that must succeed before this one starts
+            weight: Resources reserved from the budget while the step runs
+            estimate: Expected seconds the step runs, checked against the deadline
+        """
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.weight = weight
+        self.estimate = estimate
+
+    def __repr__(self):
+        return f"Step(name='{self.name}', requires={list(self.requires)})"
+
+
+def _validate_steps(steps: List[Step]) -> Dict[str, Step]:
+    """
+    Index steps by name and reject duplicate names, unknown dependencies and cycles.
+
+    Args:
+        steps: Steps to validate
+
+    Returns:
+        Dict[str, Step]: Steps indexed by name
+    """
+    by_name = {}
+    for step in steps:
+        if step.name in by_name:
+            raise ValueError(f"Duplicate step name: {step.name}")
+        by_name[step.name] = step
+
+    for step in steps:
+        for dependency in step.requires:
+            if dependency not in by_name:
+                raise ValueError(f"Step {step.name} requires unknown step: {dependency}")
+
+    visiting, visited = set(), set()
+
+    def visit(name):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at step: {name}")
+        visiting.add(name)
+        for dependency in by_name[name].requires:
+            visit(dependency)
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in by_name:
+        visit(name)
+
+    return by_name
+
+
+def _prerequisite_error(step: Step, outcome: Dict[str, Optional[str]]) -> Optional[str]:
+    """Return the outcome of a step whose dependency failed, None if none failed."""
+    failed = [d for d in step.requires if outcome.get(d) is not None]
+    if not failed:
+        return None
+    if outcome[failed[0]] == DEADLINE_EXCEEDED:
+        return DEADLINE_EXCEEDED
+    return f"Prerequisite step {failed[0]} failed"
+
+
+def _misses_deadline(step: Step, deadline: Optional[float]) -> bool:
+    if deadline is None or time.time() + step.estimate <= deadline:
+        return False
+    logger.info(f"Skipping step {step.name}: expected to run {step.estimate:.0f}s, past the deadline")
+    return True
+
+
+def run_steps(
+    steps: List[Step],
+    max_workers: int = 4,
+    on_complete: Optional[Callable[[str, Optional[str]], None]] = None,
+    budget: Optional[ResourceBudget] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Run steps respecting their dependencies, at most max_workers at a time.
+
+    A step whose dependency failed is not started and is reported as failed
+    with a message naming that dependency. Ready steps are started in the
+    order they are listed.
+
+    Args:
+        steps: Steps to run
+        max_workers: Upper bound of concurrently running steps
+        on_complete: Optional callback invoked as on_complete(name, error) from
+            the scheduling thread after every step finishes or is skipped
+        budget: Optional budget a weighted step must fit into before it starts;
+            the budget may be shared with other tasks
+        deadline: Optional UNIX timestamp; steps whose estimate does not fit
+            into the time left are skipped with DEADLINE_EXCEEDED
+
+    Returns:
+        Dict[str, Optional[str]]: Step name -> error message, None on success
+    """
+    by_name = _validate_steps(steps)
+    outcome = {}
+    pending = dict(by_name)
+    running = {}
+
+    def finish(name, error):
+        outcome[name] = error
+        if on_complete is not None:
+            try:
+                on_complete(name, error)
+            except Exception as e:
+                logger.error(f"on_complete callback failed for step {name}: {e}")
+
+    def admit(step):
+        return budget is None or step.weight is None or budget.try_acquire(step.weight, step)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='step') as executor:
+        while pending or running:
+            waiting_for_budget = False
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, step in list(pending.items()):
+                    error = _prerequisite_error(step, outcome)
+                    if error is not None:
+                        del pending[name]
+                        finish(name, error)
+                        progressed = True
+                    elif all(d in outcome for d in step.requires):
+                        if len(running) >= max(1, max_workers):
+                            continue
+                        if _misses_deadline(step, deadline):
+                            if budget is not None:
+                                budget.withdraw(step)
+                            del pending[name]
+                            finish(name, DEADLINE_EXCEEDED)
+                            progressed = True
+                            continue
+                        if not admit(step):
+                            waiting_for_budget = True
+                            continue
+                        del pending[name]
+                        running[executor.submit(step.func)] = name
+                        logger.debug(f"Step started: {name}")
+
+            if not running:
+                if not waiting_for_budget:
+                    break
+                # Budget is held by other tasks
+                time.sleep(ADMISSION_POLL_INTERVAL)
+                continue
+
+            done, _ = wait(
+                list(running),
+                timeout=ADMISSION_POLL_INTERVAL if waiting_for_budget else None,
+                return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                name = running.pop(future)
+                if budget is not None and by_name[name].weight is not None:
+                    budget.release(by_name[name].weight)
+                error = future.exception()
+                if error is not None:
+                    logger.error(f"Step {name} failed: {error}")
+                    finish(name, str(error) or error.__class__.__name__)
+                else:
+                    logger.debug(f"Step finished: {name}")
+                    finish(name, None)
+
+    return outcome
+
+
+async def run_steps_async(
+    steps: List[Step],
+    max_concurrency: int = 0,
+    on_complete: Optional[Callable[[str, Optional[str]], None]] = None,
+    budget: Optional[ResourceBudget] = None,
+    deadline: Optional[float] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Coroutine counterpart of run_steps; every step func is a coroutine function.
+
+    Args:
+        steps: Steps to run
+        max_concurrency: Upper bound of concurrently running steps, 0 for no limit
+        on_complete: Optional callback invoked as on_complete(name, error) after
+            every step finishes or is skipped
+        budget: Optional budget a weighted step must fit into before it starts
+        deadline: Optional UNIX timestamp, see run_steps
+
+    Returns:
+        Dict[str, Optional[str]]: Step name -> error message, None on success
+    """
+    by_name = _validate_steps(steps)
+    outcome = {}
+    finished = {name: asyncio.Event() for name in by_name}
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    def finish(name, error):
+        outcome[name] = error
+        finished[name].set()
+        if on_complete is not None:
+            try:
+                on_complete(name, error)
+            except Exception as e:
+                logger.error(f"on_complete callback failed for step {name}: {e}")
+
+    async def run(step):
+        for dependency in step.requires:
+            await finished[dependency].wait()
+        error = _prerequisite_error(step, outcome)
+        if error is not None:
+            finish(step.name, error)
+            return
+        weighted = budget is not None and step.weight is not None
+        while weighted and not budget.try_acquire(step.weight, step):
+            await asyncio.sleep(ADMISSION_POLL_INTERVAL)
+        if _misses_deadline(step, deadline):
+            if weighted:
+                budget.release(step.weight)
+            finish(step.name, DEADLINE_EXCEEDED)
+            return
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    await step.func()
+            else:
+                await step.func()
+        except Exception as e:
+            logger.error(f"Step {step.name} failed: {e}")
+            finish(step.name, str(e) or e.__class__.__name__)
+        else:
+            finish(step.name, None)
+        finally:
+            if weighted:
+                budget.release(step.weight)
+
+    await asyncio.gather(*(run(step) for step in by_name.values()))
+    return outcome
@@ -0,0 +1,196 @@
+"""
+Source archives of tagged versions.
+
+A versioned scan whose checkers read neither the history nor any other git
+metadata does not need a clone: the hosting platform serves the tree of a
+tag as an archive. Tarballs are extracted while they are downloaded, member
+by member, so neither the archive nor the tree is held in memory. Zipballs
+keep their index at the end and are spooled to a temporary file first.
+
+The archive's top-level directory (<repo>-<tag>/) is stripped, so the tree
+ends up where a clone would be. Members that would be written outside the
+checkout are skipped. The commit of the tag, which git archive stores in the
+archive (pax comment of tarballs, comment of zipballs), is recorded next to
+the checkout for the result cache.
+
+git archive honours the export-ignore and export-subst attributes, so the
+archive of a project using them (commonly to leave out /.github or /tests)
+differs from its tree. Such archives are discarded and the project is
+cloned instead. A .gitattributes that export-ignores itself cannot be
+noticed, which is why archive downloads are opt-in (OpenCheck.archive_downloads).
+"""
+
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+
+from logger import get_logger
+from platform_adapter import platform_manager
+from result_cache import revision_file
+
+logger = get_logger('openchecker.source_archives')
+
+# Seconds a read from the platform may stall when the task has no deadline
+READ_TIMEOUT = 60
+
+CHUNK_SIZE = 1 << 20
+
+_COMMIT_ID = re.compile(r"^[0-9a-f]{40}$")
+
+# Attributes making git archive write something other than the tree
+_EXPORT_ATTRIBUTES = re.compile(r"(^|\s)[-!]?export-(ignore|subst)\b")
+
+# Drops owners and unsafe modes where tarfile supports extraction filters
+_EXTRACT_FILTER = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+
+
+class ArchiveError(Exception):
+    """The archive could not be downloaded or extracted."""
+
+
+def _strip_top_directory(name: str) -> Optional[str]:
+    """Return name without the archive's top-level directory, None if it escapes the checkout."""
+    parts = name.replace("\\", "/").split("/", 1)
+    if len(parts) < 2 or parts[0] in ("", ".", "..") or not parts[1].strip("/"):
+        return None
+    stripped = os.path.normpath(parts[1])
+    if os.path.isabs(stripped) or stripped == ".." or stripped.startswith("../"):
+        return None
+    return stripped
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    if deadline is not None and time.monotonic() > deadline:
+        raise ArchiveError("Archive download timed out")
+
+
+def _uses_export_attributes(destination: str, attribute_files: List[str]) -> bool:
+    """Whether any extracted .gitattributes sets export-ignore or export-subst."""
+    for name in attribute_files:
+        try:
+            with open(os.path.join(destination, name), encoding="utf-8", errors="replace") as f:
+                if any(_EXPORT_ATTRIBUTES.search(line) for line in f if not line.lstrip().startswith("#")):
+                    return True
+        except OSError:
+            continue
+    return False
+
+
+def _extract_tarball(stream, destination: str, deadline: Optional[float]) -> Tuple[Optional[str], List[str]]:
+    """Extract a tarball read from a stream, returning the commit stored in it and its .gitattributes files."""
+    attribute_files = []
+    with tarfile.open(fileobj=stream, mode="r|*") as tar:
+        for member in tar:
+            _check_deadline(deadline)
+            name = _strip_top_directory(member.name)
+            if name is None or not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+                continue
+            if member.issym():
+                target = os.path.normpath(os.path.join(os.path.dirname(name), member.linkname))
+                if os.path.isabs(member.linkname) or target == ".." or target.startswith("../"):
+                    continue
+            if member.islnk():
+                member.linkname = _strip_top_directory(member.linkname)
+                if member.linkname is None:
+                    continue
+            member.name = name
+            tar.extract(member, destination, **_EXTRACT_FILTER)
+            if member.isfile() and os.path.basename(name) == ".gitattributes":
+                attribute_files.append(name)
+        return tar.pax_headers.get("comment"), attribute_files
+
+
+def _extract_zipball(response, destination: str, deadline: Optional[float]) -> Tuple[Optional[str], List[str]]:
+    """Spool a zipball to a temporary file next to destination and extract it."""
+    attribute_files = []
+    with tempfile.TemporaryFile(dir=os.path.dirname(destination)) as spool:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            _check_deadline(deadline)
+            spool.write(chunk)
+        spool.seek(0)
+        with zipfile.ZipFile(spool) as archive:
+            for info in archive.infolist():
+                _check_deadline(deadline)
+                name = _strip_top_directory(info.filename)
+                if name is None:
+                    continue
+                path = os.path.join(destination, name)
+                if info.is_dir():
+                    os.makedirs(path, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with archive.open(info) as source, open(path, "wb") as target:
+                    shutil.copyfileobj(source, target, CHUNK_SIZE)
+                if os.path.basename(name) == ".gitattributes":
+                    attribute_files.append(name)
+            return archive.comment.decode(errors="replace"), attribute_files
+
+
+def _archive_urls(project_url: str, version_number: str) -> Iterator[str]:
+    for url in (
+        platform_manager.get_tarball_url(project_url, version_number),
+        platform_manager.get_zipball_url(project_url, version_number),
+    ):
+        # A URL in the branch namespace yields a branch named like the tag, not the tag
+        if url and "/refs/heads/" not in url:
+            yield url
+
+
+def download_archive(
+    project_url: str,
+    version_number: str,
+    destination: str,
+    timeout: Optional[float] = None
+) -> bool:
+    """
+    Download the archive of a tag from the hosting platform and extract it.
+
+    Args:
+        project_url: Project URL on GitHub, Gitee or GitCode
+        version_number: Tag to download
+        destination: Directory of the checkout, removed again on failure
+        timeout: Seconds the download may take, None for no limit
+
+    Returns:
+        bool: False if the platform serves no archive of the tag or the
+        archive differs from the tree, the project is then cloned
+    """
+    if os.path.exists(destination):
+        return False
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    read_timeout = min(timeout, READ_TIMEOUT) if timeout is not None else READ_TIMEOUT
+    for url in _archive_urls(project_url, version_number):
+        try:
+            with requests.get(url, stream=True, timeout=read_timeout) as response:
+                if response.status_code != 200:
+                    logger.info(f"No archive of {version_number} at {url}: HTTP {response.status_code}")
+                    continue
+                os.makedirs(destination)
+                if url.endswith(".zip"):
+                    commit, attribute_files = _extract_zipball(response, destination, deadline)
+                else:
+                    response.raw.decode_content = True
+                    commit, attribute_files = _extract_tarball(response.raw, destination, deadline)
+        except (requests.RequestException, tarfile.TarError, zipfile.BadZipFile, ArchiveError, OSError) as e:
+            logger.warning(f"Archive download failed: {url}, error: {e}")
+            shutil.rmtree(destination, ignore_errors=True)
+            continue
+        if _uses_export_attributes(destination, attribute_files):
+            # Every archive of the tag is made by git archive, none matches the tree
+            logger.info(f"Archive of {project_url} {version_number} omits or rewrites files (.gitattributes export-*)")
+            shutil.rmtree(destination, ignore_errors=True)
+            return False
+        commit = (commit or "").strip()
+        if _COMMIT_ID.match(commit):
+            with open(revision_file(destination), "w") as f:
+                f.write(commit)
+        logger.info(f"Source code extracted from archive: {url}")
+        return True
+    return False
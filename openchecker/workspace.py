@@ -0,0 +1,101 @@
+"""
+Task workspaces.
+
+Each task works in its own directory below OpenCheck.repos_dir. The
+workspace owns the task's single checkout of the project: the
+download-checkout step creates it, every checker and shell script reads it
+at <workspace>/<repository name>, and the workspace removes it with the rest
+of the directory when the task ends. Checkers neither clone the project nor
+delete the checkout; a checker that removes it is reported as failed, so the
+checkers after it do not silently scan nothing.
+
+While its task runs, a workspace holds an flock on its lock file, so the
+janitor can tell the workspaces of tasks that died from live ones.
+"""
+
+import fcntl
+import os
+import shutil
+import uuid
+from typing import Optional
+
+from logger import get_logger
+from result_cache import repository_name
+
+logger = get_logger('openchecker.workspace')
+
+# Lock file in the workspace, locked by the task owning it
+LOCK_FILE = ".task.lock"
+
+
+class TaskWorkspace:
+    """Directory of one task and the checkout of its project."""
+
+    def __init__(self, root: str, project_url: str):
+        """
+        Args:
+            root: Absolute path of the workspace directory
+            project_url: Project URL of the task
+        """
+        self.root = root
+        self.project_url = project_url
+        self.checkout = os.path.join(root, repository_name(project_url))
+        self._lock_file = None
+
+    def __repr__(self):
+        return f"TaskWorkspace(root='{self.root}')"
+
+    @classmethod
+    def create(cls, repos_dir: str, project_url: str) -> "TaskWorkspace":
+        """
+        Create a fresh workspace for a task below repos_dir.
+
+        Each task works in its own directory so that concurrent tasks never share a checkout.
+        """
+        if not os.path.exists(repos_dir):
+            os.makedirs(repos_dir, exist_ok=True)
+            logger.info(f"Created repository directory: {repos_dir}")
+        workspace = cls(os.path.join(os.path.abspath(repos_dir), uuid.uuid4().hex), project_url)
+        os.makedirs(workspace.root)
+        workspace._lock_file = open(os.path.join(workspace.root, LOCK_FILE), "w")
+        fcntl.flock(workspace._lock_file, fcntl.LOCK_EX)
+        logger.info(f"Task workspace: {workspace.root}")
+        return workspace
+
+    def has_checkout(self) -> bool:
+        """Whether the project is checked out."""
+        return os.path.isdir(self.checkout)
+
+    def checkout_error(self, command: str, had_checkout: bool) -> Optional[str]:
+        """
+        Return the error of a command that removed the checkout, None if it is still there.
+
+        Args:
+            command: Command that just finished
+            had_checkout: Whether the checkout existed when the command started
+        """
+        if had_checkout and not self.has_checkout():
+            logger.error(f"{command} removed the task checkout {self.checkout}")
+            return f"{command} removed the project checkout"
+        return None
+
+    def cleanup(self, janitor=None) -> None:
+        """
+        Remove the workspace together with the checkout.
+
+        Args:
+            janitor: WorkspaceJanitor deleting the workspace in the background,
+                None to delete it before returning
+        """
+        try:
+            if janitor is not None:
+                janitor.discard(self.root)
+            else:
+                shutil.rmtree(self.root)
+            logger.info(f"Source code cleanup done: {self.project_url}")
+        except Exception as e:
+            logger.warning(f"Source code cleanup failed: {self.project_url}, error: {e}")
+        finally:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
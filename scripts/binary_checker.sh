@@ -11,7 +11,8 @@ is_binary() {
 
 # Function to check if a compressed file contains binary files
 check_compressed_binary() {
-    local temp_dir=$(mktemp -d)
+    # Inside the task workspace (the working directory), which is removed with the task
+    local temp_dir=$(mktemp -d "$PWD/binary-checker.XXXXXX")
     local file_type=$(file --mime-type -b "$1")
 
     if [[ $file_type == application/zip ]]; then
@@ -52,6 +53,7 @@ check_compressed_binary() {
         fi
     else
         echo "Unsupported compressed file type: $file_type"
+        rm -rf "$temp_dir"
         return 1
     fi
 
@@ -70,11 +72,21 @@ check_compressed_binary() {
 
 # Main script
 project_name=$(basename $1 | sed 's/\.git$//') > /dev/null
-if [ ! -e "$project_name" ]; then
-    GIT_ASKPASS=/bin/true git clone --depth=1 $1 > /dev/null 2>&1
+# The checkout is made by the task's download-checkout step
+if [ ! -d "$project_name" ]; then
+    echo "Project checkout not found: $project_name" >&2
+    exit 1
 fi
 
-for file in $(find $project_name -type f -not -path '*/.git/*' -not -path '*/test/*')
+# An optional second argument names a file listing the paths (relative to the
+# checkout) to examine instead of the whole checkout
+if [ -n "$2" ]; then
+    files=$(sed "s|^|$project_name/|" "$2" | grep -v -e '/\.git/' -e '/test/')
+else
+    files=$(find $project_name -type f -not -path '*/.git/*' -not -path '*/test/*')
+fi
+
+for file in $files
 do
     if [ ! -e "$file" ]; then
         continue
@@ -89,4 +101,3 @@ do
         echo "Binary file found: $file"
     fi
 done
-# rm -rf $project_name
@@ -67,7 +67,7 @@ class TestAgent(unittest.TestCase):
             shutil.rmtree(self.temp_dir)
 
     @patch('openchecker.agent.config')
-    @patch('openchecker.agent.platform_manager')
+    @patch('openchecker.platform_adapter.platform_manager')
     @patch('openchecker.agent.os.chdir')
     @patch('openchecker.agent.os.makedirs')
     @patch('openchecker.agent.post_with_backoff')
@@ -150,7 +150,7 @@ class TestAgent(unittest.TestCase):
         self.assertIsNone(result)
         self.assertIn("Failed to send request", error)
 
-    @patch('openchecker.agent.platform_manager')
+    @patch('openchecker.platform_adapter.platform_manager')
     def test_get_project_info(self, mock_platform):
         """测试获取项目信息"""
         # 设置模拟
@@ -218,7 +218,7 @@ class TestAgentIntegration(unittest.TestCase):
             shutil.rmtree(self.test_dir)
 
     @patch('openchecker.agent.config')
-    @patch('openchecker.agent.platform_manager')
+    @patch('openchecker.platform_adapter.platform_manager')
     def test_end_to_end_processing(self, mock_platform, mock_config):
         """测试端到端消息处理流程"""
         # 设置配置
@@ -251,5 +251,54 @@ class TestAgentIntegration(unittest.TestCase):
         mock_ch.basic_ack.assert_called_once()
 
 
+class TestPartialResults(unittest.TestCase):
+    """渐进式回调测试类"""
+
+    def test_sequence_and_complete_marker(self):
+        """测试部分结果的序号与最终完成标记"""
+        from openchecker.agent import PartialResults
+
+        res_payload = {"project_url": "https://github.com/test/repo", "task_metadata": {}, "scan_results": {}}
+        partial_results = PartialResults(res_payload)
+
+        first = partial_results.partial("url-checker", {"url-checker": {"status": 200}})
+        second = partial_results.partial("binary-checker", {"binary-checker": {}})
+        final = partial_results.complete()
+
+        self.assertEqual((first["sequence"], first["complete"], first["command"]), (1, False, "url-checker"))
+        self.assertEqual(first["scan_results"], {"url-checker": {"status": 200}})
+        self.assertEqual(first["project_url"], "https://github.com/test/repo")
+        self.assertEqual(second["sequence"], 2)
+        self.assertIs(final, res_payload)
+        self.assertEqual((final["sequence"], final["complete"]), (3, True))
+        self.assertTrue(PartialResults.enabled({"progressive_callbacks": True}))
+        self.assertFalse(PartialResults.enabled({}))
+
+    @patch('openchecker.agent._send_results')
+    def test_restored_results_sent_first(self, mock_send):
+        """测试检查点恢复的结果也发送部分回调，并与后续结果按序发送"""
+        from openchecker.agent import PartialResults, _restore_checkpoints
+
+        res_payload = {"project_url": "https://github.com/test/repo", "task_metadata": {}, "scan_results": {}}
+        partial_results = PartialResults(res_payload, "http://callback")
+        checkpoints = Mock()
+        checkpoints.restore.return_value = {"scancode": {"scancode": {"files": []}}}
+
+        pending = _restore_checkpoints(
+            checkpoints, ["scancode", "url-checker", "binary-checker"], res_payload, partial_results.send
+        )
+        for command in pending:
+            partial_results.send(command, {command: {}})
+        final = partial_results.complete()
+
+        self.assertEqual(pending, ["url-checker", "binary-checker"])
+        sent = [c.args[1] for c in mock_send.call_args_list]
+        self.assertEqual([p["command"] for p in sent], ["scancode", "url-checker", "binary-checker"])
+        self.assertEqual([p["sequence"] for p in sent], [1, 2, 3])
+        self.assertEqual(sent[0]["scan_results"], {"scancode": {"files": []}})
+        self.assertEqual(mock_send.call_args_list[0].args[0], "http://callback")
+        self.assertEqual(final["sequence"], 4)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
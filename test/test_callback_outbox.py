@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Callback Outbox Tests
+
+This module tests the durable callback outbox and its background delivery
+worker against a local HTTP receiver.
+
+Author: OpenChecker Team
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.callback_outbox import CallbackOutbox, DeliveryWorker
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    statuses = []
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.received.append(json.loads(body))
+        self.send_response(self.statuses.pop(0) if self.statuses else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCallbackOutbox(unittest.TestCase):
+    """回调发件箱测试类"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.outbox = CallbackOutbox(self.directory)
+        _Receiver.statuses = []
+        _Receiver.received = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Receiver)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/callback"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def test_enqueue_and_deliver(self):
+        """测试入队后由后台worker投递并删除"""
+        payload = {"project_url": "https://github.com/test/repo", "scan_results": {"a": 1}}
+        self.outbox.enqueue(self.url, payload, "gzip")
+        self.assertEqual(len(self.outbox), 1)
+
+        worker = DeliveryWorker(self.outbox, poll_interval=0.05).start()
+        deadline = time.monotonic() + 5
+        while len(self.outbox) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        worker.stop()
+
+        self.assertEqual(_Receiver.received, [payload])
+        self.assertEqual(os.listdir(os.path.join(self.directory, "pending")), [])
+        self.assertEqual(os.listdir(os.path.join(self.directory, "inflight")), [])
+
+    def test_retry_then_fail(self):
+        """测试服务端错误重试，超过次数后移入failed"""
+        _Receiver.statuses = [503, 500]
+        entry_id = self.outbox.enqueue(self.url, {"scan_results": {}})
+        worker = DeliveryWorker(self.outbox, max_attempts=2, initial_delay=0)
+
+        self.assertFalse(worker.deliver(entry_id, self.outbox.claim(entry_id)))
+        self.assertEqual(self.outbox.metadata("pending", entry_id)["attempts"], 1)
+
+        self.assertFalse(worker.deliver(entry_id, self.outbox.claim(entry_id)))
+        worker.stop()
+
+        self.assertEqual(len(self.outbox), 0)
+        self.assertEqual(self.outbox.metadata("failed", entry_id)["last_error"], "Status code: 500")
+        self.assertEqual(len(_Receiver.received), 2)
+
+    def test_claim_is_exclusive_and_recovered(self):
+        """测试条目只能被认领一次，过期后重新投递"""
+        entry_id = self.outbox.enqueue(self.url, {"scan_results": {}})
+
+        self.assertIsNotNone(self.outbox.claim(entry_id))
+        self.assertIsNone(self.outbox.claim(entry_id))
+        self.assertEqual(self.outbox.due(), [])
+
+        self.assertEqual(self.outbox.recover(lease=0), 1)
+        self.assertEqual(self.outbox.due(), [entry_id])
+
+    def test_lease_renewed_and_delivered_entries_dropped(self):
+        """测试投递中续租，正文已删除的条目视为已投递"""
+        entry_id = self.outbox.enqueue(self.url, {"scan_results": {}})
+        worker = DeliveryWorker(self.outbox, timeout=1, lease=60)
+        self.assertIsNotNone(self.outbox.claim(entry_id))
+        inflight = os.path.join(self.directory, "inflight", entry_id + ".json")
+        os.utime(inflight, (time.time() - 120, time.time() - 120))
+        worker._delivering.add(entry_id)
+        worker.renew_leases()
+        self.assertEqual(self.outbox.recover(lease=60), 0)
+
+        os.remove(self.outbox.body_path(entry_id))
+        self.assertTrue(worker.deliver(entry_id, self.outbox.metadata("inflight", entry_id)))
+        worker.stop()
+        self.assertEqual(_Receiver.received, [])
+        self.assertEqual(os.listdir(os.path.join(self.directory, "inflight")), [])
+
+        entry_id = self.outbox.enqueue(self.url, {"scan_results": {}})
+        self.outbox.claim(entry_id)
+        os.remove(self.outbox.body_path(entry_id))
+        self.assertEqual(self.outbox.recover(lease=0), 0)
+        self.assertEqual(os.listdir(os.path.join(self.directory, "inflight")), [])
+        self.assertEqual(self.outbox.due(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Checker Registry Tests
+
+This module tests the declarative checker registry the agent resolves
+command lists through.
+
+Author: OpenChecker Team
+"""
+
+import unittest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.checker_registry import get_checker, list_checkers, register_checker
+
+
+class TestCheckerRegistry(unittest.TestCase):
+    """检查器注册表测试类"""
+
+    def test_builtin_checkers_registered(self):
+        """测试内置检查器的元数据"""
+        names = [spec.name for spec in list_checkers()]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn("sonar-scanner", names)
+
+        osv = get_checker("osv-scanner")
+        self.assertEqual(osv.prerequisites, ("clone", "lockfiles"))
+        self.assertTrue(osv.mutates_checkout)
+        self.assertTrue(get_checker("sonar-scanner").mutates_checkout)
+        self.assertFalse(get_checker("dependency-checker").mutates_checkout)
+        self.assertEqual(get_checker("eol-checker").prerequisites, ())
+        self.assertEqual(get_checker("eol-checker").resource_class, "network")
+        self.assertEqual(get_checker("url-checker").result_key, "url-checker")
+        self.assertIsNone(get_checker("unknown-checker"))
+
+    def test_entries_reference_checker_modules(self):
+        """测试检查器入口均指向checkers包内的函数"""
+        for spec in list_checkers():
+            module_name, _, attribute = spec.entry.partition(':')
+            self.assertTrue(module_name.startswith("checkers."), spec.name)
+            self.assertTrue(attribute, spec.name)
+
+    def test_lazy_loading_and_binding(self):
+        """测试检查器在首次执行时才加载并按声明传参"""
+        spec = register_checker(
+            "test-registry-checker", "json:dumps",
+            args=("project_url",), prerequisites=(), resource_class="network"
+        )
+        module_entry = "os.path:join"
+        joined = register_checker(
+            "test-registry-join", module_entry,
+            args=("workspace", "command")
+        )
+
+        self.assertEqual(spec.bind({"project_url": "https://github.com/a/b"})({}), '"https://github.com/a/b"')
+        self.assertEqual(joined.bind({"workspace": "/tmp/ws"})({}), "/tmp/ws/test-registry-join")
+        self.assertIsNone(joined.bind_async({}))
+
+        with self.assertRaises(ValueError):
+            register_checker("test-registry-checker", "json:dumps")
+        with self.assertRaises(ValueError):
+            register_checker("test-registry-bad", "json:dumps", args=("unknown",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Checkpoint Tests
+
+This module tests the per-checker checkpoints that let redelivered tasks
+resume with the checkers that had not finished.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.checkpoint import CheckpointStore
+
+REVISION = "a" * 40
+COMMANDS = ["scancode", "osv-scanner", "url-checker"]
+
+
+class TestCheckpoint(unittest.TestCase):
+    """检查点测试类"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = CheckpointStore(self.directory, ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_and_restore(self):
+        """测试保存后按任务与版本恢复"""
+        checkpoints = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, COMMANDS)
+        checkpoints.save("scancode", "1", {"scancode": {"files": []}})
+        checkpoints.save("osv-scanner", "1", {"osv-scanner": {"error": "timeout"}})
+
+        restored = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, COMMANDS).restore(
+            {"scancode": "1", "osv-scanner": "1", "url-checker": "1"}
+        )
+        self.assertEqual(restored, {"scancode": {"scancode": {"files": []}}})
+
+        self.assertEqual(checkpoints.restore({"scancode": "2"}), {})
+        self.assertEqual(self.store.task("https://github.com/test/repo", "v2.0", None, REVISION, COMMANDS).restore({"scancode": "1"}), {})
+
+        checkpoints.clear()
+        self.assertEqual(checkpoints.restore({"scancode": "1"}), {})
+
+    def test_moved_version_not_restored(self):
+        """测试版本指向新提交后不恢复旧提交的检查点"""
+        self.store.task("https://github.com/test/repo", "None", None, REVISION, COMMANDS).save("scancode", "1", {"scancode": {}})
+        moved = self.store.task("https://github.com/test/repo", "None", None, "b" * 40, COMMANDS)
+        self.assertEqual(moved.restore({"scancode": "1"}), {})
+
+    def test_tasks_with_other_commands_kept_apart(self):
+        """测试命令不同的并发任务互不清除检查点"""
+        checkpoints = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, COMMANDS)
+        checkpoints.save("scancode", "1", {"scancode": {}})
+        other = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, ["scancode", "sonar-scanner"])
+        other.clear()
+
+        self.assertEqual(checkpoints.restore({"scancode": "1"}), {"scancode": {"scancode": {}}})
+        self.assertEqual(other.restore({"scancode": "1"}), {})
+        same = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, list(reversed(COMMANDS)))
+        self.assertEqual(same.directory, checkpoints.directory)
+
+    def test_expired_checkpoints_purged(self):
+        """测试过期检查点被清理"""
+        checkpoints = self.store.task("https://github.com/test/repo", "v1.0", None, REVISION, COMMANDS)
+        checkpoints.save("scancode", "1", {"scancode": {}})
+        old = time.time() - 120
+        os.utime(checkpoints.directory, (old, old))
+
+        self.assertEqual(self.store.purge_expired(), 1)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Consumer Reconnect Tests
+
+This module tests the reconnect backoff of the message consumer and the
+tracking of in-flight tasks across connection generations.
+
+Author: OpenChecker Team
+"""
+
+import os
+import unittest
+from unittest.mock import Mock
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.message_queue import InFlightTasks, ReconnectBackoff, TaskChannel
+
+
+class TestConsumerReconnect(unittest.TestCase):
+    """消费者重连测试类"""
+
+    def test_backoff_grows_and_resets(self):
+        """测试重连延迟指数增长、有上限并可重置"""
+        backoff = ReconnectBackoff(initial=0.1, maximum=1.0)
+        delays = [backoff.next_delay() for _ in range(6)]
+
+        self.assertTrue(0.05 <= delays[0] <= 0.1)
+        self.assertTrue(0.5 <= delays[-1] <= 1.0)
+        backoff.reset()
+        self.assertLessEqual(backoff.next_delay(), 0.1)
+
+    def test_backoff_kept_across_failing_connections(self):
+        """测试连接建立后立即失败时退避继续增长，连接稳定后才重置"""
+        backoff = ReconnectBackoff(initial=0.1, maximum=1.0, stable_after=60)
+        for _ in range(5):
+            backoff.connected()
+            delay = backoff.next_delay()
+        self.assertGreaterEqual(delay, 0.5)
+
+        backoff.connected()
+        backoff._connected_at -= 60
+        self.assertLessEqual(backoff.next_delay(), 0.1)
+
+    def test_redelivery_attached_to_running_task(self):
+        """测试连接断开后重投的消息附加到仍在运行的任务"""
+        tasks = InFlightTasks()
+        old_channel, new_channel = Mock(), Mock()
+
+        tasks.new_generation()
+        task = tasks.begin("key", old_channel, 1, redelivered=False)
+        self.assertIsNotNone(task)
+
+        tasks.new_generation()
+        self.assertIsNone(tasks.begin("key", new_channel, 7, redelivered=True))
+        self.assertEqual(len(tasks), 1)
+
+        TaskChannel(tasks, task).basic_ack(delivery_tag=1)
+        new_channel.basic_ack.assert_called_once_with(delivery_tag=7)
+        old_channel.basic_ack.assert_not_called()
+        self.assertEqual(len(tasks), 0)
+
+    def test_new_submission_not_attached(self):
+        """测试相同内容的新消息（非重投）不附加到运行中的任务"""
+        tasks = InFlightTasks()
+        old_channel, new_channel = Mock(), Mock()
+
+        tasks.new_generation()
+        task = tasks.begin("key", old_channel, 1, redelivered=False)
+
+        tasks.new_generation()
+        submission = tasks.begin("key", new_channel, 7, redelivered=False)
+        self.assertIsNotNone(submission)
+        self.assertEqual(len(tasks), 2)
+
+        tasks.settle(task, True)
+        old_channel.basic_ack.assert_called_once_with(delivery_tag=1)
+        tasks.settle(submission, True)
+        new_channel.basic_ack.assert_called_once_with(delivery_tag=7)
+
+    def test_redelivery_of_finished_task_settled(self):
+        """测试已完成任务的重投直接按记录结果确认"""
+        tasks = InFlightTasks()
+        channel = Mock()
+        channel.basic_ack.side_effect = [RuntimeError("connection closed"), None]
+
+        tasks.new_generation()
+        tasks.settle(tasks.begin("key", channel, 1, redelivered=False), True)
+
+        tasks.new_generation()
+        self.assertIsNone(tasks.begin("key", channel, 2, redelivered=True))
+        channel.basic_ack.assert_called_with(delivery_tag=2)
+
+        # A new submission of the same message is processed again
+        self.assertIsNotNone(tasks.begin("key", channel, 3, redelivered=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
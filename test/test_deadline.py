@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Deadline Tests
+
+This module tests the parsing of task deadlines, the learnt checker runtime
+estimates and the timeouts derived from the time left.
+
+Author: OpenChecker Team
+"""
+
+import time
+import unittest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.deadline import RuntimeEstimates, TaskDeadline, parse_deadline
+
+
+class TestDeadline(unittest.TestCase):
+    """任务截止时间测试类"""
+
+    def test_parse_deadline(self):
+        """测试解析秒数与ISO 8601格式的截止时间"""
+        self.assertEqual(parse_deadline(600, now=1000.0), 1600.0)
+        self.assertEqual(parse_deadline("600", now=1000.0), 1600.0)
+        self.assertEqual(parse_deadline("2026-01-01T00:00:00Z"), 1767225600.0)
+        self.assertEqual(parse_deadline("2026-01-01T08:00:00+08:00"), 1767225600.0)
+        self.assertEqual(parse_deadline("2026-01-01T00:00:00"), 1767225600.0)
+        self.assertIsNone(parse_deadline(None))
+        self.assertIsNone(parse_deadline("tomorrow"))
+
+    def test_estimates_and_ordering(self):
+        """测试按资源类别给出初始估计并根据实际耗时更新"""
+        estimates = RuntimeEstimates(alpha=0.5)
+        self.assertEqual(estimates.estimate("scancode", "large"), 900)
+        self.assertEqual(estimates.estimate("download-checkout"), 60)
+
+        estimates.observe("scancode", 100)
+        estimates.observe("scancode", 200)
+        self.assertEqual(estimates.estimate("scancode", "large"), 150)
+
+        deadline = TaskDeadline(time.time() + 60, estimates)
+        classes = {"dependency-checker": "heavy", "scancode": "large", "url-checker": "network"}
+        self.assertEqual(deadline.order(list(classes), classes), ["url-checker", "scancode", "dependency-checker"])
+
+    def test_timeout_limited_by_time_left(self):
+        """测试检查器超时不超过剩余时间"""
+        deadline = TaskDeadline(time.time() + 60, RuntimeEstimates())
+        self.assertLessEqual(deadline.timeout(3600), 60)
+        self.assertEqual(deadline.timeout(10), 10)
+        self.assertFalse(deadline.expired())
+        self.assertTrue(TaskDeadline(time.time() - 1, RuntimeEstimates()).expired())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Import Time Tests
+
+This module guards the cold start of the agent and API processes: importing
+their entry modules must stay within a recorded budget and must not pull in
+dependencies that are only needed by individual checkers.
+
+Author: OpenChecker Team
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(PROJECT_ROOT, "openchecker")
+
+# Cumulative import time budgets in microseconds. They are several times the
+# time measured when they were recorded (agent ~0.2s, API ~0.25s), so only a
+# regression such as a heavy module imported eagerly again exceeds them.
+IMPORT_TIME_BUDGETS_US = {
+    "agent": 600_000,
+    "main": 800_000,
+}
+
+# Modules that must only be imported on first use
+DEFERRED_MODULES = {
+    "agent": ("openai", "ghapi"),
+    "main": ("openai", "ghapi", "flask_restful", "flask_jwt_extended", "user_manager", "message_queue", "pika"),
+}
+
+
+def measure_import(module):
+    """
+    Import module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Tuple[int, Dict[str, int]]: Cumulative import time of module in
+        microseconds, and the cumulative time of every imported module
+    """
+    env = dict(os.environ, PYTHONPATH=SOURCE_DIR)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+
+    imported = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(cumulative)
+    return imported[module], imported
+
+
+class TestImportTime(unittest.TestCase):
+    """入口模块导入耗时测试类"""
+
+    def check_entry_point(self, module):
+        cumulative, imported = measure_import(module)
+
+        for deferred in DEFERRED_MODULES[module]:
+            self.assertNotIn(deferred, imported, f"{module} imports {deferred} eagerly")
+        self.assertLessEqual(
+            cumulative, IMPORT_TIME_BUDGETS_US[module],
+            f"Importing {module} took {cumulative}us, budget is {IMPORT_TIME_BUDGETS_US[module]}us"
+        )
+
+    def test_agent_import_time(self):
+        """测试agent入口导入耗时"""
+        self.check_entry_point("agent")
+
+    def test_api_import_time(self):
+        """测试API入口导入耗时"""
+        self.check_entry_point("main")
+
+
+if __name__ == '__main__':
+    unittest.main()
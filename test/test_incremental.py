@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Incremental Rescan Tests
+
+This module tests the change sets and baselines that let file-level checkers
+rescan only the files changed since the previously cached commit.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.checker_registry import get_checker
+from openchecker.checkers.binary_checker import merge_binary_findings
+from openchecker.checkers.pinned_dependencies_checker import pinned_dependencies_checker
+from openchecker.common import relativize_paths
+from openchecker.incremental import IncrementalScan, changes_since
+from openchecker.result_cache import ResultCache
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+class TestIncremental(unittest.TestCase):
+    """增量扫描测试类"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.workspace = os.path.join(self.root, "workspace")
+        self.checkout = os.path.join(self.workspace, "repo")
+        os.makedirs(self.checkout)
+        _git("init", "-q", cwd=self.checkout)
+        _write(os.path.join(self.checkout, "Dockerfile"), "FROM python:3.11\n")
+        _write(os.path.join(self.checkout, "docker", "old", "Dockerfile"), "FROM node:20\n")
+        _write(os.path.join(self.checkout, "requirements.txt"), "requests==2.31.0\n")
+        _git("add", "-A", cwd=self.checkout)
+        _git("commit", "-q", "-m", "first", cwd=self.checkout)
+        self.first = _git("rev-parse", "HEAD", cwd=self.checkout)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _second_commit(self):
+        _write(os.path.join(self.checkout, "Dockerfile"), "FROM python:3.12\n")
+        _git("mv", "docker/old", "docker/new", cwd=self.checkout)
+        os.remove(os.path.join(self.checkout, "requirements.txt"))
+        _write(os.path.join(self.checkout, "scripts", "setup.sh"), "curl https://example.com/x.sh | bash\n")
+        _git("add", "-A", cwd=self.checkout)
+        _git("commit", "-q", "-m", "second", cwd=self.checkout)
+        return _git("rev-parse", "HEAD", cwd=self.checkout)
+
+    def test_changes_since(self):
+        """测试计算新增、修改、重命名与删除的文件"""
+        self._second_commit()
+        changes = changes_since(self.checkout, self.first)
+
+        self.assertEqual(sorted(changes.examine), ["Dockerfile", "docker/new/Dockerfile", "scripts/setup.sh"])
+        self.assertEqual(changes.touched, {
+            "Dockerfile", "docker/old/Dockerfile", "docker/new/Dockerfile", "requirements.txt", "scripts/setup.sh"
+        })
+        self.assertIsNone(changes_since(self.checkout, "0" * 40))
+
+    def test_merge_binary_findings(self):
+        """测试二进制文件结果按变更文件合并"""
+        previous = {"binary_file_list": ["repo/a.bin", "repo/b.bin"], "binary_archive_list": ["repo/c.zip"]}
+        current = {"binary_file_list": ["repo/d.bin"], "binary_archive_list": []}
+
+        merged = merge_binary_findings(previous, current, {"b.bin", "c.zip", "d.bin"})
+
+        self.assertEqual(merged, {"binary_file_list": ["repo/a.bin", "repo/d.bin"], "binary_archive_list": []})
+
+    def test_incremental_rescan_matches_full_scan(self):
+        """测试增量扫描合并后的结果与全量扫描一致"""
+        cache = ResultCache(os.path.join(self.root, "cache"))
+        specs = [get_checker("pinned-dependencies-checker")]
+        handler = specs[0].bind({"project_url": "https://github.com/test/repo", "workspace": self.workspace})
+
+        task = cache.task(specs, self.first, "https://github.com/test/repo", None, None, {}, self.workspace)
+        self.assertIsNone(IncrementalScan(task).baseline("pinned-dependencies-checker"))
+        payload = {"scan_results": {}}
+        handler(payload)
+        task.save("pinned-dependencies-checker", relativize_paths(payload["scan_results"], self.workspace))
+
+        second = self._second_commit()
+        task = cache.task(specs, second, "https://github.com/test/repo", None, None, {}, self.workspace)
+        baseline = IncrementalScan(task).baseline("pinned-dependencies-checker")
+        self.assertEqual(baseline.revision, self.first)
+
+        incremental_payload = {"scan_results": {}}
+        handler(incremental_payload, files=baseline.changes.examine)
+        merged = baseline.merge(
+            relativize_paths(incremental_payload["scan_results"], self.workspace)
+        )["pinned-dependencies-checker"]
+
+        full_payload = {"scan_results": {}}
+        pinned_dependencies_checker("https://github.com/test/repo", full_payload, self.workspace)
+        full = relativize_paths(full_payload["scan_results"], self.workspace)["pinned-dependencies-checker"]
+
+        def key(dep):
+            return dep["file_path"], dep["line_number"]
+        self.assertEqual(sorted(merged["dependencies"], key=key), sorted(full["dependencies"], key=key))
+        self.assertEqual(merged["analysis_results"]["total_dependencies"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Workspace Janitor Tests
+
+This module tests the background deletion of task workspaces, the removal
+of workspaces left behind by dead tasks and the eviction of repository
+mirrors above the disk quota.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.janitor import TRASH_DIR, WorkspaceJanitor
+from openchecker.repository_mirrors import RepositoryMirrors
+from openchecker.workspace import LOCK_FILE, TaskWorkspace
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def _quota_below_usage(repos_dir, mirrors):
+    return WorkspaceJanitor(repos_dir, mirrors=mirrors).usage() - 1
+
+
+class TestWorkspaceJanitor(unittest.TestCase):
+    """工作区清理测试类"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.repos_dir = os.path.join(self.root, "repos")
+        os.makedirs(self.repos_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_discard_in_background(self):
+        """测试清理时先移入回收目录，再由后台删除"""
+        janitor = WorkspaceJanitor(self.repos_dir)
+        workspace = TaskWorkspace.create(self.repos_dir, "https://github.com/test/repo")
+        os.makedirs(os.path.join(workspace.checkout, "src"))
+
+        workspace.cleanup(janitor)
+        self.assertFalse(os.path.exists(workspace.root))
+        self.assertEqual(len(os.listdir(os.path.join(self.repos_dir, TRASH_DIR))), 1)
+
+        janitor.drain()
+        self.assertEqual(os.listdir(os.path.join(self.repos_dir, TRASH_DIR)), [])
+
+    def test_remove_orphans(self):
+        """测试移除已退出任务遗留的工作区，保留运行中任务的工作区"""
+        janitor = WorkspaceJanitor(self.repos_dir, orphan_ttl=3600)
+        live = TaskWorkspace.create(self.repos_dir, "https://github.com/test/repo")
+        _age(os.path.join(live.root, LOCK_FILE), 600)
+
+        dead = os.path.join(self.repos_dir, "dead")
+        os.makedirs(dead)
+        open(os.path.join(dead, LOCK_FILE), "w").close()
+        _age(os.path.join(dead, LOCK_FILE), 600)
+        starting = os.path.join(self.repos_dir, "starting")
+        os.makedirs(starting)
+        open(os.path.join(starting, LOCK_FILE), "w").close()
+
+        stale_spool = os.path.join(self.repos_dir, "openchecker-results-stale")
+        os.makedirs(stale_spool)
+        _age(stale_spool, 7200)
+        os.makedirs(os.path.join(self.repos_dir, "openchecker-results-fresh"))
+
+        self.assertEqual(janitor.remove_orphans(), 2)
+        janitor.drain()
+        self.assertEqual(
+            sorted(os.listdir(self.repos_dir)),
+            sorted([os.path.basename(live.root), "starting", "openchecker-results-fresh", TRASH_DIR])
+        )
+        live.cleanup()
+
+    def test_evict_mirrors_above_quota(self):
+        """测试超出磁盘配额时按最近最少使用淘汰镜像，保留运行中任务引用的镜像"""
+        mirrors = RepositoryMirrors(os.path.join(self.root, "mirrors"))
+        urls = []
+        for name in ("old", "borrowed", "recent"):
+            remote = os.path.join(self.root, "remotes", name)
+            os.makedirs(remote)
+            _git("init", "-q", cwd=remote)
+            _git("commit", "-q", "--allow-empty", "-m", name, cwd=remote)
+            urls.append(f"file://{remote}")
+            self.assertTrue(mirrors.checkout(urls[-1], "None", os.path.join(self.root, "checkouts", name)))
+        _age(f"{mirrors.mirror_path(urls[0])}.lock", 300)
+        _age(f"{mirrors.mirror_path(urls[1])}.lock", 200)
+
+        live = TaskWorkspace.create(self.repos_dir, urls[1])
+        self.assertTrue(mirrors.checkout(urls[1], "None", live.checkout))
+        _age(f"{mirrors.mirror_path(urls[1])}.lock", 200)
+
+        janitor = WorkspaceJanitor(self.repos_dir, quota=_quota_below_usage(self.repos_dir, mirrors), mirrors=mirrors)
+        self.assertEqual(janitor.enforce_quota(), 1)
+        janitor.drain()
+        self.assertFalse(os.path.exists(mirrors.mirror_path(urls[0])))
+        self.assertTrue(os.path.exists(mirrors.mirror_path(urls[1])))
+        self.assertTrue(os.path.exists(mirrors.mirror_path(urls[2])))
+
+        janitor.quota = 1
+        self.assertEqual(janitor.enforce_quota(), 1)
+        self.assertTrue(os.path.exists(mirrors.mirror_path(urls[1])))
+        live.cleanup()
+
+
+    def test_borrowed_mirrors_kept(self):
+        """测试删除镜像前在镜像锁内确认没有运行中任务引用该镜像"""
+        mirrors = RepositoryMirrors(os.path.join(self.root, "mirrors"), ttl=60)
+        remote = os.path.join(self.root, "remote")
+        os.makedirs(remote)
+        _git("init", "-q", cwd=remote)
+        _git("commit", "-q", "--allow-empty", "-m", "initial", cwd=remote)
+        url = f"file://{remote}"
+        janitor = WorkspaceJanitor(self.repos_dir, mirrors=mirrors)
+
+        live = TaskWorkspace.create(self.repos_dir, url)
+        self.assertTrue(mirrors.checkout(url, "None", live.checkout))
+        _age(f"{mirrors.mirror_path(url)}.lock", 300)
+        self.assertFalse(mirrors.evict(mirrors.mirror_path(url), janitor.discard, janitor._borrowed))
+        self.assertEqual(mirrors.purge_unused(janitor.discard, janitor._borrowed), 0)
+        self.assertTrue(os.path.exists(mirrors.mirror_path(url)))
+
+        live.cleanup()
+        self.assertEqual(mirrors.purge_unused(janitor.discard, janitor._borrowed), 1)
+        janitor.drain()
+        self.assertFalse(os.path.exists(mirrors.mirror_path(url)))
+
+if __name__ == '__main__':
+    unittest.main()
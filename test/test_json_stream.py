@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Streaming JSON Tests
+
+This module tests incremental reading of large tool outputs from files and
+the summaries built from them for ORT and scancode results.
+
+Author: OpenChecker Team
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker import json_stream
+from openchecker.checkers import shell_script_checker
+
+
+class TestJsonStream(unittest.TestCase):
+    """流式JSON读取测试类"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, "w") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+
+    def test_load_get_and_iter_items(self):
+        """测试整体解析、按路径读取与逐项迭代"""
+        self.write({"headers": [{"tool": "x"}], "files": [{"path": "a", "score": 1.5}, {"path": "b"}]})
+
+        self.assertEqual(json_stream.load(self.path)["files"][0]["score"], 1.5)
+        self.assertEqual(json_stream.get(self.path, "headers"), [{"tool": "x"}])
+        self.assertEqual(json_stream.get(self.path, "missing", []), [])
+        self.assertEqual([f["path"] for f in json_stream.iter_items(self.path, "files.item")], ["a", "b"])
+        self.assertEqual(list(json_stream.iter_items(self.path, "missing.item")), [])
+
+    def test_fallback_without_ijson(self):
+        """测试未安装ijson时回退到json模块"""
+        self.write({"files": [{"path": "a"}]})
+
+        with patch.object(json_stream, "ijson", None):
+            self.assertEqual(json_stream.get(self.path, "files"), [{"path": "a"}])
+            self.assertEqual(list(json_stream.iter_items(self.path, "files.item")), [{"path": "a"}])
+
+    def test_malformed_output_kept_raw(self):
+        """测试无法解析的输出以原文返回"""
+        self.write("not json")
+
+        result = shell_script_checker.process_command_output("osv-scanner", self.path)
+
+        self.assertEqual(result, {"raw_output": "not json"})
+
+    def test_dependency_checker_summary(self):
+        """测试ORT分析结果的流式汇总"""
+        self.write({"analyzer": {"result": {"packages": [
+            {"purl": "pkg:npm/a@1", "declared_licenses": ["MIT"], "description": "x" * 1000},
+            {"purl": "pkg:npm/b@1", "declared_licenses": [], "homepage_url": "https://example.com"}
+        ]}}})
+
+        result = shell_script_checker.process_command_output("dependency-checker", self.path)
+
+        self.assertEqual(result, {
+            "packages_all": ["pkg:npm/a@1", "pkg:npm/b@1"],
+            "packages_with_license_detect": ["pkg:npm/a@1"],
+            "packages_without_license_detect": ["pkg:npm/b@1"]
+        })
+
+    def test_scancode_summary(self):
+        """测试scancode结果的摘要模式"""
+        self.write({
+            "headers": [{"tool_name": "scancode-toolkit"}],
+            "files": [{
+                "path": "src/a.py",
+                "type": "file",
+                "detected_license_expression": "mit",
+                "copyrights": [{"copyright": "Copyright (c) Example", "start_line": 1}],
+                "license_detections": [{"matches": ["large"]}]
+            }]
+        })
+
+        with patch.object(shell_script_checker, "_scancode_output_mode", return_value="summary"):
+            result = shell_script_checker.process_command_output("scancode", self.path)
+
+        self.assertEqual(result["headers"], [{"tool_name": "scancode-toolkit"}])
+        self.assertEqual(result["files"], [{
+            "path": "src/a.py",
+            "type": "file",
+            "detected_license_expression": "mit",
+            "copyrights": ["Copyright (c) Example"]
+        }])
+
+
+if __name__ == '__main__':
+    unittest.main()
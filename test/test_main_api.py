@@ -276,8 +276,8 @@ class TestAPIConfiguration(unittest.TestCase):
         # 这里可以测试配置是否正确应用
         self.assertTrue(True)  # 简化测试
 
-    @patch('openchecker.main.test_rabbitmq_connection')
-    @patch('openchecker.main.create_queue')
+    @patch('openchecker.message_queue.test_rabbitmq_connection')
+    @patch('openchecker.message_queue.create_queue')
     def test_rabbitmq_initialization(self, mock_create_queue, mock_test_connection):
         """测试RabbitMQ初始化"""
         # 设置模拟
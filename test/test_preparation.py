@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Preparation Planner Tests
+
+This module tests how the preparation of a task (clone depth, sparse
+checkout, lock file generation) is derived from the prerequisites of the
+requested checkers.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.agent import _build_task_steps
+from openchecker.checker_registry import get_checker
+from openchecker.common import shell_exec
+from openchecker.preparation import download_script, partial_clone, plan_preparation
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def _specs(*names):
+    return [get_checker(name) for name in names]
+
+
+class TestPreparation(unittest.TestCase):
+    """任务准备步骤规划测试类"""
+
+    def test_plan_preparation(self):
+        """测试根据检查器前置条件规划克隆深度与锁文件生成"""
+        plan = plan_preparation(_specs("url-checker", "eol-checker"))
+        self.assertEqual((plan.clone, plan.full_history, plan.lockfiles), (False, False, False))
+
+        plan = plan_preparation(_specs("url-checker", "readme-checker"))
+        self.assertEqual((plan.clone, plan.full_history, plan.lockfiles), (True, False, False))
+
+        plan = plan_preparation(_specs("readme-checker", "osv-scanner"))
+        self.assertEqual((plan.clone, plan.full_history, plan.lockfiles), (True, False, True))
+
+        plan = plan_preparation(_specs("changed-files-since-commit-detector"))
+        self.assertEqual((plan.clone, plan.full_history, plan.lockfiles), (True, True, False))
+
+        plan = plan_preparation(_specs("readme-checker"), full_history=True)
+        self.assertTrue(plan.full_history)
+        self.assertFalse(plan_preparation(_specs("eol-checker"), full_history=True).full_history)
+
+    def test_plan_sparse_paths(self):
+        """测试仅当所有读取检出的检查器声明路径时才使用稀疏检出"""
+        plan = plan_preparation(_specs("readme-checker", "security-policy-checker", "eol-checker"))
+        self.assertEqual(plan.paths, sorted(set(get_checker("readme-checker").paths)
+                                            | set(get_checker("security-policy-checker").paths)))
+        self.assertIsNone(plan_preparation(_specs("readme-checker", "scancode")).paths)
+        self.assertIsNone(plan_preparation(_specs("readme-checker", "osv-scanner")).paths)
+        self.assertIsNone(plan_preparation(_specs("readme-checker"), sparse=False).paths)
+        self.assertIsNone(plan_preparation(_specs("eol-checker")).paths)
+
+    def test_plan_archive(self):
+        """测试仅当检查器不需要git元数据时才下载源码归档"""
+        self.assertTrue(plan_preparation(_specs("scancode", "osv-scanner")).archive)
+        self.assertFalse(plan_preparation(_specs("scancode", "languages-detector")).archive)
+        self.assertFalse(plan_preparation(_specs("scancode", "changed-files-since-commit-detector")).archive)
+        self.assertFalse(plan_preparation(_specs("scancode"), full_history=True).archive)
+        self.assertFalse(plan_preparation(_specs("readme-checker")).archive)
+        self.assertFalse(plan_preparation(_specs("scancode"), archives=False).archive)
+        self.assertFalse(plan_preparation(_specs("eol-checker")).archive)
+
+    def test_partial_clone(self):
+        """测试部分克隆只检出匹配路径的文件"""
+        root = tempfile.mkdtemp()
+        try:
+            remote = os.path.join(root, "repo")
+            os.makedirs(os.path.join(remote, "src"))
+            _git("init", "-q", cwd=remote)
+            _git("config", "uploadpack.allowFilter", "true", cwd=remote)
+            for path in ("README.md", "SECURITY.md", os.path.join("src", "README.md"), os.path.join("src", "main.c")):
+                with open(os.path.join(remote, path), "w") as f:
+                    f.write(path)
+            _git("add", ".", cwd=remote)
+            _git("commit", "-q", "-m", "initial", cwd=remote)
+            _git("tag", "v1.0", cwd=remote)
+
+            checkout = os.path.join(root, "checkout")
+            self.assertTrue(partial_clone(f"file://{remote}", "v1.0", checkout, ["/README*"], full_history=False))
+            self.assertEqual(_git("rev-parse", "HEAD", cwd=checkout), _git("rev-parse", "v1.0", cwd=remote))
+            self.assertEqual(sorted(os.listdir(checkout)), [".git", "README.md"])
+
+            missing = os.path.join(root, "missing")
+            self.assertFalse(partial_clone(f"file://{root}/missing", "None", missing, ["/README*"]))
+            self.assertFalse(os.path.exists(missing))
+        finally:
+            shutil.rmtree(root)
+
+    def test_task_steps_follow_plan(self):
+        """测试任务只包含检查器需要的准备步骤"""
+        def noop(*args):
+            return None
+
+        def step_names(command_list):
+            switch = {command: noop for command in command_list}
+            steps = _build_task_steps(command_list, switch, noop, noop, noop)
+            return {step.name: list(step.requires) for step in steps}
+
+        self.assertEqual(step_names(["url-checker", "eol-checker"]), {"url-checker": [], "eol-checker": []})
+        self.assertEqual(
+            step_names(["readme-checker", "eol-checker"]),
+            {"download-checkout": [], "readme-checker": ["download-checkout"], "eol-checker": []}
+        )
+        steps = step_names(["readme-checker", "dependency-checker"])
+        self.assertEqual(steps["generate-lock_files"], ["download-checkout"])
+        self.assertEqual(steps["readme-checker"], ["download-checkout", "generate-lock_files"])
+
+    def test_shallow_checkout_of_tag(self):
+        """测试浅克隆直接检出版本标签，标签不存在时克隆默认分支"""
+        root = tempfile.mkdtemp()
+        try:
+            remote = os.path.join(root, "repo")
+            os.makedirs(remote)
+            _git("init", "-q", cwd=remote)
+            for n in range(3):
+                with open(os.path.join(remote, "README.md"), "w") as f:
+                    f.write(f"version {n}\n")
+                _git("add", "README.md", cwd=remote)
+                _git("commit", "-q", "-m", f"commit {n}", cwd=remote)
+                if n == 1:
+                    _git("tag", "v1.0", cwd=remote)
+            url = f"file://{remote}"
+
+            for version, expected in (("v1.0", "v1.0"), ("v9.9", "HEAD")):
+                workspace = os.path.join(root, version)
+                os.makedirs(workspace)
+                _, error = shell_exec(download_script(url, version, full_history=False), cwd=workspace)
+                self.assertIsNone(error)
+                checkout = os.path.join(workspace, "repo")
+                self.assertEqual(_git("rev-parse", "HEAD", cwd=checkout), _git("rev-parse", expected, cwd=remote))
+                self.assertEqual(_git("rev-list", "--count", "HEAD", cwd=checkout), "1")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
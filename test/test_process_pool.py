@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Process Pool Tests
+
+This module tests the recycling process pool used by the agent's
+process execution mode.
+
+Author: OpenChecker Team
+"""
+
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.process_pool import RecyclingProcessPool
+
+
+class TestRecyclingProcessPool(unittest.TestCase):
+    """进程池测试类"""
+
+    def setUp(self):
+        """测试前置设置"""
+        self.pool = RecyclingProcessPool(max_workers=1, max_tasks_per_child=2)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.pool.shutdown()
+
+    def test_runs_in_child_process(self):
+        """测试任务在子进程中执行"""
+        self.assertNotEqual(self.pool.run(os.getpid), os.getpid())
+
+    def test_child_recycled_after_max_tasks(self):
+        """测试子进程执行指定数量任务后被替换"""
+        pids = [self.pool.run(os.getpid) for _ in range(4)]
+
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_exception_propagates(self):
+        """测试子进程异常传递给调用方"""
+        with self.assertRaises(ValueError):
+            self.pool.run(int, "not a number")
+
+    def test_recovers_from_killed_child(self):
+        """测试子进程异常退出后进程池可恢复"""
+        with self.assertRaises(BrokenProcessPool):
+            self.pool.run(os._exit, 1)
+        self.assertEqual(self.pool.run(int, "42"), 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Repository Mirror Tests
+
+This module tests the bare repository mirrors task checkouts are made from,
+against a local git repository standing in for the remote.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.repository_mirrors import RepositoryMirrors
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestRepositoryMirrors(unittest.TestCase):
+    """仓库镜像测试类"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.mirrors = RepositoryMirrors(os.path.join(self.root, "mirrors"))
+        self.remote = os.path.join(self.root, "repo")
+        os.makedirs(self.remote)
+        _git("init", "-q", cwd=self.remote)
+        self._commit("version 0")
+        _git("tag", "-a", "v1.0", "-m", "release", cwd=self.remote)
+        self._commit("version 1")
+        self.url = f"file://{self.remote}"
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _commit(self, content):
+        with open(os.path.join(self.remote, "README.md"), "w") as f:
+            f.write(content)
+        _git("add", "README.md", cwd=self.remote)
+        _git("commit", "-q", "-m", content, cwd=self.remote)
+
+    def test_checkout_versions(self):
+        """测试从镜像检出默认分支与版本标签"""
+        head = os.path.join(self.root, "head")
+        self.assertTrue(self.mirrors.checkout(self.url, "None", head))
+        self.assertEqual(_git("rev-parse", "HEAD", cwd=head), _git("rev-parse", "HEAD", cwd=self.remote))
+        self.assertEqual(_git("remote", "get-url", "origin", cwd=head), self.url)
+
+        tagged = os.path.join(self.root, "tagged")
+        self.assertTrue(self.mirrors.checkout(self.url, "v1.0", tagged))
+        self.assertEqual(_git("rev-parse", "HEAD", cwd=tagged), _git("rev-parse", "v1.0^{commit}", cwd=self.remote))
+        # The checkout shares the mirror's objects and has the whole history
+        self.assertTrue(os.path.exists(os.path.join(tagged, ".git", "objects", "info", "alternates")))
+        self.assertEqual(_git("rev-list", "--count", "HEAD", cwd=head), "2")
+
+    def test_sparse_checkout(self):
+        """测试从镜像稀疏检出仅包含匹配路径的文件"""
+        os.makedirs(os.path.join(self.remote, "src"))
+        with open(os.path.join(self.remote, "src", "main.c"), "w") as f:
+            f.write("int main(void) { return 0; }\n")
+        _git("add", "src", cwd=self.remote)
+        _git("commit", "-q", "-m", "add sources", cwd=self.remote)
+
+        sparse = os.path.join(self.root, "sparse")
+        self.assertTrue(self.mirrors.checkout(self.url, "None", sparse, paths=["/README*"]))
+        self.assertEqual(sorted(os.listdir(sparse)), [".git", "README.md"])
+        self.assertEqual(_git("rev-parse", "HEAD", cwd=sparse), _git("rev-parse", "HEAD", cwd=self.remote))
+
+    def test_fetches_new_commits(self):
+        """测试镜像增量拉取新提交与新标签"""
+        self.assertTrue(self.mirrors.checkout(self.url, "None", os.path.join(self.root, "first")))
+        self._commit("version 2")
+        _git("tag", "v2.0", cwd=self.remote)
+
+        second = os.path.join(self.root, "second")
+        self.assertTrue(self.mirrors.checkout(self.url, "v2.0", second))
+        self.assertEqual(_git("rev-parse", "HEAD", cwd=second), _git("rev-parse", "HEAD", cwd=self.remote))
+
+    def test_failures_and_purge(self):
+        """测试远程仓库不可用时检出失败，以及长期未使用的镜像被清理"""
+        destination = os.path.join(self.root, "missing")
+        self.assertFalse(self.mirrors.checkout(f"file://{self.root}/missing", "None", destination))
+        self.assertFalse(os.path.exists(destination))
+
+        self.assertTrue(self.mirrors.checkout(self.url, "None", os.path.join(self.root, "checkout")))
+        mirror = self.mirrors.mirror_path(self.url)
+        self.assertEqual(self.mirrors.purge_unused(), 0)
+        old = time.time() - self.mirrors.ttl - 60
+        os.utime(f"{mirror}.lock", (old, old))
+        self.assertEqual(self.mirrors.purge_unused(), 1)
+        self.assertFalse(os.path.exists(mirror))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Resource Admission Tests
+
+This module tests cgroup limit parsing, the resource budget and the
+pressure monitor adapting it.
+
+Author: OpenChecker Team
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.resources import (
+    RESOURCE_CLASSES,
+    PressureMonitor,
+    ResourceBudget,
+    ResourceWeight,
+    read_cgroup_limits,
+    read_pressure,
+    step_weight,
+)
+from openchecker.scheduler import Step, run_steps
+
+
+class TestResources(unittest.TestCase):
+    """资源准入控制测试类"""
+
+    def setUp(self):
+        self.cgroup_dir = tempfile.TemporaryDirectory()
+        self.cgroup_root = self.cgroup_dir.name
+
+    def tearDown(self):
+        self.cgroup_dir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.cgroup_root, name), "w") as f:
+            f.write(content)
+
+    def test_read_cgroup_v2_limits(self):
+        """测试读取cgroup v2的CPU和内存限制"""
+        self.write("cpu.max", "200000 100000\n")
+        self.write("memory.max", str(512 * 1024 * 1024))
+
+        limits = read_cgroup_limits(self.cgroup_root)
+
+        self.assertEqual(limits["cpu"], 2)
+        self.assertEqual(limits["memory_mb"], 512)
+
+    def test_unlimited_cgroup_falls_back_to_host(self):
+        """测试未设置限制时使用主机资源"""
+        self.write("cpu.max", "max 100000\n")
+        self.write("memory.max", "max\n")
+
+        limits = read_cgroup_limits(self.cgroup_root)
+
+        self.assertEqual(limits["cpu"], float(os.cpu_count()))
+        self.assertGreater(limits["memory_mb"], 0)
+
+    def test_read_pressure(self):
+        """测试读取PSI压力值"""
+        self.write("memory.pressure", "some avg10=12.50 avg60=3.00 avg300=1.00 total=100\n"
+                                      "full avg10=1.00 avg60=0.00 avg300=0.00 total=10\n")
+        self.assertEqual(read_pressure("memory", self.cgroup_root), 12.5)
+
+    def test_budget_admission(self):
+        """测试预算准入与释放"""
+        budget = ResourceBudget(cpu=2, memory_mb=4096, disk_mb=float("inf"))
+        heavy = RESOURCE_CLASSES['heavy']
+
+        self.assertTrue(budget.try_acquire(heavy))
+        self.assertFalse(budget.try_acquire(heavy))
+        self.assertFalse(budget.try_acquire(RESOURCE_CLASSES['large']))
+
+        budget.release(heavy)
+        self.assertEqual(budget.used, ResourceWeight(0, 0, 0))
+        self.assertTrue(budget.try_acquire(RESOURCE_CLASSES['large']))
+
+    def test_oversized_step_admitted_when_idle(self):
+        """测试超出预算的步骤在空闲时仍可执行"""
+        budget = ResourceBudget(cpu=1, memory_mb=1024, disk_mb=0)
+        self.assertTrue(budget.try_acquire(RESOURCE_CLASSES['heavy']))
+
+    def test_starving_step_holds_back_later_steps(self):
+        """测试等待超时的步骤优先获得预算"""
+        budget = ResourceBudget(cpu=4, memory_mb=8192, disk_mb=float("inf"), max_wait=0)
+        light = RESOURCE_CLASSES['light']
+        self.assertTrue(budget.try_acquire(light, "light-0"))
+
+        # Heavier than the whole budget: only admitted alone
+        self.assertFalse(budget.try_acquire(ResourceWeight(cpu=8, memory_mb=16384), "oversized"))
+        self.assertFalse(budget.try_acquire(light, "light-1"))
+
+        budget.release(light)
+        self.assertTrue(budget.try_acquire(ResourceWeight(cpu=8, memory_mb=16384), "oversized"))
+        self.assertFalse(budget.try_acquire(light, "light-1"))
+
+    def test_withdrawn_step_no_longer_holds_back(self):
+        """测试撤回等待的步骤后其他步骤可被准入"""
+        budget = ResourceBudget(cpu=2, memory_mb=4096, disk_mb=float("inf"), max_wait=0)
+        self.assertTrue(budget.try_acquire(RESOURCE_CLASSES['light']))
+        self.assertFalse(budget.try_acquire(RESOURCE_CLASSES['heavy'], "waiting"))
+        self.assertFalse(budget.try_acquire(RESOURCE_CLASSES['network'], "other"))
+
+        budget.withdraw("waiting")
+        self.assertTrue(budget.try_acquire(RESOURCE_CLASSES['network'], "other"))
+
+    def test_preparation_steps_weighted(self):
+        """测试准备步骤带有资源权重"""
+        self.assertEqual(step_weight("generate-lock_files"), RESOURCE_CLASSES['heavy'])
+        self.assertGreater(step_weight("download-checkout").disk_mb, 0)
+
+    def test_pressure_monitor_scales_budget(self):
+        """测试压力监控根据PSI调整预算"""
+        budget = ResourceBudget(cpu=4, memory_mb=8192, disk_mb=float("inf"))
+        monitor = PressureMonitor(budget, cgroup_root=self.cgroup_root)
+
+        self.write("memory.pressure", "some avg10=40.00 avg60=10.00 avg300=1.00 total=100\n")
+        self.assertEqual(monitor.adjust(), 0.75)
+
+        self.write("memory.pressure", "some avg10=0.00 avg60=0.00 avg300=0.00 total=100\n")
+        self.assertAlmostEqual(monitor.adjust(), 0.85)
+
+    def test_scheduler_respects_budget(self):
+        """测试调度器按资源预算限制并发"""
+        budget = ResourceBudget(cpu=2, memory_mb=4096, disk_mb=float("inf"))
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            threading.Event().wait(0.05)
+            with lock:
+                running[0] -= 1
+
+        steps = [Step(f"heavy-{i}", work, weight=RESOURCE_CLASSES['heavy']) for i in range(3)]
+        outcome = run_steps(steps, max_workers=3, budget=budget)
+
+        self.assertTrue(all(error is None for error in outcome.values()))
+        self.assertEqual(peak[0], 1)
+        self.assertEqual(budget.used, ResourceWeight(0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
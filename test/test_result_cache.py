@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Result Cache Tests
+
+This module tests the commit-addressed checker result cache against a local
+git repository standing in for the remote.
+
+Author: OpenChecker Team
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.checker_registry import get_checker
+from openchecker.result_cache import ResultCache, cache_key, repository_identity, resolve_revision
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+class TestResultCache(unittest.TestCase):
+    """结果缓存测试类"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.root, "cache"), ttl=86400)
+
+        self.remote = os.path.join(self.root, "repo")
+        os.makedirs(self.remote)
+        _git("init", "-q", cwd=self.remote)
+        for n in range(2):
+            with open(os.path.join(self.remote, "README.md"), "w") as f:
+                f.write(f"version {n}\n")
+            _git("add", "README.md", cwd=self.remote)
+            _git("-c", "user.name=test", "-c", "user.email=test@example.com",
+                 "commit", "-q", "-m", f"commit {n}", cwd=self.remote)
+            if n == 0:
+                _git("-c", "user.name=test", "-c", "user.email=test@example.com",
+                     "tag", "-a", "v1.0", "-m", "release", cwd=self.remote)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_resolve_revision(self):
+        """测试通过ls-remote解析标签与默认分支对应的提交"""
+        head = _git("rev-parse", "HEAD", cwd=self.remote)
+        tagged = _git("rev-parse", "v1.0^{commit}", cwd=self.remote)
+
+        self.assertEqual(resolve_revision(self.remote, "None"), head)
+        self.assertEqual(resolve_revision(self.remote, "v1.0"), tagged)
+        self.assertEqual(resolve_revision(self.remote, "v9.9"), head)
+        self.assertIsNone(resolve_revision(os.path.join(self.root, "missing"), "None"))
+
+    def test_keys_per_repository(self):
+        """测试缓存键区分平台与仓库，同一仓库的不同URL写法共享缓存"""
+        config = {"OpenCheck": {"scancode_output": "full"}}
+        scancode = get_checker("scancode")
+        upstream = cache_key(scancode, "abc", "https://github.com/a/repo", None, None, config)
+
+        self.assertEqual(upstream, cache_key(scancode, "abc", "https://GitHub.com/a/repo.git/", None, None, config))
+        self.assertNotEqual(upstream, cache_key(scancode, "abc", "https://gitee.com/a/repo", None, None, config))
+        self.assertNotEqual(upstream, cache_key(scancode, "abc", "https://github.com/b/repo", None, None, config))
+        self.assertNotEqual(upstream, cache_key(scancode, "def", "https://github.com/a/repo", None, None, config))
+        self.assertNotEqual(upstream, cache_key(
+            scancode, "abc", "https://github.com/a/repo", None, None, {"OpenCheck": {"scancode_output": "summary"}}
+        ))
+        self.assertEqual(repository_identity("https://gitcode.com/a/repo.git"), "gitcode.com/a/repo")
+
+    def test_task_results(self):
+        """测试任务结果的存取、外部状态检查器过期及检出版本校验"""
+        revision = resolve_revision(self.remote, "None")
+        workspace = os.path.join(self.root, "workspace")
+        os.makedirs(workspace)
+        specs = [get_checker("readme-checker"), get_checker("eol-checker")]
+        task = self.cache.task(specs, revision, self.remote, None, None, {}, workspace)
+
+        # Without a checkout at the revision, results of checkout readers are not cached
+        task.save("readme-checker", {"readme-checker": {"readme_file": []}})
+        task.save("eol-checker", {"eol-checker": {"eol": False}})
+        self.assertEqual(task.restore(), {"eol-checker": {"eol-checker": {"eol": False}}})
+
+        _git("clone", "-q", self.remote, cwd=workspace)
+        task = self.cache.task(specs, revision, self.remote, None, None, {}, workspace)
+        task.save("readme-checker", {"readme-checker": {"readme_file": ["README.md"]}})
+        task.save("eol-checker", {"eol-checker": {"error": "timeout"}})
+        self.assertEqual(sorted(task.restore()), ["eol-checker", "readme-checker"])
+
+        # eol-checker reports remote state and expires after its cache_ttl
+        old = time.time() - 2 * 3600
+        for key in task.keys.values():
+            path = self.cache._path(key)
+            with open(path) as f:
+                entry = json.load(f)
+            entry["stored_at"] = old
+            with open(path, "w") as f:
+                json.dump(entry, f)
+        self.assertEqual(sorted(task.restore()), ["readme-checker"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Result Spool Tests
+
+This module tests the disk-backed scan result mapping and the compressed,
+streamed callback bodies produced from it.
+
+Author: OpenChecker Team
+"""
+
+import gzip
+import json
+import os
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.result_spool import ResultSpool, StreamingBody, iter_payload
+
+
+class TestResultSpool(unittest.TestCase):
+    """结果落盘测试类"""
+
+    def setUp(self):
+        self.spool = ResultSpool(spill_threshold=100)
+
+    def tearDown(self):
+        self.spool.close()
+
+    def test_large_results_spilled_to_disk(self):
+        """测试超过阈值的结果写入磁盘"""
+        large = {"files": ["x" * 50 for _ in range(10)]}
+        self.spool.update({"small": {"ok": True}, "large": large})
+
+        self.assertEqual(len(os.listdir(self.spool._directory)), 1)
+        self.assertEqual(self.spool["large"], large)
+        self.assertEqual(self.spool["small"], {"ok": True})
+        self.assertIn("large", self.spool)
+
+        del self.spool["large"]
+        self.assertEqual(os.listdir(self.spool._directory), [])
+
+    def test_reorder(self):
+        """测试按命令顺序重排结果"""
+        self.spool["b"] = 2
+        self.spool["c"] = 3
+        self.spool["a"] = 1
+
+        self.spool.reorder(["a", "b", "missing"])
+
+        self.assertEqual(list(self.spool), ["a", "b", "c"])
+
+    def test_streamed_payload(self):
+        """测试流式生成的请求体与json序列化一致"""
+        scan_results = {"scancode": {"files": ["文件" * 100]}, "url-checker": {"status": 200}}
+        self.spool.update(scan_results)
+        payload = {"project_url": "https://github.com/test/repo", "scan_results": self.spool}
+
+        document = json.loads(b"".join(iter_payload(payload)))
+        self.assertEqual(document, {"project_url": "https://github.com/test/repo", "scan_results": scan_results})
+
+        body = StreamingBody(payload, "gzip")
+        self.assertEqual(body.headers["Content-Encoding"], "gzip")
+        # The body can be iterated again when a request is retried
+        for _ in range(2):
+            self.assertEqual(json.loads(gzip.decompress(b"".join(body))), document)
+
+        self.assertNotIn("Content-Encoding", StreamingBody(payload, "identity").headers)
+        with self.assertRaises(ValueError):
+            StreamingBody(payload, "brotli")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Retry Queue Tests
+
+This module tests the delayed retry queue ladder transient task failures
+go through before they are dead-lettered.
+
+Author: OpenChecker Team
+"""
+
+import json
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+import pika
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.message_queue import (
+    RETRY_ATTEMPT_HEADER,
+    create_retry_queues,
+    publish_retry,
+    retry_attempt,
+    retry_delays,
+)
+
+
+class TestRetryQueues(unittest.TestCase):
+    """延迟重试队列测试类"""
+
+    def test_retry_ladder_declaration(self):
+        """测试重试队列的TTL与死信路由"""
+        delays = retry_delays({'retry_delays_s': '30, 120'})
+        self.assertEqual(delays, [30, 120])
+
+        with patch('openchecker.message_queue.create_queue') as mock_create_queue:
+            create_retry_queues({}, "opencheck", delays)
+
+        mock_create_queue.assert_any_call({}, "opencheck.retry.120s", arguments={
+            'x-message-ttl': 120000,
+            'x-dead-letter-exchange': '',
+            'x-dead-letter-routing-key': 'opencheck'
+        })
+
+    def test_publish_to_next_retry_queue(self):
+        """测试按尝试次数发布到下一级重试队列，用尽后返回False"""
+        channel = Mock()
+        properties = pika.BasicProperties(
+            headers={RETRY_ATTEMPT_HEADER: 1}, message_id="task-1", content_type="application/json", expiration="5000"
+        )
+
+        self.assertTrue(publish_retry(channel, "opencheck", [30, 120], properties, b"body", "clone failed"))
+        kwargs = channel.basic_publish.call_args.kwargs
+        self.assertEqual(kwargs["routing_key"], "opencheck.retry.120s")
+        self.assertEqual(retry_attempt(kwargs["properties"]), 2)
+        self.assertEqual((kwargs["properties"].message_id, kwargs["properties"].content_type),
+                         ("task-1", "application/json"))
+        self.assertIsNone(kwargs["properties"].expiration)
+        self.assertEqual(retry_attempt(properties), 1)
+
+        exhausted = pika.BasicProperties(headers={RETRY_ATTEMPT_HEADER: 2})
+        self.assertFalse(publish_retry(channel, "opencheck", [30, 120], exhausted, b"body", "clone failed"))
+        self.assertEqual(retry_attempt(pika.BasicProperties()), 0)
+
+    def test_agent_retries_transient_failures(self):
+        """测试Agent对可重试错误进行延迟重试，其他错误进入死信队列"""
+        from openchecker import agent
+
+        ch, method = Mock(), Mock(delivery_tag=5)
+        with patch.dict(agent.config["RabbitMQ"], {'retry_delays_s': '30'}):
+            agent._handle_error_and_nack(ch, method, b"body", "Failed to download project source",
+                                         pika.BasicProperties(), retryable=True)
+            ch.basic_ack.assert_called_once_with(delivery_tag=5)
+
+            agent._handle_error_and_nack(ch, method, b"body", "Project URL is required")
+            ch.basic_nack.assert_called_once_with(delivery_tag=5, requeue=False)
+
+    def test_failures_classified_by_type(self):
+        """测试按异常类型判断任务失败是否可重试"""
+        from openchecker import agent
+
+        body = json.dumps({"command_list": [], "project_url": "https://github.com/test/repo"}).encode()
+        with patch('openchecker.agent._create_task_workspace', side_effect=OSError("No space left on device")):
+            self.assertEqual(agent.process_task(body), (False, "No space left on device", True))
+        with patch('openchecker.agent._create_task_workspace', side_effect=agent.TransientError("storage busy")):
+            self.assertEqual(agent.process_task(body)[2], True)
+        with patch('openchecker.agent._create_task_workspace', side_effect=KeyError("repos_dir")):
+            self.assertEqual(agent.process_task(body)[2], False)
+        self.assertEqual(agent.process_task(b"not json")[2], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
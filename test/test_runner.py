@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Subprocess Runner Tests
+
+This module tests the hardened subprocess runner used for all external
+tools: timeouts, process group kill, resource limits, stdout streaming and
+resource usage reporting.
+
+Author: OpenChecker Team
+"""
+
+import asyncio
+import os
+import signal
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker import common
+from openchecker.common import shell_exec, shell_exec_async
+from openchecker.runner import ResourceLimits, run_command, run_shell
+
+
+class TestRunner(unittest.TestCase):
+    """子进程执行器测试类"""
+
+    def test_run_command_output_and_rusage(self):
+        """测试命令输出、返回码与资源使用统计"""
+        result = run_shell("echo out; echo err >&2; exit 3", limits=ResourceLimits())
+
+        self.assertEqual(result.returncode, 3)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.stdout, b"out\n")
+        self.assertEqual(result.stderr, b"err\n")
+        self.assertGreater(result.max_rss_kb, 0)
+        self.assertGreaterEqual(result.cpu_time, 0)
+
+    def test_timeout_kills_process_group(self):
+        """测试超时后终止整个进程组"""
+        start = time.monotonic()
+        result = run_shell("sleep 30 & sleep 30; wait", timeout=0.5, limits=ResourceLimits())
+
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.ok)
+        self.assertIn(b"timed out", result.stderr)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_no_signal_after_exit(self):
+        """测试命令退出后不再向其进程组发送信号"""
+        with patch('openchecker.runner.KILL_GRACE_PERIOD', 0.2), patch('openchecker.runner._kill_group') as kill_group:
+            kill_group.side_effect = lambda process, sig: os.killpg(process.pid, sig)
+            result = run_shell("trap 'exit 0' TERM; sleep 5 & wait", timeout=0.1, limits=ResourceLimits())
+            time.sleep(0.5)
+        self.assertTrue(result.timed_out)
+        # SIGTERM on timeout, SIGKILL for leftover descendants; the pending SIGKILL timer was cancelled
+        self.assertEqual([c.args[1] for c in kill_group.call_args_list], [signal.SIGTERM, signal.SIGKILL])
+
+    def test_stdout_to_file(self):
+        """测试标准输出写入临时文件"""
+        result = run_command(["seq", "1", "100000"], stdout_to_file=True, limits=ResourceLimits())
+        try:
+            self.assertTrue(result.ok)
+            self.assertIsNone(result.stdout)
+            self.assertTrue(os.path.exists(result.stdout_path))
+            self.assertTrue(result.read_stdout().endswith(b"99999\n100000\n"))
+        finally:
+            path = result.stdout_path
+            result.cleanup()
+        self.assertFalse(os.path.exists(path))
+
+    def test_incremental_consumer(self):
+        """测试增量消费标准输出"""
+        chunks = []
+        result = run_command(["seq", "1", "1000"], on_stdout=chunks.append, limits=ResourceLimits())
+
+        self.assertIsNone(result.stdout)
+        self.assertEqual(b"".join(chunks).split(), [str(i).encode() for i in range(1, 1001)])
+
+    def test_resource_limits(self):
+        """测试资源限制作用于命令"""
+        result = run_shell("ulimit -n", limits=ResourceLimits(open_files=64))
+        self.assertEqual(result.stdout.strip(), b"64")
+
+    def test_shell_exec_async_uses_runner(self):
+        """测试异步执行与同步执行共用资源限制、超时与标准输出文件"""
+        # common imports the runner module by its top-level name
+        runner = sys.modules[common.run_shell.__module__]
+        with patch.object(runner, 'default_limits', return_value=ResourceLimits(open_files=64)):
+            self.assertEqual(asyncio.run(shell_exec_async("ulimit -n")), (b"64\n", None))
+            stdout, error = asyncio.run(shell_exec_async("sleep 30", timeout=0.2))
+        self.assertIsNone(stdout)
+        self.assertIn(b"timed out", error)
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.assertEqual(asyncio.run(shell_exec_async("echo out", stdout_path=path)), (b"", None))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"out\n")
+        finally:
+            os.remove(path)
+
+    def test_shell_exec_compatibility(self):
+        """测试shell_exec保持原有返回格式"""
+        self.assertEqual(shell_exec("echo", "hello"), (b"hello\n", None))
+        output, error = shell_exec("echo boom >&2; false")
+        self.assertIsNone(output)
+        self.assertEqual(error, b"boom\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
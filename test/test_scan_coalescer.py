@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Scan Coalescing Tests
+
+This module tests attaching duplicate scan requests to a running scan and
+fanning its results out to them.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.result_spool import ResultSpool
+from openchecker.scan_coalescer import ScanCoalescer, _read_json, scan_key
+
+
+class TestScanCoalescer(unittest.TestCase):
+    """重复扫描合并测试类"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.coalescer = ScanCoalescer(self.directory, lease=60)
+        self.project_url = "https://github.com/test/repo"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def join(self, commands, callback_url):
+        return self.coalescer.join(self.project_url, "v1.0", None, commands, callback_url, {"caller": callback_url})
+
+    def test_duplicate_attached_and_served(self):
+        """测试重复请求附加到运行中的扫描并收到其结果"""
+        owner = self.join(["scancode", "url-checker"], "https://a/callback")
+        self.assertIsNotNone(owner.key)
+
+        self.assertIsNone(self.join(["url-checker"], "https://b/callback"))
+        # Commands the running scan does not cover are scanned separately
+        self.assertIsNone(self.join(["osv-scanner"], "https://c/callback").key)
+
+        spool = ResultSpool(spill_threshold=10)
+        spool.update({"scancode": {"files": ["a" * 20]}, "url-checker": {"status": 200}})
+        res_payload = {"project_url": self.project_url, "task_metadata": {}, "scan_results": spool}
+
+        attachments = owner.close()
+        self.assertEqual(len(attachments), 1)
+        payload = attachments[0].payload(res_payload)
+        self.assertEqual(payload["task_metadata"], {"caller": "https://b/callback"})
+        self.assertEqual(dict(payload["scan_results"]), {"url-checker": {"status": 200}})
+        spool.close()
+
+        # After the scan finished, the same version is scanned again
+        self.assertIsNotNone(self.join(["url-checker"], "https://d/callback").key)
+
+    def test_released_registration_adopted(self):
+        """测试失败释放后的登记连同附加请求被下一个扫描接管"""
+        owner = self.join(["url-checker"], "https://a/callback")
+        self.assertIsNone(self.join(["url-checker"], "https://b/callback"))
+        owner.release()
+
+        adopter = self.join(["url-checker", "scancode"], "https://a/callback")
+        self.assertIsNotNone(adopter.key)
+        self.assertEqual([a.callback_url for a in adopter.close()], ["https://b/callback"])
+
+
+    def test_single_adopter(self):
+        """测试同一失效登记只能被一个任务接管"""
+        owner = self.join(["url-checker"], "https://a/callback")
+        self.assertIsNone(self.join(["url-checker"], "https://b/callback"))
+        owner.release()
+
+        # Another task read the same gone owner and claimed it first
+        path = os.path.join(self.directory, scan_key(self.project_url, "v1.0", None))
+        self.assertTrue(self.coalescer._claim(path, _read_json(os.path.join(path, "owner.json"))))
+        second = self.join(["url-checker"], "https://c/callback")
+        # This task scans on its own instead of overwriting the other adopter's ownership
+        self.assertIsNone(second.key)
+        self.assertEqual(_read_json(os.path.join(path, "owner.json"))["owner"], owner.owner["owner"])
+
+    def test_abandoned_after_final_failure(self):
+        """测试任务最终失败时附加请求收到错误结果"""
+        owner = self.join(["url-checker"], "https://a/callback")
+        self.assertIsNone(self.join(["url-checker"], "https://b/callback"))
+        # An owner that is still scanning keeps its registration
+        self.assertEqual(self.coalescer.abandon(self.project_url, "v1.0", None), [])
+
+        owner.release()
+        attachments = self.coalescer.abandon(self.project_url, "v1.0", None)
+        self.assertEqual([a.callback_url for a in attachments], ["https://b/callback"])
+        payload = attachments[0].error_payload(self.project_url, "Failed to download project source")
+        self.assertEqual(payload["scan_results"], {"url-checker": {"error": "Failed to download project source"}})
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
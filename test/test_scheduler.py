@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Scheduler Tests
+
+This module tests the dependency-aware step scheduler used by the agent
+to run checkers of a single task concurrently.
+
+Author: OpenChecker Team
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.scheduler import DEADLINE_EXCEEDED, Step, run_steps, run_steps_async
+
+
+class TestScheduler(unittest.TestCase):
+    """步骤调度器测试类"""
+
+    def test_dependencies_run_in_order(self):
+        """测试依赖步骤先于后续步骤执行"""
+        order = []
+        lock = threading.Lock()
+
+        def record(name):
+            def func():
+                with lock:
+                    order.append(name)
+            return func
+
+        steps = [
+            Step("checker", record("checker"), requires=["lockfiles"]),
+            Step("lockfiles", record("lockfiles"), requires=["clone"]),
+            Step("clone", record("clone")),
+        ]
+        outcome = run_steps(steps, max_workers=4)
+
+        self.assertEqual(order, ["clone", "lockfiles", "checker"])
+        self.assertEqual(outcome, {"clone": None, "lockfiles": None, "checker": None})
+
+    def test_independent_steps_run_concurrently(self):
+        """测试相互独立的步骤并发执行"""
+        barrier = threading.Barrier(3, timeout=5)
+        steps = [Step(f"step-{i}", barrier.wait) for i in range(3)]
+
+        start = time.time()
+        outcome = run_steps(steps, max_workers=3)
+
+        self.assertTrue(all(error is None for error in outcome.values()))
+        self.assertLess(time.time() - start, 5)
+
+    def test_failed_dependency_skips_dependents(self):
+        """测试前置步骤失败时跳过依赖步骤"""
+        executed = []
+
+        def fail():
+            raise RuntimeError("clone failed")
+
+        steps = [
+            Step("clone", fail),
+            Step("checker", lambda: executed.append("checker"), requires=["clone"]),
+            Step("network", lambda: executed.append("network")),
+        ]
+        completed = []
+        outcome = run_steps(steps, on_complete=lambda name, error: completed.append(name))
+
+        self.assertEqual(outcome["clone"], "clone failed")
+        self.assertIn("clone", outcome["checker"])
+        self.assertIsNone(outcome["network"])
+        self.assertEqual(executed, ["network"])
+        self.assertEqual(sorted(completed), ["checker", "clone", "network"])
+
+    def test_invalid_graph(self):
+        """测试无效依赖图被拒绝"""
+        with self.assertRaises(ValueError):
+            run_steps([Step("a", lambda: None, requires=["missing"])])
+        with self.assertRaises(ValueError):
+            run_steps([Step("a", lambda: None, requires=["b"]), Step("b", lambda: None, requires=["a"])])
+
+    def test_async_steps(self):
+        """测试协程版本的依赖调度与失败传播"""
+        order = []
+
+        def record(name):
+            async def func():
+                await asyncio.sleep(0)
+                order.append(name)
+            return func
+
+        async def fail():
+            raise RuntimeError("clone failed")
+
+        steps = [
+            Step("lockfiles", record("lockfiles"), requires=["download"]),
+            Step("download", record("download")),
+            Step("checker", record("checker"), requires=["clone"]),
+            Step("clone", fail),
+        ]
+        outcome = asyncio.run(run_steps_async(steps, max_concurrency=2))
+
+        self.assertEqual(order, ["download", "lockfiles"])
+        self.assertEqual(outcome["clone"], "clone failed")
+        self.assertIn("clone", outcome["checker"])
+        self.assertIsNone(outcome["lockfiles"])
+
+    def test_deadline_skips_steps_that_do_not_fit(self):
+        """测试预计耗时超出截止时间的步骤及其依赖步骤被跳过"""
+        executed = []
+
+        def record(name):
+            return lambda: executed.append(name)
+
+        steps = [
+            Step("network", record("network"), estimate=1),
+            Step("clone", record("clone"), estimate=60),
+            Step("checker", record("checker"), requires=["clone"], estimate=1),
+        ]
+        outcome = run_steps(steps, deadline=time.time() + 10)
+
+        self.assertEqual(executed, ["network"])
+        self.assertEqual(outcome, {"network": None, "clone": DEADLINE_EXCEEDED, "checker": DEADLINE_EXCEEDED})
+
+        async_steps = [Step(s.name, _async(s.func), requires=s.requires, estimate=s.estimate) for s in steps]
+        outcome = asyncio.run(run_steps_async(async_steps, deadline=time.time() + 10))
+        self.assertEqual(outcome, {"network": None, "clone": DEADLINE_EXCEEDED, "checker": DEADLINE_EXCEEDED})
+
+
+def _async(func):
+    async def run():
+        func()
+    return run
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Source Archive Tests
+
+This module tests extracting tagged versions from source archives served
+by a local HTTP server standing in for the hosting platform.
+
+Author: OpenChecker Team
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.result_cache import checkout_revision
+from openchecker.source_archives import download_archive
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TestSourceArchives(unittest.TestCase):
+    """源码归档下载测试类"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.served = os.path.join(self.root, "served")
+        os.makedirs(self.served)
+        remote = os.path.join(self.root, "repo")
+        os.makedirs(os.path.join(remote, "src"))
+        _git("init", "-q", cwd=remote)
+        for path in ("README.md", os.path.join("src", "main.c")):
+            with open(os.path.join(remote, path), "w") as f:
+                f.write(path)
+        _git("add", ".", cwd=remote)
+        _git("commit", "-q", "-m", "initial", cwd=remote)
+        _git("tag", "v1.0", cwd=remote)
+        self.commit = _git("rev-parse", "HEAD", cwd=remote)
+        for archive_format in ("tar.gz", "zip"):
+            _git("archive", f"--format={archive_format}", "--prefix=repo-v1.0/",
+                 "-o", os.path.join(self.served, f"v1.0.{archive_format}"), "v1.0", cwd=remote)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=self.served))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.checkout = os.path.join(self.root, "workspace", "repo")
+        os.makedirs(os.path.dirname(self.checkout))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root)
+
+    def _download(self, tarball, zipball):
+        with patch("openchecker.source_archives.platform_manager") as platform_manager:
+            platform_manager.get_tarball_url.return_value = f"{self.base_url}/{tarball}"
+            platform_manager.get_zipball_url.return_value = f"{self.base_url}/{zipball}"
+            return download_archive("https://github.com/test/repo", "v1.0", self.checkout, timeout=30)
+
+    def test_tarball(self):
+        """测试流式解压tarball并记录标签对应的提交"""
+        self.assertTrue(self._download("v1.0.tar.gz", "v1.0.zip"))
+        self.assertEqual(sorted(os.listdir(self.checkout)), ["README.md", "src"])
+        with open(os.path.join(self.checkout, "src", "main.c")) as f:
+            self.assertEqual(f.read(), os.path.join("src", "main.c"))
+        self.assertEqual(checkout_revision(self.checkout), self.commit)
+
+    def test_zipball_fallback(self):
+        """测试tarball不可用时回退到zipball"""
+        self.assertTrue(self._download("missing.tar.gz", "v1.0.zip"))
+        self.assertEqual(sorted(os.listdir(self.checkout)), ["README.md", "src"])
+        self.assertEqual(checkout_revision(self.checkout), self.commit)
+
+    def test_branch_urls_skipped(self):
+        """测试不使用指向分支的归档URL"""
+        os.makedirs(os.path.join(self.served, "archive", "refs", "heads"))
+        shutil.copy(os.path.join(self.served, "v1.0.zip"), os.path.join(self.served, "archive", "refs", "heads"))
+        with patch("openchecker.source_archives.platform_manager") as platform_manager:
+            platform_manager.get_tarball_url.return_value = None
+            platform_manager.get_zipball_url.return_value = f"{self.base_url}/archive/refs/heads/v1.0.zip"
+            self.assertFalse(download_archive("https://gitcode.com/test/repo", "v1.0", self.checkout, timeout=30))
+        self.assertFalse(os.path.exists(self.checkout))
+
+    def test_export_attributes(self):
+        """测试.gitattributes声明export-ignore时放弃归档，改为克隆"""
+        remote = os.path.join(self.root, "exported")
+        os.makedirs(os.path.join(remote, ".github", "workflows"))
+        _git("init", "-q", cwd=remote)
+        with open(os.path.join(remote, ".github", "workflows", "ci.yml"), "w") as f:
+            f.write("on: push\n")
+        with open(os.path.join(remote, ".gitattributes"), "w") as f:
+            f.write("# release archives\n/.github export-ignore\n")
+        _git("add", ".", cwd=remote)
+        _git("commit", "-q", "-m", "initial", cwd=remote)
+        for archive_format in ("tar.gz", "zip"):
+            _git("archive", f"--format={archive_format}", "--prefix=exported-v1.0/",
+                 "-o", os.path.join(self.served, f"exported.{archive_format}"), "HEAD", cwd=remote)
+
+        self.assertFalse(self._download("exported.tar.gz", "exported.zip"))
+        self.assertFalse(os.path.exists(self.checkout))
+        self.assertFalse(self._download("missing.tar.gz", "exported.zip"))
+        self.assertFalse(os.path.exists(self.checkout))
+
+    def test_missing_and_unsafe_archives(self):
+        """测试归档不可用时返回失败，并跳过写到检出目录之外的成员"""
+        self.assertFalse(self._download("missing.tar.gz", "missing.zip"))
+        self.assertFalse(os.path.exists(self.checkout))
+
+        with tarfile.open(os.path.join(self.served, "unsafe.tar.gz"), "w:gz") as tar:
+            for name in ("repo-v1.0/README.md", "repo-v1.0/../../escaped", "/absolute"):
+                info = tarfile.TarInfo(name)
+                info.size = 4
+                tar.addfile(info, io.BytesIO(b"data"))
+            link = tarfile.TarInfo("repo-v1.0/link")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "../../outside"
+            tar.addfile(link)
+        self.assertTrue(self._download("unsafe.tar.gz", "missing.zip"))
+        self.assertEqual(os.listdir(self.checkout), ["README.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "escaped")))
+        self.assertIsNone(checkout_revision(self.checkout))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenChecker Task Workspace Tests
+
+This module tests the task workspace owning the single checkout of a task
+and that checkers read that checkout instead of cloning the project.
+
+Author: OpenChecker Team
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openchecker.checkers.document_checker import check_readme_opensource
+from openchecker.checkers.shell_script_checker import shell_script_checker
+from openchecker.workspace import LOCK_FILE, TaskWorkspace
+
+
+class TestTaskWorkspace(unittest.TestCase):
+    """任务工作区测试类"""
+
+    def setUp(self):
+        self.repos_dir = tempfile.mkdtemp()
+        self.workspace = TaskWorkspace.create(self.repos_dir, "https://github.com/test/repo.git")
+
+    def tearDown(self):
+        shutil.rmtree(self.repos_dir)
+
+    def test_create_and_cleanup(self):
+        """测试工作区创建、检出路径与清理"""
+        self.assertTrue(os.path.isabs(self.workspace.root))
+        self.assertEqual(self.workspace.checkout, os.path.join(self.workspace.root, "repo"))
+        self.assertFalse(self.workspace.has_checkout())
+
+        other = TaskWorkspace.create(self.repos_dir, "https://github.com/test/repo")
+        self.assertNotEqual(other.root, self.workspace.root)
+
+        self.workspace.cleanup()
+        self.assertFalse(os.path.exists(self.workspace.root))
+
+    def test_checkout_removed_by_checker(self):
+        """测试检查器删除检出目录时报告错误"""
+        os.makedirs(self.workspace.checkout)
+        self.assertIsNone(self.workspace.checkout_error("readme-checker", True))
+
+        shutil.rmtree(self.workspace.checkout)
+        self.assertIn("license-detector", self.workspace.checkout_error("license-detector", True))
+        self.assertIsNone(self.workspace.checkout_error("eol-checker", False))
+
+    def test_checkers_do_not_clone(self):
+        """测试缺少检出目录时检查器报告错误而不自行克隆"""
+        payload = {"scan_results": {}}
+        shell_script_checker("readme-checker", "https://github.com/test/repo", payload, self.workspace.root)
+        self.assertIn("Project checkout not found", payload["scan_results"]["readme-checker"]["error"])
+
+        valid, error = check_readme_opensource("https://github.com/test/repo", self.workspace.root)
+        self.assertFalse(valid)
+        self.assertIn("Project checkout not found", error)
+        self.assertEqual(os.listdir(self.workspace.root), [LOCK_FILE])
+
+
+if __name__ == '__main__':
+    unittest.main()